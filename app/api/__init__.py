@@ -1,8 +1,9 @@
-from . import documents_router, health_router, pipelines_router, runs_router
+from . import documents_router, health_router, pipelines_router, runs_router, search_router
 
 __all__ = [
     "documents_router",
     "health_router",
     "pipelines_router",
     "runs_router",
+    "search_router",
 ]
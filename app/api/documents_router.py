@@ -1,15 +1,169 @@
-from fastapi import APIRouter, Depends
+import tempfile
+from typing import IO, AsyncIterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ..core.db import get_db
+from ..core.config import get_settings
+from ..core.db import get_db, get_session_factory
+from ..core.serialization import dumps
 from ..schemas.common import APIResponse
-from ..schemas.document_schemas import DocumentCreate, DocumentRead
-from ..services.document_service import register_document
+from ..schemas.document_schemas import SOURCE_PATTERN, DocumentCreate, DocumentRead
+from ..services.document_service import BulkRegistration, register_document
+from ..services.upload_service import BlobWriter, UploadTooLarge
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
 @router.post("", response_model=APIResponse[DocumentRead])
 def register_document_endpoint(payload: DocumentCreate, db: Session = Depends(get_db)) -> APIResponse[DocumentRead]:
-    document = register_document(db, payload)
+    try:
+        document = register_document(db, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return APIResponse.ok(DocumentRead.from_orm(document))
+
+
+async def _spool_body(request: Request, max_bytes: int) -> IO[bytes]:
+    """Copy the request body to a temporary file and return it rewound.
+
+    ``StreamingResponse`` listens for a disconnect on ``receive`` while it sends, which would swallow
+    body messages, so the body has to be fully read before the response starts.
+    """
+    spool = await run_in_threadpool(tempfile.TemporaryFile)
+    size = 0
+    try:
+        async for piece in request.stream():
+            size += len(piece)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Body exceeds {max_bytes} bytes")
+            await run_in_threadpool(spool.write, piece)
+        await run_in_threadpool(spool.seek, 0)
+    except BaseException:
+        await run_in_threadpool(spool.close)
+        raise
+    return spool
+
+
+async def _spooled_pieces(spool: IO[bytes], block_size: int) -> AsyncIterator[bytes]:
+    while True:
+        piece = await run_in_threadpool(spool.read, block_size)
+        if not piece:
+            return
+        yield piece
+
+
+async def _ndjson_lines(pieces: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Yield ``(line_number, line)`` from a stream of body pieces; an oversized line is yielded as ``None``."""
+    buffer = bytearray()
+    line_number = 0
+    oversized = False
+    async for piece in pieces:
+        buffer.extend(piece)
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                del buffer[:start]
+                if len(buffer) > max_line_bytes:  # drop the rest of the line as it arrives
+                    oversized = True
+                    buffer.clear()
+                break
+            line = bytes(buffer[start:end])
+            start = end + 1
+            line_number += 1
+            if oversized or len(line) > max_line_bytes:
+                oversized = False
+                yield line_number, None
+            elif line.strip():
+                yield line_number, line
+    if oversized:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, bytes(buffer)
+
+
+def _register_batch(bulk: BulkRegistration, lines: List[Tuple[int, Optional[bytes]]], max_line_bytes: int) -> List[dict]:
+    for line_number, line in lines:
+        if line is None:
+            bulk.fail(line_number, f"Line exceeds {max_line_bytes} bytes")
+        else:
+            bulk.add(line_number, line)
+    return bulk.flush()
+
+
+@router.post("/bulk")
+async def bulk_register_documents_endpoint(request: Request) -> StreamingResponse:
+    """Register documents from an NDJSON body (one ``DocumentCreate`` per line).
+
+    Streams back one NDJSON result per line (``{"line", "id"}`` or ``{"line", "error"}``), then a summary.
+    Blank lines are skipped; invalid lines do not affect the rest of their batch.
+    """
+    settings = get_settings()
+    max_line_bytes = settings.bulk_max_line_bytes
+    spool = await _spool_body(request, settings.max_upload_bytes)
+
+    async def results() -> AsyncIterator[bytes]:
+        # the session outlives the request handler, so it is opened here rather than injected
+        db = get_session_factory()()
+        bulk = BulkRegistration(db)
+        try:
+            lines: List[Tuple[int, Optional[bytes]]] = []
+            async for numbered in _ndjson_lines(_spooled_pieces(spool, settings.upload_chunk_size), max_line_bytes):
+                lines.append(numbered)
+                if len(lines) >= settings.bulk_batch_size:
+                    batch = await run_in_threadpool(_register_batch, bulk, lines, max_line_bytes)
+                    lines = []
+                    yield b"".join(dumps(result) + b"\n" for result in batch)
+            if lines:
+                batch = await run_in_threadpool(_register_batch, bulk, lines, max_line_bytes)
+                yield b"".join(dumps(result) + b"\n" for result in batch)
+            yield dumps(bulk.summary()) + b"\n"
+        finally:
+            await run_in_threadpool(db.close)
+            await run_in_threadpool(spool.close)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.post("/upload", response_model=APIResponse[DocumentRead])
+async def upload_document_endpoint(
+    request: Request,
+    file_name: Optional[str] = Query(default=None),
+    source_type: str = Query(default="file_upload", regex=SOURCE_PATTERN),
+    external_ref: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+) -> APIResponse[DocumentRead]:
+    settings = get_settings()
+    writer = await run_in_threadpool(BlobWriter, max_bytes=settings.max_upload_bytes)
+    buffer = bytearray()
+    try:
+        async for piece in request.stream():
+            buffer.extend(piece)
+            while len(buffer) >= settings.upload_chunk_size:
+                block = bytes(buffer[: settings.upload_chunk_size])
+                del buffer[: settings.upload_chunk_size]
+                await run_in_threadpool(writer.write, block)
+        if buffer:
+            await run_in_threadpool(writer.write, bytes(buffer))
+        blob = await run_in_threadpool(writer.commit)
+    except UploadTooLarge as exc:
+        await run_in_threadpool(writer.abort)
+        raise HTTPException(status_code=413, detail=str(exc))
+    except BaseException:
+        await run_in_threadpool(writer.abort)
+        raise
+
+    content_type = request.headers.get("content-type")
+    payload = DocumentCreate(
+        source_type=source_type,
+        external_ref=external_ref,
+        file_name=file_name,
+        mime_type=content_type.split(";")[0].strip() if content_type else None,
+        storage_uri=str(blob.path),
+        metadata={"sha256": blob.sha256, "size_bytes": blob.size_bytes},
+    )
+    document = await run_in_threadpool(register_document, db, payload)
     return APIResponse.ok(DocumentRead.from_orm(document))
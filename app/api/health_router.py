@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 
+from ..core.cache import cache_stats
 from ..core.config import get_settings
+from ..core.db import database_stats
 from ..schemas.common import APIResponse
+from ..services.prompt_packer import batcher_stats
+from ..services.scheduler import get_scheduler
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -17,3 +21,23 @@ async def get_health() -> APIResponse[dict]:
         },
     }
     return APIResponse.ok(data)
+
+
+@router.get("/caches", response_model=APIResponse[dict])
+async def get_cache_stats() -> APIResponse[dict]:
+    return APIResponse.ok(cache_stats())
+
+
+@router.get("/scheduler", response_model=APIResponse[dict])
+async def get_scheduler_stats() -> APIResponse[dict]:
+    return APIResponse.ok(get_scheduler().stats())
+
+
+@router.get("/database", response_model=APIResponse[dict])
+async def get_database_stats() -> APIResponse[dict]:
+    return APIResponse.ok(database_stats())
+
+
+@router.get("/packing", response_model=APIResponse[dict])
+async def get_packing_stats() -> APIResponse[dict]:
+    return APIResponse.ok(batcher_stats())
@@ -1,19 +1,24 @@
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
+from ..core.serialization import ok_response, parse_fields
 from ..schemas.common import APIResponse
 from ..schemas.pipeline_schemas import (
+    PIPELINE_FIELDS,
+    PIPELINE_SUMMARY_FIELDS,
     PipelineCreate,
     PipelineRead,
     PipelineSummary,
     PipelineUpdate,
 )
 from ..schemas.run_schemas import RunCreate, RunRead
-from ..services import pipeline_service, run_service
+from ..services import idempotency, pipeline_service, run_service, run_stats_service
+from ..services.scheduler import AdmissionRejected
 
 router = APIRouter(prefix="/pipelines", tags=["pipelines"])
 
@@ -28,10 +33,12 @@ def create_pipeline_endpoint(payload: PipelineCreate, db: Session = Depends(get_
 def list_pipelines_endpoint(
     use_case: Optional[str] = Query(default=None),
     active_only: bool = Query(default=True),
+    fields: Optional[str] = Query(default=None, description="Comma-separated columns to return"),
     db: Session = Depends(get_db),
-) -> APIResponse[List[PipelineSummary]]:
-    pipelines = pipeline_service.list_pipelines(db, use_case=use_case, active_only=active_only)
-    return APIResponse.ok([PipelineSummary.from_orm(p) for p in pipelines])
+):
+    columns = parse_fields(fields, allowed=PIPELINE_FIELDS, default=PIPELINE_SUMMARY_FIELDS)
+    rows = pipeline_service.list_pipeline_rows(db, fields=columns, use_case=use_case, active_only=active_only)
+    return ok_response(rows)
 
 
 @router.get("/{pipeline_id}", response_model=APIResponse[PipelineRead])
@@ -42,6 +49,31 @@ def get_pipeline_endpoint(pipeline_id: UUID, db: Session = Depends(get_db)) -> A
     return APIResponse.ok(PipelineRead.from_orm(pipeline))
 
 
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC, so an offset-aware query bound is converted to match."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("/{pipeline_id}/stats", response_model=APIResponse[dict])
+def pipeline_stats_endpoint(
+    pipeline_id: UUID,
+    since: Optional[datetime] = Query(default=None, description="UTC; defaults to 24 hours before `until`"),
+    until: Optional[datetime] = Query(default=None, description="UTC; defaults to now"),
+    granularity: str = Query(default="hour", regex="^(hour|day)$"),
+    db: Session = Depends(get_db),
+):
+    if pipeline_service.get_pipeline(db, pipeline_id) is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    until = _naive_utc(until) or datetime.utcnow()
+    since = _naive_utc(since) or until - timedelta(days=1)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="`since` must be before `until`")
+    stats = run_stats_service.pipeline_stats(db, pipeline_id, since=since, until=until, granularity=granularity)
+    return ok_response(stats)
+
+
 @router.put("/{pipeline_id}", response_model=APIResponse[PipelineRead])
 def update_pipeline_endpoint(
     pipeline_id: UUID,
@@ -68,13 +100,26 @@ def delete_pipeline_endpoint(pipeline_id: UUID, db: Session = Depends(get_db)) -
 def run_pipeline_endpoint(
     pipeline_id: UUID,
     payload: RunCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, max_length=200),
     db: Session = Depends(get_db),
 ) -> APIResponse[RunRead]:
     pipeline = pipeline_service.get_pipeline(db, pipeline_id)
     if not pipeline:
         raise HTTPException(status_code=404, detail="Pipeline not found")
+    if payload.preview:
+        try:
+            return ok_response(run_service.preview_run(db, pipeline, payload))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
     try:
-        run = run_service.create_run(db, pipeline, payload)
+        run, created = run_service.submit_run(db, pipeline, payload, idempotency_key)
+    except AdmissionRejected as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    if not created:
+        response.headers["Idempotent-Replayed"] = "true"
+        if run.status not in idempotency.FINISHED_STATUSES:
+            response.status_code = 202  # still executing; poll GET /runs/{id}
     return APIResponse.ok(RunRead.from_orm(run))
@@ -5,27 +5,57 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
+from ..core.serialization import ok_response, parse_fields
 from ..schemas.common import APIResponse
-from ..schemas.run_schemas import RunListItem, RunRead
-from ..services import run_service
+from ..schemas.run_schemas import RUN_FIELDS, RUN_LIST_DEFAULT_FIELDS, RunListItem, RunNodeRead, RunRead
+from ..services import checkpoint_service, pipeline_service, run_service
+from ..services.scheduler import AdmissionRejected
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
+FIELDS_QUERY = Query(default=None, description="Comma-separated columns to return, e.g. id,status,completed_at")
+
 
 @router.get("", response_model=APIResponse[List[RunListItem]])
 def list_runs_endpoint(
     pipeline_id: Optional[UUID] = Query(default=None),
     status: Optional[str] = Query(default=None),
     limit: int = Query(default=50, le=100),
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
-) -> APIResponse[List[RunListItem]]:
-    runs = run_service.list_runs(db, pipeline_id=pipeline_id, status=status, limit=limit)
-    return APIResponse.ok([RunListItem.from_orm(r) for r in runs])
+):
+    columns = parse_fields(fields, allowed=RUN_FIELDS, default=RUN_LIST_DEFAULT_FIELDS)
+    rows = run_service.list_run_rows(db, fields=columns, pipeline_id=pipeline_id, status=status, limit=limit)
+    return ok_response(rows)
 
 
 @router.get("/{run_id}", response_model=APIResponse[RunRead])
-def get_run_endpoint(run_id: UUID, db: Session = Depends(get_db)) -> APIResponse[RunRead]:
+def get_run_endpoint(run_id: UUID, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_db)):
+    columns = parse_fields(fields, allowed=RUN_FIELDS, default=RUN_FIELDS)
+    row = run_service.get_run_row(db, run_id, fields=columns)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return ok_response(row)
+
+
+@router.get("/{run_id}/nodes", response_model=APIResponse[List[RunNodeRead]])
+def list_run_nodes_endpoint(run_id: UUID, db: Session = Depends(get_db)) -> APIResponse[List[RunNodeRead]]:
+    checkpoints = checkpoint_service.list_checkpoints(db, run_id)
+    return APIResponse.ok([RunNodeRead.from_orm(cp) for cp in checkpoints])
+
+
+@router.post("/{run_id}/resume", response_model=APIResponse[RunRead])
+def resume_run_endpoint(run_id: UUID, db: Session = Depends(get_db)) -> APIResponse[RunRead]:
     run = run_service.get_run(db, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
+    pipeline = pipeline_service.get_pipeline(db, run.pipeline_id)
+    if not pipeline:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    try:
+        run = run_service.resume_run(db, pipeline, run)
+    except AdmissionRejected as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     return APIResponse.ok(RunRead.from_orm(run))
@@ -0,0 +1,46 @@
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..core.db import get_db
+from ..core.serialization import ok_response
+from ..models.pipeline_model import PIPELINE_USE_CASES
+from ..models.search_model import SEARCH_SOURCE_TYPES
+from ..schemas.common import APIResponse
+from ..schemas.search_schemas import SearchHit
+from ..services import search_service
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=APIResponse[List[SearchHit]])
+def search_endpoint(
+    q: str = Query(..., min_length=1, description='Terms are ANDed; use "..." for phrases and term* for prefixes'),
+    use_case: Optional[str] = Query(default=None, regex="^(" + "|".join(PIPELINE_USE_CASES) + ")$"),
+    pipeline_id: Optional[UUID] = Query(default=None),
+    source_type: Optional[str] = Query(default=None, regex="^(" + "|".join(SEARCH_SOURCE_TYPES) + ")$"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    hybrid: bool = Query(default=False, description="Blend in vector similarity of staged outputs"),
+    vector_weight: float = Query(default=0.3, ge=0.0, le=1.0),
+    db: Session = Depends(get_db),
+):
+    try:
+        hits = search_service.search(
+            db,
+            q,
+            use_case=use_case,
+            pipeline_id=pipeline_id,
+            source_type=source_type,
+            limit=limit,
+            offset=offset,
+            hybrid=hybrid,
+            vector_weight=vector_weight,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except search_service.SearchUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    return ok_response(hits)
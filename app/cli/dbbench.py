@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .loadtest import _WORDS, percentile
+
+
+def configure_database(workdir: Path, profile: str, database_url: Optional[str], tag: str) -> str:
+    """Point settings at ``database_url`` (default: a fresh SQLite file per profile and ``tag``) with ``profile``."""
+    url = database_url or f"sqlite:///{workdir / f'dbbench-{profile}-{tag}.db'}"
+    os.environ.update({"SYNC_DATABASE_URL": url, "DB_PROFILE": profile, "BLOB_DIR": str(workdir / "blobs")})
+    from ..core.config import get_settings
+    from ..core.db import get_db_profile, get_session_factory, get_sync_engine
+
+    get_settings.cache_clear()
+    get_db_profile.cache_clear()
+    get_sync_engine.cache_clear()
+    get_session_factory.cache_clear()
+    return url
+
+
+class WriterStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.chunks = 0
+        self.reads = 0
+
+    def ok(self, seconds: float, chunks: int) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+            self.chunks += chunks
+
+    def error(self, exc: Exception) -> None:
+        kind = "database_locked" if "locked" in str(exc) else type(exc).__name__
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def read(self) -> None:
+        with self._lock:
+            self.reads += 1
+
+
+def _document_segments(rng: random.Random, chars: int) -> List[str]:
+    words: List[str] = []
+    length = 0
+    while length < chars:
+        words.append(rng.choice(_WORDS))
+        length += len(words[-1]) + 1
+    return [" ".join(words)]
+
+
+def _writer(deadline: float, seed: int, chunks_per_document: int, chunk_chars: int, stats: WriterStats) -> None:
+    from ..core.db import get_session_factory
+    from ..schemas.document_schemas import DocumentCreate
+    from ..services.document_service import register_document
+    from ..services.ingestion_engine import ingest_segments
+
+    rng = random.Random(seed)
+    factory = get_session_factory()
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        with factory() as db:
+            try:
+                document = register_document(
+                    db, DocumentCreate(source_type="external_system", external_ref=f"dbbench-{seed}", metadata={})
+                )
+                chunks = ingest_segments(
+                    db,
+                    document,
+                    segments=_document_segments(rng, chunks_per_document * chunk_chars),
+                    chunk_size=chunk_chars,
+                    mime_type="text/plain",
+                )
+            except Exception as exc:
+                db.rollback()
+                stats.error(exc)
+                continue
+        stats.ok(time.perf_counter() - started, chunks)
+
+
+def _reader(deadline: float, stats: WriterStats) -> None:
+    from sqlalchemy import func, select
+
+    from ..core.db import get_session_factory
+    from ..models.document_model import IngestedChunk
+
+    factory = get_session_factory()
+    while time.perf_counter() < deadline:
+        with factory() as db:
+            try:
+                db.execute(select(func.count(IngestedChunk.id))).scalar()
+            except Exception as exc:
+                stats.error(exc)
+                continue
+        stats.read()
+
+
+def run_profile(
+    profile: str,
+    *,
+    writers: int,
+    readers: int,
+    duration: float,
+    chunks_per_document: int,
+    chunk_chars: int,
+    workdir: Path,
+    database_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Drive ``writers`` threads that each register a document and ingest its chunks, back to back."""
+    url = configure_database(workdir, profile, database_url, f"w{writers}")
+    from ..core.db import database_stats, get_sync_engine
+    from ..core.init_db import create_all_tables
+
+    create_all_tables()
+    stats = WriterStats()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_writer, args=(deadline, index, chunks_per_document, chunk_chars, stats), daemon=True)
+        for index in range(writers)
+    ] + [threading.Thread(target=_reader, args=(deadline, stats), daemon=True) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    database = database_stats()
+    get_sync_engine().dispose()
+
+    values = sorted(stats.latencies)
+    ms = lambda v: round(v * 1000, 1) if v is not None else None  # noqa: E731
+    return {
+        "profile": profile,
+        "database": url.split("://", 1)[0],
+        "writers": writers,
+        "readers": readers,
+        "elapsed_s": round(elapsed, 2),
+        "documents_per_s": round(len(values) / elapsed, 1),
+        "chunks_per_s": round(stats.chunks / elapsed, 1),
+        "reads_per_s": round(stats.reads / elapsed, 1),
+        "errors": dict(sorted(stats.errors.items())),
+        "latency_ms": {
+            "p50": ms(percentile(values, 50)),
+            "p95": ms(percentile(values, 95)),
+            "p99": ms(percentile(values, 99)),
+            "max": ms(values[-1] if values else None),
+        },
+        "storage": database,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    lat = result["latency_ms"]
+    errors = sum(result["errors"].values())
+    return (
+        f"{result['profile']:<9} writers={result['writers']:<3} {result['documents_per_s']:>8.1f} docs/s "
+        f"{result['chunks_per_s']:>9.1f} chunks/s {result['reads_per_s']:>8.1f} reads/s  "
+        f"p50={lat['p50']}ms p95={lat['p95']}ms p99={lat['p99']}ms  errors={errors} {result['errors'] or ''}"
+    )
+
+
+def run_dbbench(
+    *,
+    profiles: Sequence[str],
+    writers: Sequence[int],
+    readers: int,
+    duration: float,
+    chunks_per_document: int,
+    chunk_chars: int,
+    workdir: Path,
+    database_url: Optional[str] = None,
+    echo=print,
+) -> Dict[str, Any]:
+    results = []
+    for count in writers:
+        for profile in profiles:
+            result = run_profile(
+                profile,
+                writers=count,
+                readers=readers,
+                duration=duration,
+                chunks_per_document=chunks_per_document,
+                chunk_chars=chunk_chars,
+                workdir=workdir,
+                database_url=database_url,
+            )
+            results.append(result)
+            echo(format_result(result))
+    return {"duration_s": duration, "chunks_per_document": chunks_per_document, "results": results}
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def iter_files(
+    root: Path,
+    *,
+    pattern: str = "*",
+    min_size: int = 0,
+    max_size: Optional[int] = None,
+) -> Iterator[Tuple[Path, int]]:
+    """Walk ``root`` depth-first with ``os.scandir`` so the tree is never materialized."""
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if not fnmatch.fnmatch(entry.name, pattern):
+                        continue
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                if size < min_size or (max_size is not None and size > max_size):
+                    continue
+                yield Path(entry.path), size
+
+
+def load_manifest(path: Path) -> Set[str]:
+    done: Set[str] = set()
+    if not path.exists():
+        return done
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a torn final line from an interrupted run
+            if record.get("status") == "ok":
+                done.add(record["path"])
+    return done
+
+
+class ManifestWriter:
+    """Append-only JSONL record of processed files, safe to share across worker threads."""
+
+    def __init__(self, path: Path) -> None:
+        self._handle = path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._handle.write(line)
+            self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+def request_with_retry(
+    client: "httpx.Client",
+    method: str,
+    url: str,
+    *,
+    retries: int = 3,
+    backoff: float = 0.5,
+    content_factory: Optional[Callable[[], Any]] = None,
+    **kwargs: Any,
+) -> "httpx.Response":
+    """Send a request, retrying transient failures.
+
+    Streaming bodies cannot be replayed, so pass ``content_factory`` to build a fresh body
+    (for example an open file handle) for every attempt.
+    """
+    import httpx
+
+    attempt = 0
+    while True:
+        try:
+            if content_factory is not None:
+                with content_factory() as content:
+                    response = client.request(method, url, content=content, **kwargs)
+            else:
+                response = client.request(method, url, **kwargs)
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= retries:
+                return response
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff * (2 ** attempt)
+        except httpx.TransportError:
+            if attempt >= retries:
+                raise
+            delay = backoff * (2 ** attempt)
+        attempt += 1
+        time.sleep(delay)
+
+
+class Progress:
+    def __init__(self, interval: float = 2.0, stream=sys.stderr) -> None:
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0
+        self._interval = interval
+        self._stream = stream
+        self._started = time.monotonic()
+        self._last_report = self._started
+
+    def update(self, *, ok: bool) -> None:
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+        now = time.monotonic()
+        if now - self._last_report >= self._interval:
+            self._last_report = now
+            self.report()
+
+    def rate(self) -> float:
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        return (self.ok + self.failed) / elapsed
+
+    def report(self) -> None:
+        self._stream.write(
+            f"\r{self.ok} ok, {self.failed} failed, {self.skipped} skipped ({self.rate():.1f} files/s)"
+        )
+        self._stream.flush()
+
+    def finish(self) -> None:
+        self.report()
+        self._stream.write("\n")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(time.monotonic() - self._started, 3),
+            "files_per_second": round(self.rate(), 2),
+        }
+
+
+def ingest_directory(
+    root: Path,
+    *,
+    submit: Callable[[Path, int], Dict[str, Any]],
+    pattern: str = "*",
+    min_size: int = 0,
+    max_size: Optional[int] = None,
+    concurrency: int = 8,
+    manifest_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Feed matching files to ``submit`` through a bounded thread pool.
+
+    At most ``concurrency * 2`` files are in flight, so the walk stays lazy even for
+    very large trees. ``submit`` returns the manifest record for a file and should raise
+    on permanent failure.
+    """
+    done = load_manifest(manifest_path) if manifest_path else set()
+    manifest = ManifestWriter(manifest_path) if manifest_path else None
+    progress = Progress()
+    pending: Set[Future] = set()
+
+    def _run(path: Path, size: int) -> Dict[str, Any]:
+        try:
+            record = submit(path, size)
+            record.update({"path": str(path), "status": "ok"})
+        except Exception as exc:
+            record = {"path": str(path), "status": "error", "error": str(exc)}
+        if manifest:
+            manifest.write(record)
+        return record
+
+    def _drain(block_until: int) -> None:
+        nonlocal pending
+        while len(pending) > block_until:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                progress.update(ok=future.result()["status"] == "ok")
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for path, size in iter_files(root, pattern=pattern, min_size=min_size, max_size=max_size):
+                if str(path) in done:
+                    progress.skipped += 1
+                    continue
+                pending.add(pool.submit(_run, path, size))
+                _drain(concurrency * 2)
+            _drain(0)
+    finally:
+        if manifest:
+            manifest.close()
+        progress.finish()
+    return progress.summary()
@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import random
+import socket
+import string
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Scenario(NamedTuple):
+    name: str
+    mix: Dict[str, float]  # operation -> weight
+    doc_chars_median: int
+    doc_chars_sigma: float  # log-normal spread of document sizes
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "mixed": Scenario("mixed", {"run": 0.5, "list_runs": 0.3, "register_document": 0.2}, 3000, 1.0),
+    "runs": Scenario("runs", {"run": 1.0}, 3000, 1.0),
+    "small-invoices": Scenario("small-invoices", {"run": 0.9, "list_runs": 0.1}, 800, 0.5),
+    "large-documents": Scenario("large-documents", {"run": 0.8, "list_runs": 0.2}, 40000, 0.8),
+    "reads": Scenario("reads", {"list_runs": 0.8, "register_document": 0.2}, 1000, 0.5),
+}
+
+_WORDS = ["invoice", "total", "amount", "vendor", "records", "request", "payment", "due", "purchase", "order",
+          "department", "agency", "shipment", "quantity", "tax", "reference", "number", "date", "account", "item"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def configure_environment(workdir: Path, model_url: str, extra: Optional[Dict[str, str]] = None) -> None:
+    """Point settings at a scratch database and the mock model; must run before the API app is imported."""
+    db_path = workdir / "loadtest.db"
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+            "SYNC_DATABASE_URL": f"sqlite:///{db_path}",
+            "BLOB_DIR": str(workdir / "blobs"),
+            "ARCHIVE_DIR": str(workdir / "archive"),
+            "LLM_ENDPOINT_URL": model_url,
+            **(extra or {}),
+        }
+    )
+    from ..core.config import get_settings
+    from ..core.db import get_db_profile, get_session_factory, get_sync_engine
+
+    get_settings.cache_clear()
+    get_db_profile.cache_clear()
+    get_sync_engine.cache_clear()
+    get_session_factory.cache_clear()
+
+
+# -- servers -----------------------------------------------------------------------------------
+
+
+class ServerThread:
+    """Runs an ASGI app under uvicorn on a loopback port in a daemon thread."""
+
+    def __init__(self, app: Any, port: int, name: str) -> None:
+        import uvicorn
+
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.url = f"http://127.0.0.1:{port}"
+        self._thread = threading.Thread(target=self.server.run, name=name, daemon=True)
+
+    def start(self, timeout: float = 30.0) -> "ServerThread":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Server at {self.url} did not start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def mock_model_app(*, latency_ms: float, per_1k_tokens_ms: float, jitter_ms: float, error_rate: float) -> Any:
+    """A model endpoint speaking ``model_client``'s protocol with configurable latency and failures.
+
+    Latency is ``latency_ms`` plus ``per_1k_tokens_ms`` per thousand prompt tokens, with uniform jitter.
+    """
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    from ..services.processing_engine import local_complete
+    from ..services.tokenizers import get_tokenizer
+
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/")
+    async def complete(body: Dict[str, Any]) -> Any:
+        app.state.calls += 1
+        prompt = body.get("prompt", "")
+        tokens = get_tokenizer(body.get("model", "")).count(prompt)
+        delay = latency_ms + per_1k_tokens_ms * tokens / 1000 + random.uniform(-jitter_ms, jitter_ms)
+        await asyncio.sleep(max(delay, 0) / 1000)
+        if random.random() < error_rate:
+            return JSONResponse({"error": "overloaded"}, status_code=503)
+        text = local_complete(mode=body.get("mode", "summarize"), output_schema_id=body.get("output_schema_id", ""), prompt=prompt)
+        return {"text": text}
+
+    return app
+
+
+# -- measurement -------------------------------------------------------------------------------
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class OpStats:
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, status: str, seconds: float) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status.startswith("2"):
+            self.latencies.append(seconds)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        total = sum(self.statuses.values())
+        ok = len(self.latencies)
+        values = sorted(self.latencies)
+        ms = lambda v: round(v * 1000, 1) if v is not None else None  # noqa: E731
+        return {
+            "requests": total,
+            "throughput_per_s": round(ok / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round((total - ok) / total, 4) if total else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency_ms": {
+                "p50": ms(percentile(values, 50)),
+                "p90": ms(percentile(values, 90)),
+                "p99": ms(percentile(values, 99)),
+                "max": ms(values[-1] if values else None),
+            },
+        }
+
+
+class SaturationSampler(threading.Thread):
+    """Samples the API's connection pool and scheduler, and times SQL statements, while a step runs."""
+
+    def __init__(self, interval: float = 0.1) -> None:
+        super().__init__(name="saturation-sampler", daemon=True)
+        from sqlalchemy import event
+
+        from ..core.db import get_sync_engine
+
+        self.engine = get_sync_engine()
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.samples: List[Tuple[int, int, int]] = []  # (checked out, scheduler running, scheduler queued)
+        self.statements = 0
+        self.statement_seconds = 0.0
+        self.slowest_statement = 0.0
+        self._event = event
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("loadtest_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        pending = conn.info.get("loadtest_started")
+        if not pending:  # statement began before the sampler was attached
+            return
+        started = pending.pop()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.statements += 1
+            self.statement_seconds += elapsed
+            self.slowest_statement = max(self.slowest_statement, elapsed)
+
+    def run(self) -> None:
+        from ..services.scheduler import get_scheduler
+
+        pool = self.engine.pool
+        while not self._stop_event.wait(self.interval):
+            stats = get_scheduler().stats()
+            checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+            self.samples.append((checked_out, stats["running"], sum(stats["queue_depth"].values())))
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop_event.set()
+        self.join()
+        self._event.remove(self.engine, "before_cursor_execute", self._before)
+        self._event.remove(self.engine, "after_cursor_execute", self._after)
+        pool = self.engine.pool
+        capacity = (pool.size() + max(getattr(pool, "_max_overflow", 0), 0)) if hasattr(pool, "size") else None
+        checked = [s[0] for s in self.samples] or [0]
+        running = [s[1] for s in self.samples] or [0]
+        queued = [s[2] for s in self.samples] or [0]
+        return {
+            "pool": {
+                "capacity": capacity,
+                "checked_out_mean": round(sum(checked) / len(checked), 2),
+                "checked_out_max": max(checked),
+                "saturated_fraction": round(sum(1 for c in checked if capacity and c >= capacity) / len(checked), 4),
+            },
+            "scheduler": {"running_max": max(running), "queued_mean": round(sum(queued) / len(queued), 2), "queued_max": max(queued)},
+            "database": {
+                "statements": self.statements,
+                "mean_statement_ms": round(self.statement_seconds / self.statements * 1000, 3) if self.statements else None,
+                "slowest_statement_ms": round(self.slowest_statement * 1000, 1),
+            },
+        }
+
+
+# -- load generation ---------------------------------------------------------------------------
+
+
+def document_text(rng: random.Random, scenario: Scenario) -> str:
+    size = int(rng.lognormvariate(math.log(scenario.doc_chars_median), scenario.doc_chars_sigma))
+    words: List[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS) if rng.random() < 0.8 else "".join(rng.choices(string.digits, k=6))
+        words.append(word + ("." if rng.random() < 0.08 else ""))
+        length += len(words[-1]) + 1
+    return " ".join(words)
+
+
+async def _issue(client: Any, op: str, pipeline_id: str, rng: random.Random, scenario: Scenario, stats: Dict[str, OpStats]) -> None:
+    started = time.perf_counter()
+    try:
+        if op == "run":
+            response = await client.post(f"/pipelines/{pipeline_id}/run", json={"text_payload": document_text(rng, scenario)})
+        elif op == "list_runs":
+            response = await client.get("/runs", params={"pipeline_id": pipeline_id, "limit": 20})
+        elif op == "register_document":
+            response = await client.post(
+                "/documents", json={"source_type": "text_payload", "text_payload": document_text(rng, scenario), "metadata": {}}
+            )
+        else:
+            raise ValueError(f"Unknown operation {op}")
+        status = str(response.status_code)
+        if op == "run" and response.status_code == 200 and response.json()["data"]["status"] == "failed":
+            status = "run_failed"  # the request succeeded but the pipeline did not
+    except Exception as exc:  # timeouts and connection errors count as errors, not crashes
+        status = type(exc).__name__
+    stats[op].record(status, time.perf_counter() - started)
+
+
+async def run_step(
+    api_url: str,
+    pipeline_id: str,
+    scenario: Scenario,
+    *,
+    duration: float,
+    rate: Optional[float] = None,
+    concurrency: int = 8,
+    max_in_flight: int = 512,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Drive one load level. With ``rate`` arrivals are Poisson (open loop, capped at ``max_in_flight``);
+    without it ``concurrency`` clients issue requests back to back (closed loop)."""
+    import httpx
+
+    rng = random.Random(seed)
+    ops, weights = zip(*scenario.mix.items())
+    stats = {op: OpStats() for op in ops}
+    dropped = 0
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=60.0) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        if rate:
+            tasks = set()
+            next_arrival = started
+            while next_arrival < deadline:
+                await asyncio.sleep(max(next_arrival - time.perf_counter(), 0))
+                if len(tasks) >= max_in_flight:
+                    dropped += 1
+                else:
+                    task = asyncio.create_task(_issue(client, rng.choices(ops, weights)[0], pipeline_id, rng, scenario, stats))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                next_arrival += rng.expovariate(rate)
+            if tasks:
+                await asyncio.gather(*tasks)
+        else:
+            async def _client_loop() -> None:
+                while time.perf_counter() < deadline:
+                    await _issue(client, rng.choices(ops, weights)[0], pipeline_id, rng, scenario, stats)
+
+            await asyncio.gather(*(_client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    everything = OpStats()
+    for op_stats in stats.values():
+        everything.latencies.extend(op_stats.latencies)
+        for status, count in op_stats.statuses.items():
+            everything.statuses[status] = everything.statuses.get(status, 0) + count
+    total = sum(everything.statuses.values())
+    errors = total - len(everything.latencies)
+    return {
+        "scenario": scenario.name,
+        "offered_rate": rate,
+        "concurrency": None if rate else concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "dropped": dropped,
+        "throughput_per_s": round(len(everything.latencies) / elapsed, 2),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "latency_ms": everything.summary(elapsed)["latency_ms"],
+        "statuses": dict(sorted(everything.statuses.items())),
+        "operations": {op: op_stats.summary(elapsed) for op, op_stats in stats.items()},
+    }
+
+
+def format_step(step: Dict[str, Any]) -> str:
+    load = f"rate={step['offered_rate']}/s" if step["offered_rate"] else f"clients={step['concurrency']}"
+    lat = step["latency_ms"]
+    sat = step.get("saturation", {})
+    pool = sat.get("pool", {})
+    db = sat.get("database", {})
+    return (
+        f"{step['scenario']:<16} {load:<14} {step['throughput_per_s']:>8.2f} req/s  "
+        f"p50={lat['p50']}ms p90={lat['p90']}ms p99={lat['p99']}ms  err={step['error_rate']:.2%}  "
+        f"pool={pool.get('checked_out_max')}/{pool.get('capacity')} sql={db.get('mean_statement_ms')}ms"
+    )
+
+
+def loadtest_pipeline(strategy: str) -> Dict[str, Any]:
+    process_config: Dict[str, Any] = {
+        "mode": "summarize",
+        "model_name": "mock-model",
+        "prompt_template_id": "generic_summary",
+        "output_schema_id": "generic_structured_output",
+    }
+    if strategy != "default":
+        process_config["strategy"] = strategy
+    return {
+        "name": f"loadtest-{strategy}-{int(time.time())}",
+        "description": "Created by the load-test harness",
+        "use_case": "generic",
+        "definition": {
+            "nodes": [
+                {"id": "ingest", "type": "DocumentIngestionNode", "config": {"source_type": "text_payload"}},
+                {"id": "process", "type": "LLMProcessingNode", "config": process_config},
+                {"id": "validate", "type": "ValidationNode", "config": {"ruleset_name": "generic_rules"}},
+                {"id": "stage", "type": "StagingNode", "config": {"payload_type": "generic_structured_output"}},
+            ]
+        },
+    }
+
+
+def run_loadtest(
+    *,
+    scenarios: Sequence[str],
+    rates: Sequence[float],
+    concurrency: Sequence[int],
+    duration: float,
+    warmup: float,
+    strategy: str,
+    workdir: Path,
+    model_options: Dict[str, float],
+    env: Optional[Dict[str, str]] = None,
+    echo=print,
+) -> Dict[str, Any]:
+    """Start the mock model and the API in-process, then run every scenario at every load level."""
+    import httpx
+
+    model_app = mock_model_app(**model_options)
+    model = ServerThread(model_app, free_port(), "mock-model").start()
+    configure_environment(workdir, model.url + "/", env)
+    from ..main import app as api_app
+    from ..services import model_client
+
+    api = ServerThread(api_app, free_port(), "api").start()
+    api_url = api.url + "/api/v1"
+    steps: List[Dict[str, Any]] = []
+    try:
+        created = httpx.post(f"{api_url}/pipelines", json=loadtest_pipeline(strategy), timeout=30.0)
+        created.raise_for_status()
+        pipeline_id = created.json()["data"]["id"]
+        levels: List[Tuple[Optional[float], int]] = [(rate, 0) for rate in rates] or [(None, c) for c in concurrency]
+        for name in scenarios:
+            scenario = SCENARIOS[name]
+            if warmup > 0:
+                asyncio.run(run_step(api_url, pipeline_id, scenario, duration=warmup, concurrency=2))
+            for index, (rate, clients) in enumerate(levels):
+                calls_before = model_app.state.calls
+                sampler = SaturationSampler()
+                sampler.start()
+                step = asyncio.run(
+                    run_step(api_url, pipeline_id, scenario, duration=duration, rate=rate, concurrency=clients, seed=index)
+                )
+                step["saturation"] = sampler.stop()
+                step["model_calls"] = model_app.state.calls - calls_before
+                steps.append(step)
+                echo(format_step(step))
+    finally:
+        api.stop()
+        model.stop()
+        model_client.close()
+    return {
+        "strategy": strategy,
+        "duration_s": duration,
+        "model": model_options,
+        "workdir": str(workdir),
+        "steps": steps,
+    }
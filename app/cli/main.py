@@ -1,18 +1,36 @@
+import atexit
 import json
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import httpx
 import typer
 
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
 API_URL = typer.Option("http://localhost:8000/api/v1", "--api-url", help="Base API URL")
 
 app = typer.Typer(help="Document pipeline CLI")
 
+_client: Optional["httpx.Client"] = None
+
+
+def _get_client() -> "httpx.Client":
+    """Return a process-wide keep-alive client; httpx is imported on first use."""
+    global _client
+    if _client is None:
+        import httpx
+
+        _client = httpx.Client(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        )
+        atexit.register(_client.close)
+    return _client
+
 
 def _request(method: str, url: str, **kwargs):
-    with httpx.Client() as client:
-        response = client.request(method, url, **kwargs)
+    response = _get_client().request(method, url, **kwargs)
     response.raise_for_status()
     payload = response.json()
     if not payload.get("success", False):
@@ -45,26 +63,47 @@ def pipelines_run(
     document_id: Optional[str] = typer.Option(None),
     file_path: Optional[str] = typer.Option(None),
     text: Optional[str] = typer.Option(None, "--text"),
+    priority: Optional[str] = typer.Option(None, help="high, normal or low"),
+    preview: bool = typer.Option(False, help="Execute without writing anything and show node outputs"),
+    sample_chunks: Optional[int] = typer.Option(None, help="Preview only the first N chunks"),
+    definition: Optional[Path] = typer.Option(None, help="Preview a draft definition from a JSON file"),
     api_url: str = API_URL,
 ):
     body = {
         "document_id": document_id,
         "file_path": file_path,
         "text_payload": text,
+        "priority": priority,
     }
+    if preview:
+        body.update(preview=True, sample_chunks=sample_chunks)
+        if definition is not None:
+            body["definition"] = json.loads(definition.read_text())
     data = _request("POST", f"{api_url}/pipelines/{pipeline_id}/run", json=body)
     typer.echo(json.dumps(data, indent=2))
 
 
 @app.command()
-def runs_status(run_id: str, api_url: str = API_URL):
-    data = _request("GET", f"{api_url}/runs/{run_id}")
+def runs_status(run_id: str, api_url: str = API_URL, fields: Optional[str] = None):
+    data = _request("GET", f"{api_url}/runs/{run_id}", params={"fields": fields})
+    typer.echo(json.dumps(data, indent=2))
+
+
+@app.command()
+def runs_resume(run_id: str, api_url: str = API_URL):
+    data = _request("POST", f"{api_url}/runs/{run_id}/resume")
+    typer.echo(json.dumps(data, indent=2))
+
+
+@app.command()
+def runs_nodes(run_id: str, api_url: str = API_URL):
+    data = _request("GET", f"{api_url}/runs/{run_id}/nodes")
     typer.echo(json.dumps(data, indent=2))
 
 
 @app.command()
-def runs_list(api_url: str = API_URL, pipeline_id: Optional[str] = None):
-    params = {"pipeline_id": pipeline_id}
+def runs_list(api_url: str = API_URL, pipeline_id: Optional[str] = None, fields: Optional[str] = None):
+    params = {"pipeline_id": pipeline_id, "fields": fields}
     data = _request("GET", f"{api_url}/runs", params=params)
     typer.echo(json.dumps(data, indent=2))
 
@@ -81,5 +120,330 @@ def documents_register(file_path: str, mime_type: Optional[str] = None, api_url:
     typer.echo(json.dumps(data, indent=2))
 
 
+def _guess_mime_type(path: Path) -> str:
+    import mimetypes
+
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+@app.command()
+def documents_upload(file_path: Path, mime_type: Optional[str] = None, api_url: str = API_URL):
+    with file_path.open("rb") as handle:
+        data = _request(
+            "POST",
+            f"{api_url}/documents/upload",
+            params={"file_name": file_path.name},
+            headers={"Content-Type": mime_type or _guess_mime_type(file_path)},
+            content=handle,
+        )
+    typer.echo(json.dumps(data, indent=2))
+
+
+@app.command()
+def documents_ingest_dir(
+    directory: Path,
+    pattern: str = typer.Option("*", "--glob", help="Filename glob, e.g. '*.pdf'"),
+    min_size: int = typer.Option(0, help="Skip files smaller than this many bytes"),
+    max_size: Optional[int] = typer.Option(None, help="Skip files larger than this many bytes"),
+    concurrency: int = typer.Option(8, min=1, max=64, help="Concurrent in-flight requests"),
+    retries: int = typer.Option(3, min=0, help="Retries for transient HTTP failures"),
+    manifest: Optional[Path] = typer.Option(None, help="JSONL manifest used to resume interrupted runs"),
+    upload: bool = typer.Option(False, help="Stream file bytes to the API instead of registering paths"),
+    mime_type: Optional[str] = None,
+    api_url: str = API_URL,
+):
+    from .ingest import ingest_directory, request_with_retry
+
+    client = _get_client()
+
+    def _submit(path: Path, size: int) -> dict:
+        if upload:
+            response = request_with_retry(
+                client,
+                "POST",
+                f"{api_url}/documents/upload",
+                retries=retries,
+                params={"file_name": path.name},
+                headers={"Content-Type": mime_type or _guess_mime_type(path)},
+                content_factory=lambda: path.open("rb"),
+            )
+            response.raise_for_status()
+            return {"document_id": response.json()["data"]["id"]}
+
+        payload = {
+            "source_type": "file_path",
+            "file_name": path.name,
+            "mime_type": mime_type,
+            "storage_uri": str(path),
+            "metadata": {"size_bytes": size},
+        }
+        response = request_with_retry(client, "POST", f"{api_url}/documents", retries=retries, json=payload)
+        response.raise_for_status()
+        return {"document_id": response.json()["data"]["id"]}
+
+    summary = ingest_directory(
+        directory,
+        submit=_submit,
+        pattern=pattern,
+        min_size=min_size,
+        max_size=max_size,
+        concurrency=concurrency,
+        manifest_path=manifest,
+    )
+    typer.echo(json.dumps(summary, indent=2))
+    if summary["failed"]:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def loadtest(
+    scenario: str = typer.Option("mixed", help="Comma-separated scenarios: mixed, runs, small-invoices, large-documents, reads"),
+    rates: Optional[str] = typer.Option(None, help="Comma-separated arrival rates per second (open loop), e.g. 5,10,20,40"),
+    concurrency: str = typer.Option("8", help="Comma-separated client counts (closed loop), used when --rates is not set"),
+    duration: float = typer.Option(30.0, help="Seconds per load level"),
+    warmup: float = typer.Option(5.0, help="Unrecorded warm-up seconds per scenario"),
+    strategy: str = typer.Option("default", help="LLMProcessingNode strategy: default, packed or map_reduce"),
+    model_latency_ms: float = typer.Option(200.0, help="Mock model base latency"),
+    model_per_1k_tokens_ms: float = typer.Option(20.0, help="Mock model latency per 1000 prompt tokens"),
+    model_jitter_ms: float = typer.Option(50.0),
+    model_error_rate: float = typer.Option(0.0, min=0.0, max=1.0),
+    workdir: Optional[Path] = typer.Option(None, help="Scratch directory for the database and blobs (default: a temp dir)"),
+    output: Optional[Path] = typer.Option(None, help="Write the full JSON report here"),
+):
+    """Run the API and a mock model endpoint in-process and measure them under load; loopback only."""
+    import tempfile
+
+    from .loadtest import SCENARIOS, run_loadtest
+
+    names = [name.strip() for name in scenario.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise typer.BadParameter(f"Unknown scenarios: {', '.join(unknown)}")
+    workdir = workdir or Path(tempfile.mkdtemp(prefix="loadtest-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    report = run_loadtest(
+        scenarios=names,
+        rates=[float(r) for r in rates.split(",")] if rates else [],
+        concurrency=[int(c) for c in concurrency.split(",")],
+        duration=duration,
+        warmup=warmup,
+        strategy=strategy,
+        workdir=workdir,
+        model_options={
+            "latency_ms": model_latency_ms,
+            "per_1k_tokens_ms": model_per_1k_tokens_ms,
+            "jitter_ms": model_jitter_ms,
+            "error_rate": model_error_rate,
+        },
+        echo=typer.echo,
+    )
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+        typer.echo(f"Report written to {output}")
+
+
+@app.command()
+def db_bench(
+    profiles: str = typer.Option("default,sqlite", help="Comma-separated DB_PROFILE values to compare"),
+    writers: str = typer.Option("1,4,16", help="Comma-separated concurrent writer counts"),
+    readers: int = typer.Option(1, min=0, help="Threads counting chunks while the writers run"),
+    duration: float = typer.Option(10.0, help="Seconds per profile and writer count"),
+    chunks_per_document: int = typer.Option(50, min=1),
+    chunk_chars: int = typer.Option(1000, min=1),
+    database_url: Optional[str] = typer.Option(None, help="Benchmark this database (e.g. Postgres) instead of scratch SQLite files"),
+    workdir: Optional[Path] = typer.Option(None, help="Scratch directory for SQLite files and blobs (default: a temp dir)"),
+    output: Optional[Path] = typer.Option(None, help="Write the full JSON report here"),
+):
+    """Compare storage profiles with concurrent writers registering documents and ingesting chunks."""
+    import tempfile
+
+    from .dbbench import run_dbbench
+
+    workdir = workdir or Path(tempfile.mkdtemp(prefix="dbbench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    report = run_dbbench(
+        profiles=[name.strip() for name in profiles.split(",") if name.strip()],
+        writers=[int(count) for count in writers.split(",")],
+        readers=readers,
+        duration=duration,
+        chunks_per_document=chunks_per_document,
+        chunk_chars=chunk_chars,
+        workdir=workdir,
+        database_url=database_url,
+        echo=typer.echo,
+    )
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+        typer.echo(f"Report written to {output}")
+
+
+@app.command()
+def db_migrate():
+    """Create missing tables locally and record the schema version."""
+    from ..core.init_db import SCHEMA_VERSION, create_all_tables
+
+    create_all_tables()
+    typer.echo(json.dumps({"schema_version": SCHEMA_VERSION}, indent=2))
+
+
+@app.command()
+def workers(
+    processes: int = typer.Option(1, min=1, help="Worker processes to run on this host"),
+    threads: int = typer.Option(1, min=1, help="Runs each process executes concurrently"),
+):
+    """Claim and execute queued runs until SIGTERM/SIGINT; the current run is finished first."""
+    from ..services.worker_pool import run_workers
+
+    run_workers(processes, threads)
+
+
+@app.command()
+def folders_watch(
+    directory: Path,
+    pipeline_id: str = typer.Option(..., help="Pipeline that receives a file_path run per new file"),
+    pattern: str = typer.Option("*", "--glob"),
+    batch_size: int = typer.Option(100, min=1, help="Runs queued per transaction"),
+    interval: float = typer.Option(10.0, help="Seconds between rescans when inotify is unavailable"),
+    settle_seconds: float = typer.Option(5.0, help="Ignore files modified more recently than this"),
+    priority: str = typer.Option("normal"),
+    once: bool = typer.Option(False, help="Run a single pass and exit"),
+    full: bool = typer.Option(False, help="List every directory instead of only those whose mtime changed"),
+):
+    """Index a directory tree and queue runs for new or changed files (requires running workers)."""
+    import signal
+    import threading
+    from uuid import UUID
+
+    from ..core.db import get_session_factory
+    from ..core.logging import configure_logging
+    from ..services.folder_watcher import FolderWatcher
+
+    configure_logging()
+    with get_session_factory()() as db:
+        watcher = FolderWatcher(
+            db,
+            root=directory,
+            pipeline_id=UUID(pipeline_id),
+            pattern=pattern,
+            batch_size=batch_size,
+            settle_seconds=settle_seconds,
+            priority=priority,
+        )
+        if once:
+            watcher.scan(full=full)
+        else:
+            stop_event = threading.Event()
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+            signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+            watcher.run(interval=interval, stop_event=stop_event)
+    typer.echo(json.dumps(watcher.stats, indent=2))
+
+
+@app.command()
+def retention_policy_set(
+    retain_days: int = typer.Option(..., min=0),
+    pipeline_id: Optional[str] = typer.Option(None),
+    use_case: Optional[str] = typer.Option(None),
+    archive: bool = typer.Option(True, help="Archive runs before deleting them"),
+):
+    from uuid import UUID
+
+    from ..core.db import get_session_factory
+    from ..services import retention_service
+
+    with get_session_factory()() as db:
+        try:
+            policy = retention_service.set_policy(
+                db,
+                retain_days=retain_days,
+                pipeline_id=UUID(pipeline_id) if pipeline_id else None,
+                use_case=use_case,
+                archive=archive,
+            )
+        except ValueError as exc:
+            typer.echo(str(exc), err=True)
+            raise typer.Exit(code=1)
+        typer.echo(json.dumps({"id": str(policy.id), "retain_days": policy.retain_days}, indent=2))
+
+
+@app.command()
+def retention_run(
+    batch_size: Optional[int] = typer.Option(None, help="Runs archived and deleted per transaction"),
+    max_batches: Optional[int] = typer.Option(None, help="Stop after this many batches; rerun to continue"),
+    dry_run: bool = typer.Option(False),
+    compact: bool = typer.Option(False, help="Reclaim freed space after deleting"),
+    sweep_blobs: bool = typer.Option(True, help="Delete stored blob values that no row references any more"),
+):
+    from ..core.db import get_session_factory
+    from ..core.logging import configure_logging
+    from ..services import blob_service, retention_service
+
+    configure_logging()
+    with get_session_factory()() as db:
+        report = retention_service.apply_retention(
+            db, batch_size=batch_size, max_batches=max_batches, dry_run=dry_run
+        )
+        if sweep_blobs:
+            report["blobs"] = blob_service.collect_garbage(db, dry_run=dry_run)
+        if compact and not dry_run and report["deleted"]:
+            retention_service.compact(db)
+    typer.echo(json.dumps(report, indent=2))
+
+
+@app.command()
+def stats_backfill(pipeline_id: Optional[str] = typer.Option(None, help="Only rebuild this pipeline")):
+    """Rebuild run statistics from pipeline_runs for every hour before the current one."""
+    from uuid import UUID
+
+    from ..core.db import get_session_factory
+    from ..core.logging import configure_logging
+    from ..services import run_stats_service
+
+    configure_logging()
+    with get_session_factory()() as db:
+        report = run_stats_service.rebuild(db, pipeline_id=UUID(pipeline_id) if pipeline_id else None)
+    typer.echo(json.dumps(report, indent=2))
+
+
+@app.command()
+def search_reindex(batch_size: int = typer.Option(100, help="Runs indexed per transaction")):
+    from ..core.db import get_session_factory
+    from ..core.logging import configure_logging
+    from ..services import search_service
+
+    configure_logging()
+    with get_session_factory()() as db:
+        runs = search_service.reindex(db, batch_size=batch_size)
+    typer.echo(f"Indexed {runs} runs")
+
+
+@app.command()
+def blobs_offload(batch_size: int = typer.Option(500, help="Rows rewritten per transaction")):
+    from ..core.db import get_session_factory
+    from ..core.logging import configure_logging
+    from ..services import blob_service
+
+    configure_logging()
+    with get_session_factory()() as db:
+        report = blob_service.offload_existing(db, batch_size=batch_size)
+    typer.echo(json.dumps(report, indent=2))
+
+
+@app.command()
+def retention_restore(run_id: str):
+    from uuid import UUID
+
+    from ..core.db import get_session_factory
+    from ..services import retention_service
+
+    with get_session_factory()() as db:
+        try:
+            run = retention_service.restore_run(db, UUID(run_id))
+        except ValueError as exc:
+            typer.echo(str(exc), err=True)
+            raise typer.Exit(code=1)
+        typer.echo(json.dumps({"id": str(run.id), "status": run.status, "restored": True}, indent=2))
+
+
 if __name__ == "__main__":
     app()
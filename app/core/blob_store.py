@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Type
+
+from .config import get_settings
+from .serialization import dumps
+
+# Inline text starting with this prefix is always offloaded, so a stored value can never be mistaken for a reference.
+REF_PREFIX = "blob:"
+JSON_REF_KEY = "$blob"
+
+
+class BlobNotFound(LookupError):
+    pass
+
+
+class FilesystemBlobStore:
+    """Compressed, content-addressed values under ``<root>/values``; identical values share one file."""
+
+    def __init__(self, root: Path, compression_level: int = 6) -> None:
+        self.root = Path(root) / "values"
+        self.compression_level = compression_level
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.z"
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        try:
+            os.utime(path)  # a new reference: restart the garbage sweep's grace period
+            return key
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(zlib.compress(data, self.compression_level))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as handle:
+                return zlib.decompress(handle.read())
+        except FileNotFoundError:
+            raise BlobNotFound(key) from None
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def iter_keys(self, *, older_than: float) -> Iterator[str]:
+        """Keys whose value was last written (or put again) before the ``older_than`` timestamp."""
+        for path in self.root.glob("*/*.z"):
+            try:
+                if path.stat().st_mtime < older_than:
+                    yield path.stem
+            except FileNotFoundError:
+                continue
+
+    def delete(self, key: str, *, older_than: float) -> bool:
+        """Remove a value unless it was put again since ``older_than``; returns whether it was removed."""
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime >= older_than:
+                return False
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+BLOB_BACKENDS: Dict[str, Type[FilesystemBlobStore]] = {
+    "filesystem": FilesystemBlobStore,
+}
+
+
+@lru_cache()
+def get_blob_store() -> FilesystemBlobStore:
+    settings = get_settings()
+    backend = BLOB_BACKENDS[settings.blob_store_backend]
+    return backend(Path(settings.blob_dir), compression_level=settings.blob_compression_level)
+
+
+def offload_text(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    data = value.encode("utf-8")
+    if len(data) <= get_settings().blob_inline_max_bytes and not value.startswith(REF_PREFIX):
+        return value
+    return REF_PREFIX + get_blob_store().put(data)
+
+
+def resolve_text(value: Optional[str]) -> Optional[str]:
+    if value is None or not value.startswith(REF_PREFIX):
+        return value
+    return get_blob_store().get(value[len(REF_PREFIX) :]).decode("utf-8")
+
+
+def offload_json(value: Any) -> Any:
+    if value is None:
+        return None
+    data = dumps(value)
+    if len(data) <= get_settings().blob_inline_max_bytes and not is_reference(value):
+        return value
+    return {JSON_REF_KEY: get_blob_store().put(data)}
+
+
+def resolve_json(value: Any) -> Any:
+    if not is_reference(value) or isinstance(value, str):
+        return value
+    return json.loads(get_blob_store().get(value[JSON_REF_KEY]))
+
+
+def referenced_key(raw: Optional[str]) -> Optional[str]:
+    """The blob key held by a raw (unprocessed) column value, if it is a reference."""
+    if not raw:
+        return None
+    if raw.startswith(REF_PREFIX):
+        return raw[len(REF_PREFIX) :]
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        return None
+    return value[JSON_REF_KEY] if is_reference(value) and isinstance(value, dict) else None
+
+
+def is_reference(value: object) -> bool:
+    if isinstance(value, str):
+        return value.startswith(REF_PREFIX)
+    return isinstance(value, dict) and set(value) == {JSON_REF_KEY}
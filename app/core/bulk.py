@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from .db import get_db_profile
+
+
+def copy_enabled(db: Session) -> bool:
+    """True when inserts on this session's database should go through Postgres ``COPY``."""
+    return db.get_bind().dialect.name == "postgresql" and getattr(get_db_profile(), "copy_bulk_inserts", False)
+
+
+def insert_rows(db: Session, model: Any, rows: Sequence[Dict[str, Any]]) -> None:
+    """Insert plain row dicts in the session's transaction: ``COPY`` on Postgres, one multi-row INSERT elsewhere."""
+    if not rows:
+        return
+    if copy_enabled(db):
+        copy_rows(db, model, rows)
+    else:
+        db.execute(insert(model), list(rows))
+
+
+def _csv_field(value: Any) -> str:
+    if value is None:
+        return ""  # unquoted empty field is NULL in CSV COPY
+    if isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif hasattr(value, "obj"):  # psycopg 3 Json/Jsonb wrappers
+        value = json.dumps(value.obj)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_rows(db: Session, model: Any, rows: Sequence[Dict[str, Any]], *, allocate_ids: bool = False) -> List[Any]:
+    """``COPY`` rows into ``model``'s table through the session's connection; returns the primary keys.
+
+    Values go through each column's bind processing (so blob offloading and JSON encoding still
+    apply) and Python-side defaults are filled in, since ``COPY`` bypasses both. With
+    ``allocate_ids`` an integer serial key is reserved from its sequence first.
+    """
+    db.flush()  # COPY goes around the session, so pending ORM rows must be written first
+    table = model.__table__
+    rows = [dict(row) for row in rows]
+    (pk,) = table.primary_key.columns
+    if allocate_ids:
+        sequence = db.execute(text("SELECT pg_get_serial_sequence(:table, :column)"), {"table": table.name, "column": pk.name}).scalar()
+        ids = db.execute(
+            text("SELECT nextval(CAST(:sequence AS regclass)) FROM generate_series(1, :count)"),
+            {"sequence": sequence, "count": len(rows)},
+        ).scalars().all()
+        for row, new_id in zip(rows, ids):
+            row[pk.key] = new_id
+
+    names = set().union(*(row.keys() for row in rows))
+    defaults = {
+        column.key: column.default
+        for column in table.columns
+        if column.default is not None and not column.default.is_sequence and not column.default.is_clause_element
+    }
+    columns = [column for column in table.columns if column.key in names or column.key in defaults]
+    connection = db.connection()
+    dialect = connection.dialect
+    processors = {column.key: column.type.dialect_impl(dialect).bind_processor(dialect) for column in columns}
+
+    buffer = io.StringIO()
+    for row in rows:
+        fields = []
+        for column in columns:
+            if column.key in row:
+                value = row[column.key]
+            elif column.key in defaults:
+                default = defaults[column.key]
+                value = default.arg(None) if default.is_callable else default.arg
+                row[column.key] = value
+            else:
+                value = None
+            processor = processors[column.key]
+            fields.append(_csv_field(processor(value) if processor is not None else value))
+        buffer.write(",".join(fields) + "\n")
+
+    statement = f"COPY {table.name} ({', '.join(column.name for column in columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+    return [row.get(pk.key) for row in rows]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .config import get_settings
+
+_MISSING = object()
+
+
+class ReadThroughCache:
+    """Process-local LRU cache with per-entry TTL and a shared version stamp.
+
+    ``sync_version`` is called with a reader for the namespace's version stamp (a single-row
+    lookup shared by every process); when another process has bumped it, the whole namespace
+    is dropped. The reader is consulted at most once per ``version_poll_seconds``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        version_poll_seconds: float,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_poll_seconds = version_poll_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def sync_version(self, read_version: Callable[[], int]) -> None:
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_poll_seconds:
+            return
+        version = read_version()
+        with self._lock:
+            self._version_checked_at = now
+            if self._version is not None and version != self._version:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+
+        value = loader()
+        if value is not None:  # misses are not cached so newly created rows show up immediately
+            self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._version = None
+            self._version_checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "version": self._version,
+        }
+
+
+_caches: Dict[str, ReadThroughCache] = {}
+
+
+def get_cache(name: str) -> ReadThroughCache:
+    cache = _caches.get(name)
+    if cache is None:
+        settings = get_settings()
+        cache = _caches.setdefault(
+            name,
+            ReadThroughCache(
+                name,
+                max_entries=settings.cache_max_entries,
+                ttl_seconds=settings.cache_ttl_seconds,
+                version_poll_seconds=settings.cache_version_poll_seconds,
+            ),
+        )
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -1,16 +1,71 @@
 from functools import lru_cache
-from pydantic import BaseSettings, AnyUrl
-from typing import Optional
+from pydantic import BaseSettings, AnyUrl, Field
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
     app_name: str = "Document Pipeline API"
     database_url: str = "sqlite+aiosqlite:///./app.db"
     sync_database_url: str = "sqlite:///./app.db"
+    db_profile: str = "auto"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = Field(default="NORMAL", regex="^(OFF|NORMAL|FULL|EXTRA)$")
+    sqlite_mmap_bytes: int = 256 * 1024 * 1024
+    sqlite_writer_queue: bool = True
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_copy_bulk_inserts: bool = True
     milvus_uri: Optional[AnyUrl] = None
     milvus_collection: str = "pipeline_chunks"
     milvus_embedding_dim: int = 128
     enable_background_workers: bool = False
+    auto_migrate: bool = True
+    blob_dir: str = "./blobs"
+    # directories (besides blob_dir) that file_path runs and storage_uri documents may read from
+    ingest_roots: List[str] = []
+    blob_store_backend: str = "filesystem"
+    # above ingest_chunk_chars, so ordinary chunks stay in their rows
+    blob_inline_max_bytes: int = 16 * 1024
+    blob_gc_grace_seconds: int = 3600
+    blob_compression_level: int = 6
+    upload_chunk_size: int = 1024 * 1024
+    max_upload_bytes: int = 512 * 1024 * 1024
+    bulk_batch_size: int = 5000
+    bulk_max_line_bytes: int = 1024 * 1024
+    cache_max_entries: int = 1024
+    cache_ttl_seconds: float = 300.0
+    cache_version_poll_seconds: float = 2.0
+    ingest_chunk_chars: int = 4000
+    map_window_chars: int = 16000
+    llm_endpoint_url: Optional[str] = None
+    llm_timeout_seconds: float = 30.0
+    llm_context_tokens: int = 8192
+    llm_max_output_tokens: int = 1024
+    pack_max_wait_ms: int = 50
+    search_index_enabled: bool = True
+    extraction_workers: int = 0
+    extraction_timeout_seconds: int = 60
+    extraction_memory_limit_mb: Optional[int] = 1024
+    node_max_attempts: int = 1
+    node_retry_backoff_seconds: float = 1.0
+    scheduler_max_concurrent_runs: int = 8
+    scheduler_max_runs_per_pipeline: int = 4
+    scheduler_max_queue_depth: int = 64
+    # waiters hold request threads: keep max_concurrent_runs + max_waiting well under the threadpool (40)
+    scheduler_max_waiting: int = 16
+    scheduler_queue_timeout_seconds: float = 30.0
+    scheduler_use_case_weights: Dict[str, float] = {"invoice_processing": 3.0, "foia_request": 1.0, "generic": 1.0}
+    idempotency_derive_keys: bool = True
+    idempotency_window_seconds: int = 24 * 3600
+    worker_lease_seconds: int = 60
+    worker_poll_interval_seconds: float = 1.0
+    worker_max_attempts: int = 3
+    worker_max_queued_runs: int = 10000
+    archive_dir: str = "./archive"
+    retention_default_days: Optional[int] = None
+    retention_batch_size: int = 100
 
     class Config:
         env_file = ".env"
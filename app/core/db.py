@@ -1,28 +1,73 @@
-from typing import Generator, AsyncGenerator
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Dict, Generator
 
 from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from .config import get_settings
+from .db_profiles import StorageProfile, make_profile
 
-settings = get_settings()
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-async_engine = create_async_engine(settings.database_url, echo=False, future=True)
-AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
-sync_engine = create_engine(settings.sync_database_url, echo=False, future=True)
-SessionLocal = sessionmaker(sync_engine, expire_on_commit=False)
+@lru_cache()
+def get_db_profile() -> StorageProfile:
+    settings = get_settings()
+    return make_profile(settings.db_profile, settings.sync_database_url)
+
+
+@lru_cache()
+def get_sync_engine() -> Engine:
+    settings = get_settings()
+    profile = get_db_profile()
+    engine = create_engine(
+        settings.sync_database_url, echo=False, future=True, **profile.engine_options(settings, is_async=False)
+    )
+    profile.configure(engine, settings, is_async=False)
+    return engine
+
+
+@lru_cache()
+def get_async_engine() -> "AsyncEngine":
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    settings = get_settings()
+    profile = make_profile(settings.db_profile, settings.database_url)
+    engine = create_async_engine(
+        settings.database_url, echo=False, future=True, **profile.engine_options(settings, is_async=True)
+    )
+    profile.configure(engine.sync_engine, settings, is_async=True)
+    return engine
+
+
+def database_stats() -> Dict[str, Any]:
+    stats = get_db_profile().stats()
+    stats["pool"] = get_sync_engine().pool.status()
+    return stats
+
+
+@lru_cache()
+def get_session_factory() -> sessionmaker:
+    return sessionmaker(get_sync_engine(), expire_on_commit=False)
+
+
+@lru_cache()
+def get_async_session_factory() -> sessionmaker:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    return sessionmaker(get_async_engine(), class_=AsyncSession, expire_on_commit=False)
 
 
 def get_db() -> Generator:
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
 
 
-async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    async with get_async_session_factory()() as session:
         yield session
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import Settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+_HELD = "writer_queue_held"
+
+
+class WriterQueue:
+    """Lets one write transaction per process at a time reach SQLite; the others wait their turn.
+
+    The slot is taken before a connection's first INSERT/UPDATE/DELETE and given back when its
+    transaction ends (or the connection returns to the pool). Waiting here instead of inside SQLite
+    turns lock contention into an orderly queue; SQLite's busy timeout still covers writers in
+    other processes and any writer that gives up after ``timeout`` seconds.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._owner: Optional[int] = None
+        self._stats_lock = threading.Lock()
+        self.stats = {"writes": 0, "waited": 0, "timeouts": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "commit", self._end)
+        event.listen(engine, "rollback", self._end)
+        event.listen(engine.pool, "checkin", self._checkin)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if conn.info.get(_HELD) or not statement.lstrip()[:7].upper().startswith(_WRITE_PREFIXES):
+            return
+        if self._owner == threading.get_ident():
+            return  # a second connection in the writing thread; waiting here would deadlock
+        started = time.perf_counter()
+        acquired = self._lock.acquire(timeout=self.timeout)
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.stats["writes"] += 1
+            if waited_ms >= 1:
+                self.stats["waited"] += 1
+            self.stats["wait_ms_total"] += waited_ms
+            self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], waited_ms)
+            if not acquired:
+                self.stats["timeouts"] += 1
+        if not acquired:
+            logger.warning("Writer queue wait timed out; relying on the busy timeout", extra={"waited_ms": round(waited_ms)})
+            return
+        self._owner = threading.get_ident()
+        conn.info[_HELD] = True
+
+    def _release(self, info: Dict[str, Any]) -> None:
+        if info.pop(_HELD, False):
+            self._owner = None
+            self._lock.release()
+
+    def _end(self, conn) -> None:
+        # fires just before the DBAPI commit/rollback; the busy timeout absorbs the short overlap
+        self._release(conn.info)
+
+    def _checkin(self, dbapi_connection, connection_record) -> None:
+        if connection_record is not None:
+            self._release(connection_record.info)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["wait_ms_total"] = round(stats["wait_ms_total"], 1)
+        stats["wait_ms_max"] = round(stats["wait_ms_max"], 1)
+        return stats
+
+
+class StorageProfile:
+    """Engine options and per-connection setup for one kind of database; the default changes nothing."""
+
+    name = "default"
+    dialect: Optional[str] = None
+
+    def engine_options(self, settings: Settings, *, is_async: bool) -> Dict[str, Any]:
+        return {}
+
+    def configure(self, engine: Engine, settings: Settings, *, is_async: bool) -> None:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"profile": self.name}
+
+
+class SQLiteProfile(StorageProfile):
+    """WAL journal, ``synchronous`` relaxed to NORMAL, memory-mapped reads, a busy timeout and a writer queue."""
+
+    name = "sqlite"
+    dialect = "sqlite"
+
+    def __init__(self) -> None:
+        self.writer_queue: Optional[WriterQueue] = None
+
+    def engine_options(self, settings: Settings, *, is_async: bool) -> Dict[str, Any]:
+        return {"connect_args": {"timeout": settings.sqlite_busy_timeout_ms / 1000, "check_same_thread": False}}
+
+    def configure(self, engine: Engine, settings: Settings, *, is_async: bool) -> None:
+        pragmas = (
+            # only takes effect while the file has no tables, and must come before the switch to WAL
+            "PRAGMA auto_vacuum=INCREMENTAL",
+            "PRAGMA journal_mode=WAL",
+            f"PRAGMA synchronous={settings.sqlite_synchronous}",
+            f"PRAGMA mmap_size={int(settings.sqlite_mmap_bytes)}",
+            f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        )
+
+        def _apply_pragmas(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+        event.listen(engine, "connect", _apply_pragmas)
+        # the async engine only serves short reads; queueing is for the sync writers
+        if settings.sqlite_writer_queue and not is_async:
+            self.writer_queue = WriterQueue(settings.sqlite_busy_timeout_ms / 1000)
+            self.writer_queue.attach(engine)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"profile": self.name, "writer_queue": self.writer_queue.snapshot() if self.writer_queue else None}
+
+
+class PostgresProfile(StorageProfile):
+    """A sized, pre-pinged connection pool; bulk chunk and staged-row inserts use ``COPY``."""
+
+    name = "postgres"
+    dialect = "postgresql"
+
+    def __init__(self) -> None:
+        self.copy_bulk_inserts = False
+
+    def engine_options(self, settings: Settings, *, is_async: bool) -> Dict[str, Any]:
+        return {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout_seconds,
+            "pool_recycle": settings.db_pool_recycle_seconds,
+            "pool_pre_ping": True,
+        }
+
+    def configure(self, engine: Engine, settings: Settings, *, is_async: bool) -> None:
+        self.copy_bulk_inserts = settings.db_copy_bulk_inserts
+
+    def stats(self) -> Dict[str, Any]:
+        return {"profile": self.name, "copy_bulk_inserts": self.copy_bulk_inserts}
+
+
+DB_PROFILES = {
+    "default": StorageProfile,
+    "sqlite": SQLiteProfile,
+    "postgres": PostgresProfile,
+}
+
+
+def make_profile(name: str, url: str) -> StorageProfile:
+    """Build the profile called ``name``; ``auto`` picks one from the database URL."""
+    dialect = url.split(":", 1)[0].split("+", 1)[0]
+    if name == "auto":
+        name = {"sqlite": "sqlite", "postgresql": "postgres"}.get(dialect, "default")
+    if name not in DB_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {name!r}; expected auto or one of {', '.join(DB_PROFILES)}")
+    profile = DB_PROFILES[name]()
+    if profile.dialect is not None and profile.dialect != dialect:
+        raise ValueError(f"DB_PROFILE {name!r} does not apply to a {dialect} database")
+    return profile
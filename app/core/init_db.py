@@ -1,12 +1,127 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..models import cache_model  # noqa: F401
+from ..models import checkpoint_model  # noqa: F401
 from ..models import document_model  # noqa: F401
 from ..models import foia_model  # noqa: F401
 from ..models import invoice_model  # noqa: F401
 from ..models import pipeline_model  # noqa: F401
+from ..models import retention_model  # noqa: F401
 from ..models import staging_model  # noqa: F401
+from ..models import stats_model  # noqa: F401
 from ..models import validation_model  # noqa: F401
+from ..models import watch_model  # noqa: F401
 from ..models.base import Base
-from .db import sync_engine
+from ..models.schema_model import SchemaVersion
+from ..models.search_model import LEGACY_SEARCH_DROP_DDL, SEARCH_INDEX_DDL
+from .db import get_session_factory, get_sync_engine
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump whenever a model change requires new tables or columns.
+SCHEMA_VERSION = 11
+
+
+def _upgrade_existing_tables(engine: Engine) -> None:
+    """``create_all`` never alters existing tables, so add columns and indexes introduced by later schema versions.
+
+    New columns on existing tables must be nullable or carry a ``server_default``.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    if isinstance(default, str):
+                        default = "'" + default.replace("'", "''") + "'"
+                    else:
+                        default = default.text
+                    ddl += f" DEFAULT {default}"
+                conn.exec_driver_sql(ddl)
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+
+
+def _drop_legacy_search_index(engine: Engine) -> None:
+    """Drop a search index that still copies the text into ``search_entries.body``; rebuild with ``search-reindex``."""
+    inspector = inspect(engine)
+    if "search_entries" not in inspector.get_table_names():
+        return
+    if "body" not in {column["name"] for column in inspector.get_columns("search_entries")}:
+        return
+    with engine.begin() as conn:
+        for statement in LEGACY_SEARCH_DROP_DDL.get(engine.dialect.name, ["DROP TABLE search_entries"]):
+            conn.exec_driver_sql(statement)
+    logger.warning("Dropped the old full-text index; run search-reindex to rebuild it")
+
+
+def _create_search_index(engine: Engine) -> None:
+    statements = SEARCH_INDEX_DDL.get(engine.dialect.name)
+    if not statements:
+        logger.warning("No full-text index for this database; search is disabled", extra={"dialect": engine.dialect.name})
+        return
+    try:
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+    except SQLAlchemyError:
+        # e.g. a SQLite build without FTS5; everything else keeps working
+        logger.exception("Could not create the full-text index")
+
+
+def _enable_incremental_vacuum(engine: Engine) -> None:
+    """New SQLite files get ``auto_vacuum=INCREMENTAL`` so retention's ``compact`` can shrink them."""
+    if engine.dialect.name != "sqlite" or inspect(engine).get_table_names():
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
 
 
 def create_all_tables() -> None:
-    Base.metadata.create_all(bind=sync_engine)
+    engine = get_sync_engine()
+    _enable_incremental_vacuum(engine)
+    _drop_legacy_search_index(engine)
+    _upgrade_existing_tables(engine)
+    Base.metadata.create_all(bind=engine)
+    _create_search_index(engine)
+    with get_session_factory()() as db:
+        marker = db.get(SchemaVersion, 1)
+        if marker is None:
+            marker = SchemaVersion(id=1, version=SCHEMA_VERSION)
+        marker.version = SCHEMA_VERSION
+        marker.applied_at = datetime.utcnow()
+        db.add(marker)
+        db.commit()
+
+
+def get_schema_version() -> int:
+    try:
+        with get_sync_engine().connect() as conn:
+            version = conn.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar()
+    except SQLAlchemyError:
+        return 0
+    return version or 0
+
+
+def ensure_schema() -> bool:
+    """Create tables only when the stored schema version is behind; returns True if it migrated."""
+    if get_schema_version() >= SCHEMA_VERSION:
+        return False
+    create_all_tables()
+    return True
@@ -15,5 +15,4 @@ def configure_logging(level: int = logging.INFO) -> None:
 
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
-    configure_logging()
     return logging.getLogger(name or get_settings().app_name)
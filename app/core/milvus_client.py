@@ -1,10 +1,29 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List, Optional
+import math
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
 
 from .config import get_settings
 
+_TOKEN = re.compile(r"\w+")
+
+
+def embed_text(text: str, dim: int) -> List[float]:
+    """Hashed bag-of-words embedding; deterministic across processes, so queries and stored rows agree."""
+    vector = [0.0] * dim
+    for token in _TOKEN.findall(text.lower()):
+        digest = zlib.crc32(token.encode("utf-8"))
+        vector[digest % dim] += -1.0 if digest & 0x80000000 else 1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+def _matches(record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    return all(record.get(key) == value for key, value in filters.items())
+
 
 class MilvusStubClient:
     """Minimal in-memory stand-in when Milvus is unavailable."""
@@ -18,6 +37,15 @@ class MilvusStubClient:
     def query(self, *, limit: int = 5, **kwargs: Any) -> List[Dict[str, Any]]:
         return list(reversed(self._store))[:limit]
 
+    def search(self, embedding: List[float], *, limit: int, filters: Dict[str, Any]) -> List[Tuple[str, float]]:
+        scored = [
+            (record["source_id"], sum(a * b for a, b in zip(embedding, record["embedding"])))
+            for record in self._store
+            if _matches(record, filters)
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
 
 class MilvusClient:
     def __init__(self) -> None:
@@ -77,6 +105,30 @@ class MilvusClient:
         else:  # pragma: no cover
             self._client.insert([record])
 
+    def search(
+        self, embedding: List[float], *, limit: int = 10, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """Return ``(source_id, similarity)`` pairs, most similar first."""
+        filters = {key: value for key, value in (filters or {}).items() if value is not None}
+        if self._client is None:
+            return []
+        if isinstance(self._client, MilvusStubClient):
+            return self._client.search(embedding, limit=limit, filters=filters)
+        expr = " and ".join(f'{key} == "{value}"' for key, value in filters.items()) or None
+        try:  # pragma: no cover - requires a Milvus server
+            self._client.load()
+            results = self._client.search(
+                data=[embedding],
+                anns_field="embedding",
+                param={"metric_type": "IP", "params": {}},
+                limit=limit,
+                expr=expr,
+                output_fields=["source_id"],
+            )
+        except Exception:
+            return []
+        return [(hit.entity.get("source_id"), float(hit.distance)) for hit in results[0]]
+
     def sample(self, limit: int = 5) -> List[Dict[str, Any]]:
         if self._client is None:
             return []
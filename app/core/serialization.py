@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips Pydantic validation and encodes plain rows directly."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ok_response(data: Any) -> FastJSONResponse:
+    return FastJSONResponse({"success": True, "data": data, "error": None})
+
+
+def parse_fields(fields: Optional[str], *, allowed: Sequence[str], default: Sequence[str]) -> List[str]:
+    """Turn a ``fields=a,b,c`` query value into a validated, ordered column list."""
+    if not fields:
+        return list(default)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
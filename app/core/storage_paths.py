@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+from .config import get_settings
+
+FILE_SCHEME = "file://"
+
+
+class UnsafeStoragePath(ValueError):
+    """A client-supplied path that does not resolve inside ``BLOB_DIR`` or one of ``INGEST_ROOTS``."""
+
+
+def allowed_roots() -> List[Path]:
+    settings = get_settings()
+    return [Path(root).resolve() for root in [settings.blob_dir, *settings.ingest_roots]]
+
+
+def resolve_storage_path(storage_uri: str) -> Path:
+    """Resolve a bare path or ``file://`` URI, refusing anything that lands outside the allowed roots.
+
+    Symlinks and ``..`` are resolved first, so neither can step out of a root.
+    """
+    if storage_uri.startswith(FILE_SCHEME):
+        storage_uri = storage_uri[len(FILE_SCHEME):]
+    elif "://" in storage_uri:
+        raise UnsafeStoragePath(f"Unsupported storage URI scheme: {storage_uri.split('://', 1)[0]}")
+    path = Path(storage_uri).resolve()
+    if not any(path == root or path.is_relative_to(root) for root in allowed_roots()):
+        raise UnsafeStoragePath(f"{storage_uri} is outside BLOB_DIR and INGEST_ROOTS")
+    return path
+
+
+def check_storage_uri(storage_uri: Optional[str]) -> None:
+    if storage_uri:
+        resolve_storage_path(storage_uri)
@@ -1,13 +1,9 @@
 from fastapi import FastAPI
 
-from .api import documents_router, health_router, pipelines_router, runs_router
+from .api import documents_router, health_router, pipelines_router, runs_router, search_router
 from .core.config import get_settings
-from .core.init_db import create_all_tables
 from .core.logging import configure_logging
 
-configure_logging()
-create_all_tables()
-
 settings = get_settings()
 app = FastAPI(title=settings.app_name)
 
@@ -15,6 +11,23 @@ app.include_router(health_router.router, prefix="/api/v1")
 app.include_router(pipelines_router.router, prefix="/api/v1")
 app.include_router(runs_router.router, prefix="/api/v1")
 app.include_router(documents_router.router, prefix="/api/v1")
+app.include_router(search_router.router, prefix="/api/v1")
+
+
+@app.on_event("startup")
+def on_startup() -> None:
+    configure_logging()
+    if settings.auto_migrate:
+        from .core.init_db import ensure_schema
+
+        ensure_schema()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    from .services.extraction_engine import shutdown_extraction_pool
+
+    shutdown_extraction_pool()
 
 
 @app.get("/")
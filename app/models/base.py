@@ -1,7 +1,9 @@
-from sqlalchemy import types
+from sqlalchemy import JSON, Text, types
 from sqlalchemy.dialects.postgresql import UUID as PGUUID  # type: ignore
 from sqlalchemy.orm import declarative_base
 
+from ..core import blob_store
+
 
 Base = declarative_base()
 
@@ -11,3 +13,29 @@ try:  # SQLAlchemy 2.0 provides a portable UUID type
 except AttributeError:  # pragma: no cover - legacy fallback
     class GUID(PGUUID):
         pass
+
+
+class BlobText(types.TypeDecorator):
+    """Text column whose large values live in the blob store; the row keeps a ``blob:<sha256>`` reference."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return blob_store.offload_text(value)
+
+    def process_result_value(self, value, dialect):
+        return blob_store.resolve_text(value)
+
+
+class BlobJSON(types.TypeDecorator):
+    """JSON column whose large documents live in the blob store; the row keeps ``{"$blob": <sha256>}``."""
+
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return blob_store.offload_json(value)
+
+    def process_result_value(self, value, dialect):
+        return blob_store.resolve_json(value)
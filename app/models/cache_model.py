@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from .base import Base
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from .base import Base, GUID
+
+CHECKPOINT_STATUSES = ("completed", "failed")
+
+
+class RunNodeCheckpoint(Base):
+    __tablename__ = "run_node_checkpoints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    pipeline_run_id = Column(GUID(as_uuid=True), ForeignKey("pipeline_runs.id"), nullable=False, index=True)
+    node_id = Column(String, nullable=False)
+    node_type = Column(String, nullable=False)
+    node_index = Column(Integer, nullable=False)
+    status = Column(Enum(*CHECKPOINT_STATUSES, name="checkpoint_status"), nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    output = Column(JSON)
+    error_message = Column(Text)
+    duration_ms = Column(Integer)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    pipeline_run = relationship("PipelineRun", back_populates="checkpoints")
+
+    __table_args__ = (
+        UniqueConstraint("pipeline_run_id", "node_id", name="uq_run_node_checkpoint"),
+        {
+            "sqlite_autoincrement": True,
+        },
+    )
@@ -1,10 +1,10 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, JSON, String, Text, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, JSON, String, UniqueConstraint
+from sqlalchemy.orm import deferred, relationship
 
-from .base import Base, GUID
+from .base import Base, BlobText, GUID
 
 DOCUMENT_SOURCE_TYPES = (
     "file_upload",
@@ -39,7 +39,7 @@ class IngestedChunk(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     document_id = Column(GUID(as_uuid=True), ForeignKey("documents.id"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
-    content = Column(Text, nullable=False)
+    content = deferred(Column(BlobText, nullable=False))
     metadata = Column(JSON)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
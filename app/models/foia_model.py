@@ -1,9 +1,10 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, JSON, String, Text
+from sqlalchemy import Column, DateTime, JSON, String
+from sqlalchemy.orm import deferred
 
-from .base import Base, GUID
+from .base import Base, BlobText, GUID
 
 
 class FOIAKnowledgeSource(Base):
@@ -13,6 +14,6 @@ class FOIAKnowledgeSource(Base):
     title = Column(String, nullable=False)
     category = Column(String, nullable=False)
     storage_uri = Column(String)
-    raw_text = Column(Text)
+    raw_text = deferred(Column(BlobText))
     metadata = Column(JSON)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
@@ -1,14 +1,16 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, JSON, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, JSON, String, Text
 from sqlalchemy.orm import relationship
 
-from .base import Base, GUID
+from .base import Base, BlobJSON, GUID
 
 
 PIPELINE_USE_CASES = ("invoice_processing", "foia_request", "generic")
 RUN_STATUSES = ("queued", "running", "succeeded", "failed")
+# Ordered from most to least urgent.
+RUN_PRIORITIES = ("high", "normal", "low")
 
 
 class Pipeline(Base):
@@ -31,9 +33,16 @@ class PipelineRun(Base):
 
     id = Column(GUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     pipeline_id = Column(GUID(as_uuid=True), ForeignKey("pipelines.id"), nullable=False)
-    status = Column(Enum(*RUN_STATUSES, name="pipeline_run_status"), nullable=False, default="queued")
+    status = Column(Enum(*RUN_STATUSES, name="pipeline_run_status"), nullable=False, default="queued", index=True)
     input_ref = Column(String)
-    result_summary = Column(JSON)
+    priority = Column(String, server_default="normal")
+    inputs = Column(JSON)
+    attempts = Column(Integer, server_default="0")
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime(timezone=True), index=True)
+    heartbeat_at = Column(DateTime(timezone=True))
+    idempotency_key = Column(String)
+    result_summary = Column(BlobJSON)
     error_message = Column(Text)
     logs_location = Column(String)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
@@ -43,3 +52,9 @@ class PipelineRun(Base):
     pipeline = relationship("Pipeline", back_populates="runs")
     documents = relationship("Document", back_populates="pipeline_run")
     staged_outputs = relationship("StagedData", back_populates="pipeline_run")
+    checkpoints = relationship("RunNodeCheckpoint", back_populates="pipeline_run", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # NULL keys never conflict, so runs submitted without a key are unaffected
+        Index("uq_pipeline_runs_idempotency_key", "pipeline_id", "idempotency_key", unique=True),
+    )
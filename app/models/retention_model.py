@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+
+from .base import Base, GUID
+
+
+class RetentionPolicy(Base):
+    __tablename__ = "retention_policies"
+
+    id = Column(GUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    pipeline_id = Column(GUID(as_uuid=True), ForeignKey("pipelines.id"), unique=True)
+    use_case = Column(String, unique=True)
+    retain_days = Column(Integer, nullable=False)
+    archive = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+
+class ArchivedRun(Base):
+    __tablename__ = "archived_runs"
+
+    run_id = Column(GUID(as_uuid=True), primary_key=True)
+    pipeline_id = Column(GUID(as_uuid=True), nullable=False, index=True)
+    archive_path = Column(String)
+    run_created_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
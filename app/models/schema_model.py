@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer
+
+from .base import Base
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
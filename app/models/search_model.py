@@ -0,0 +1,67 @@
+import sqlite3
+
+from sqlalchemy import Column, Index, Integer, String
+
+from .base import Base, GUID
+
+SEARCH_SOURCE_TYPES = ("chunk", "staged")
+
+
+class SearchEntry(Base):
+    """The columns search results are filtered on, for one chunk or staged output.
+
+    The text stays in the source row. The dialect-specific full-text index (``SEARCH_INDEX_DDL``)
+    only holds its terms, keyed by ``id``.
+    """
+
+    __tablename__ = "search_entries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_type = Column(String, nullable=False)
+    source_id = Column(String, nullable=False)
+    document_id = Column(GUID(as_uuid=True), index=True)
+    pipeline_run_id = Column(GUID(as_uuid=True), index=True)
+    pipeline_id = Column(GUID(as_uuid=True), index=True)
+    use_case = Column(String, index=True)
+
+    __table_args__ = (
+        Index("ix_search_entries_source", "source_type", "source_id"),
+        {
+            # ids are never reused, so a stale term list left in the FTS5 index can never match a new entry
+            "sqlite_autoincrement": True,
+        },
+    )
+
+
+# Before 3.43, a contentless FTS5 table cannot delete a row without being given its original text again.
+SQLITE_CONTENTLESS_DELETE = sqlite3.sqlite_version_info >= (3, 43, 0)
+
+# SQLite keeps a contentless FTS5 table whose rowid is the entry id. On 3.43+ a trigger drops an entry's terms
+# with it. Older builds leave them behind; queries join back to search_entries, so the stale terms never match,
+# and ``search-reindex`` purges them. Postgres keeps a tsvector (terms only, no text) with a GIN index.
+# Every statement is idempotent.
+_FTS5_OPTIONS = "content='', tokenize='porter unicode61'" + (", contentless_delete=1" if SQLITE_CONTENTLESS_DELETE else "")
+_FTS5_DELETE_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS search_entries_ad AFTER DELETE ON search_entries BEGIN "
+    "DELETE FROM search_entries_fts WHERE rowid = old.id; END"
+)
+SEARCH_INDEX_DDL = {
+    "sqlite": [f"CREATE VIRTUAL TABLE IF NOT EXISTS search_entries_fts USING fts5(body, {_FTS5_OPTIONS})"]
+    + ([_FTS5_DELETE_TRIGGER] if SQLITE_CONTENTLESS_DELETE else []),
+    "postgresql": [
+        "ALTER TABLE search_entries ADD COLUMN IF NOT EXISTS tsv tsvector",
+        "CREATE INDEX IF NOT EXISTS ix_search_entries_tsv ON search_entries USING GIN (tsv)",
+    ],
+}
+
+# Schema version 10 kept a copy of the text in search_entries.body; these drop that layout (see ``init_db``).
+LEGACY_SEARCH_DROP_DDL = {
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS search_entries_ai",
+        "DROP TRIGGER IF EXISTS search_entries_ad",
+        "DROP TRIGGER IF EXISTS search_entries_au",
+        "DROP TABLE IF EXISTS search_entries_fts",
+        "DROP TABLE IF EXISTS search_entries",
+    ],
+    "postgresql": ["DROP TABLE IF EXISTS search_entries"],
+}
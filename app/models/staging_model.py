@@ -2,9 +2,9 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import Column, DateTime, Enum, ForeignKey, JSON, String
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
-from .base import Base, GUID
+from .base import Base, BlobJSON, GUID
 
 VALIDATION_STATUSES = ("pending", "passed", "failed", "needs_review")
 
@@ -17,7 +17,7 @@ class StagedData(Base):
     document_id = Column(GUID(as_uuid=True), ForeignKey("documents.id"))
     use_case = Column(String, nullable=False)
     payload_type = Column(String, nullable=False)
-    payload = Column(JSON, nullable=False)
+    payload = deferred(Column(BlobJSON, nullable=False))
     validation_status = Column(Enum(*VALIDATION_STATUSES, name="validation_status"), nullable=False)
     issues = Column(JSON)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
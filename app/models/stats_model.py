@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from .base import Base, GUID
+
+
+class RunStatsBucket(Base):
+    """Finished runs of one pipeline and status within one interval, with a mergeable duration sketch."""
+
+    __tablename__ = "run_stats_buckets"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    pipeline_id = Column(GUID(as_uuid=True), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String, nullable=False)
+    run_count = Column(Integer, nullable=False, default=0)
+    duration_sum_ms = Column(BigInteger, nullable=False, default=0)
+    duration_min_ms = Column(Float)
+    duration_max_ms = Column(Float)
+    sketch = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("pipeline_id", "bucket_start", "status", name="uq_run_stats_bucket"),
+        {
+            "sqlite_autoincrement": True,
+        },
+    )
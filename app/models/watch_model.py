@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from .base import Base, GUID
+
+
+class WatchedDirectory(Base):
+    __tablename__ = "watched_directories"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    root = Column(String, nullable=False)
+    path = Column(String, nullable=False)
+    mtime = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (UniqueConstraint("root", "path", name="uq_watched_directory"),)
+
+
+class WatchedFile(Base):
+    __tablename__ = "watched_files"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    root = Column(String, nullable=False)
+    directory = Column(String, nullable=False, index=True)
+    path = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    mtime = Column(Float, nullable=False)
+    sha256 = Column(String)
+    pipeline_run_id = Column(GUID(as_uuid=True))
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (UniqueConstraint("root", "path", name="uq_watched_file"),)
@@ -45,3 +45,7 @@ class PipelineSummary(BaseModel):
 class PipelineRead(PipelineSummary):
     updated_at: datetime
     definition: PipelineDefinition
+
+
+PIPELINE_FIELDS = tuple(PipelineRead.__fields__)
+PIPELINE_SUMMARY_FIELDS = tuple(PipelineSummary.__fields__)
@@ -2,9 +2,13 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from ..models.pipeline_model import RUN_STATUSES
+from ..core.storage_paths import check_storage_uri
+from ..models.pipeline_model import RUN_PRIORITIES
+from .pipeline_schemas import PipelineDefinition
+
+PRIORITY_PATTERN = "^(" + "|".join(RUN_PRIORITIES) + ")$"
 
 
 class RunCreate(BaseModel):
@@ -12,10 +16,19 @@ class RunCreate(BaseModel):
     document_id: Optional[UUID]
     file_path: Optional[str]
     text_payload: Optional[str]
+    priority: Optional[str] = Field(default=None, regex=PRIORITY_PATTERN)
+    idempotency_key: Optional[str] = Field(default=None, max_length=200)
+    # previews execute without writing anything; ``definition`` lets authors try a draft config
+    preview: bool = False
+    sample_chunks: Optional[int] = Field(default=None, ge=1)
+    definition: Optional[PipelineDefinition]
 
     def validate_payload(self) -> None:
         if not any([self.document_id, self.file_path, self.text_payload]):
             raise ValueError("One of document_id, file_path, or text_payload must be provided")
+        check_storage_uri(self.file_path)
+        if not self.preview and (self.sample_chunks is not None or self.definition is not None):
+            raise ValueError("sample_chunks and definition are only accepted with preview=true")
 
 
 class RunRead(BaseModel):
@@ -23,6 +36,7 @@ class RunRead(BaseModel):
     pipeline_id: UUID
     status: str
     input_ref: Optional[str]
+    priority: Optional[str]
     result_summary: Optional[Dict[str, Any]]
     error_message: Optional[str]
     created_at: datetime
@@ -35,3 +49,22 @@ class RunRead(BaseModel):
 
 class RunListItem(RunRead):
     pass
+
+
+RUN_FIELDS = tuple(RunRead.__fields__)
+# result_summary can be large; list views only return it when asked for via ``fields``.
+RUN_LIST_DEFAULT_FIELDS = tuple(name for name in RUN_FIELDS if name != "result_summary")
+
+
+class RunNodeRead(BaseModel):
+    node_id: str
+    node_type: str
+    node_index: int
+    status: str
+    attempts: int
+    duration_ms: Optional[int]
+    error_message: Optional[str]
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,17 @@
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    source_type: str
+    source_id: str
+    document_id: Optional[UUID]
+    pipeline_run_id: Optional[UUID]
+    pipeline_id: Optional[UUID]
+    use_case: Optional[str]
+    score: float
+    snippet: str
+    text_score: Optional[float]
+    vector_score: Optional[float]
@@ -1,8 +1,25 @@
-from . import document_service, pipeline_orchestrator, pipeline_service, run_service
+from . import (
+    blob_service,
+    checkpoint_service,
+    document_service,
+    pipeline_orchestrator,
+    pipeline_service,
+    retention_service,
+    ruleset_service,
+    run_service,
+    run_stats_service,
+    search_service,
+)
 
 __all__ = [
+    "blob_service",
+    "checkpoint_service",
     "document_service",
     "pipeline_orchestrator",
     "pipeline_service",
+    "retention_service",
+    "ruleset_service",
     "run_service",
+    "run_stats_service",
+    "search_service",
 ]
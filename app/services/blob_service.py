@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Text, cast, func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.blob_store import JSON_REF_KEY, REF_PREFIX, get_blob_store, referenced_key
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..models.document_model import IngestedChunk
+from ..models.foia_model import FOIAKnowledgeSource
+from ..models.pipeline_model import PipelineRun
+from ..models.staging_model import StagedData
+
+logger = get_logger(__name__)
+
+# (model, attribute) pairs whose column type offloads large values to the blob store.
+BLOB_COLUMNS = (
+    (IngestedChunk, "content"),
+    (StagedData, "payload"),
+    (PipelineRun, "result_summary"),
+    (FOIAKnowledgeSource, "raw_text"),
+)
+
+
+def offload_existing(db: Session, *, batch_size: int = 500, threshold: Optional[int] = None) -> Dict[str, Any]:
+    """Move inline values written before the blob store existed out of their rows.
+
+    Rows are walked in primary-key order and rewritten through the column type, which stores the value
+    under its hash and keeps only the reference. Safe to rerun: offloaded rows no longer match the size filter.
+    """
+    threshold = threshold if threshold is not None else get_settings().blob_inline_max_bytes
+    report: Dict[str, Any] = {}
+    for model, attr in BLOB_COLUMNS:
+        column = getattr(model, attr)
+        pk = inspect(model).primary_key[0]
+        raw_size = func.length(cast(column, Text))
+        moved = 0
+        last = None
+        while True:
+            query = select(pk, column).where(raw_size > threshold).order_by(pk).limit(batch_size)
+            if last is not None:
+                query = query.where(pk > last)
+            rows = db.execute(query).all()
+            if not rows:
+                break
+            for key, value in rows:
+                db.execute(
+                    update(model.__table__)
+                    .where(pk == key)
+                    .values({column.key: value})
+                )
+            db.commit()
+            moved += len(rows)
+            last = rows[-1][0]
+        report[f"{model.__tablename__}.{attr}"] = moved
+        logger.info("Offloaded inline values", extra={"table": model.__tablename__, "column": attr, "rows": moved})
+    return report
+
+
+def collect_garbage(db: Session, *, grace_seconds: Optional[float] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Delete stored values that no row references any more.
+
+    Only values last written more than ``grace_seconds`` ago are candidates, so a value put by a
+    transaction that has not committed yet survives; putting an existing value again restarts its
+    grace period. References are read from the raw column text, without loading any blob.
+    """
+    grace_seconds = grace_seconds if grace_seconds is not None else get_settings().blob_gc_grace_seconds
+    store = get_blob_store()
+    cutoff = time.time() - grace_seconds
+    candidates = set(store.iter_keys(older_than=cutoff))
+    report: Dict[str, Any] = {"candidates": len(candidates), "deleted": 0}
+    if candidates:
+        for model, attr in BLOB_COLUMNS:
+            raw = cast(getattr(model, attr), Text)
+            query = (
+                select(raw)
+                .where(or_(raw.like(REF_PREFIX + "%"), raw.like(f'%"{JSON_REF_KEY}"%')))
+                .execution_options(yield_per=1000)
+            )
+            for (value,) in db.execute(query):
+                candidates.discard(referenced_key(value))
+    report["unreferenced"] = len(candidates)
+    if not dry_run:
+        report["deleted"] = sum(1 for key in candidates if store.delete(key, older_than=cutoff))
+    logger.info("Swept blob store", extra=report)
+    return report
@@ -0,0 +1,68 @@
+import copy
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from sqlalchemy import inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..core.cache import ReadThroughCache
+from ..models.cache_model import CacheVersion
+
+M = TypeVar("M")
+
+
+def read_version(db: Session, name: str) -> int:
+    version = db.execute(select(CacheVersion.version).where(CacheVersion.name == name)).scalar()
+    return version or 0
+
+
+def bump_version(db: Session, name: str) -> None:
+    """Advance the namespace stamp inside the caller's transaction so other processes drop their copies."""
+    result = db.execute(
+        update(CacheVersion).where(CacheVersion.name == name).values(version=CacheVersion.version + 1)
+    )
+    if result.rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(CacheVersion(name=name, version=1))
+    except IntegrityError:  # another process created the row first
+        db.execute(
+            update(CacheVersion).where(CacheVersion.name == name).values(version=CacheVersion.version + 1)
+        )
+
+
+def snapshot(instance: Any) -> Dict[str, Any]:
+    mapper = inspect(instance).mapper
+    return {attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs}
+
+
+def attach(db: Session, model: Type[M], values: Dict[str, Any]) -> M:
+    """Rebuild a cached row as a session-bound instance without querying the database.
+
+    JSON columns are copied, so a caller editing ``definition`` or ``config`` in place cannot change
+    what other sessions read from the cache.
+    """
+    instance = model(**copy.deepcopy(values))
+    make_transient_to_detached(instance)
+    return db.merge(instance, load=False)
+
+
+def cached_get(
+    db: Session,
+    cache: ReadThroughCache,
+    model: Type[M],
+    key: Any,
+    loader_query: Any,
+) -> Optional[M]:
+    cache.sync_version(lambda: read_version(db, cache.name))
+
+    def _load() -> Optional[Dict[str, Any]]:
+        instance = db.execute(loader_query).scalars().first()
+        # the loading session keeps ``instance``; cache a copy that its edits cannot reach
+        return copy.deepcopy(snapshot(instance)) if instance is not None else None
+
+    values = cache.get(key, _load)
+    if values is None:
+        return None
+    return attach(db, model, values)
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.checkpoint_model import RunNodeCheckpoint
+
+
+def list_checkpoints(db: Session, run_id: UUID) -> List[RunNodeCheckpoint]:
+    query = (
+        select(RunNodeCheckpoint)
+        .where(RunNodeCheckpoint.pipeline_run_id == run_id)
+        .order_by(RunNodeCheckpoint.node_index)
+    )
+    return list(db.execute(query).scalars())
+
+
+def completed_checkpoints(db: Session, run_id: UUID) -> Dict[str, RunNodeCheckpoint]:
+    return {cp.node_id: cp for cp in list_checkpoints(db, run_id) if cp.status == "completed"}
+
+
+def record_checkpoint(
+    db: Session,
+    *,
+    run_id: UUID,
+    node_id: str,
+    node_type: str,
+    node_index: int,
+    status: str,
+    attempts: int,
+    duration_ms: int,
+    output: Optional[Dict[str, Any]] = None,
+    error_message: Optional[str] = None,
+) -> RunNodeCheckpoint:
+    checkpoint = db.execute(
+        select(RunNodeCheckpoint).where(
+            RunNodeCheckpoint.pipeline_run_id == run_id, RunNodeCheckpoint.node_id == node_id
+        )
+    ).scalars().first()
+    if checkpoint is None:
+        checkpoint = RunNodeCheckpoint(pipeline_run_id=run_id, node_id=node_id, attempts=0)
+    checkpoint.node_type = node_type
+    checkpoint.node_index = node_index
+    checkpoint.status = status
+    checkpoint.attempts = (checkpoint.attempts or 0) + attempts
+    checkpoint.output = output
+    checkpoint.error_message = error_message
+    checkpoint.duration_ms = duration_ms
+    checkpoint.updated_at = datetime.utcnow()
+    db.add(checkpoint)
+    db.commit()
+    return checkpoint
@@ -1,15 +1,26 @@
-from typing import Optional
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from ..core import bulk
+from ..core.logging import get_logger
+from ..core.storage_paths import UnsafeStoragePath, check_storage_uri
+from ..core.serialization import loads
 from ..models.document_model import Document, DOCUMENT_SOURCE_TYPES
 from ..schemas.document_schemas import DocumentCreate
 
+logger = get_logger(__name__)
+
 
 def register_document(db: Session, payload: DocumentCreate, pipeline_run_id: Optional[UUID] = None) -> Document:
     if payload.source_type not in DOCUMENT_SOURCE_TYPES:
         raise ValueError("Unsupported source type")
+    check_storage_uri(payload.storage_uri)
 
     document = Document(
         pipeline_run_id=pipeline_run_id,
@@ -24,3 +35,77 @@ def register_document(db: Session, payload: DocumentCreate, pipeline_run_id: Opt
     db.commit()
     db.refresh(document)
     return document
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors())
+
+
+class BulkRegistration:
+    """Validates NDJSON document records one line at a time and inserts them in multi-row batches.
+
+    Only the current batch is held in memory; the caller decides its size. ``flush`` commits it in one transaction and returns
+    the per-line results, in line order, so callers can stream them back as they go.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.registered = 0
+        self.failed = 0
+        self._rows: List[Dict[str, Any]] = []
+        self._results: List[Dict[str, Any]] = []
+
+    def add(self, line_number: int, raw: bytes) -> None:
+        try:
+            record = loads(raw)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            payload = DocumentCreate.parse_obj(record)
+            check_storage_uri(payload.storage_uri)
+        except ValidationError as exc:
+            self.fail(line_number, _validation_message(exc))
+            return
+        except UnsafeStoragePath as exc:
+            self.fail(line_number, f"storage_uri: {exc}")
+            return
+        except ValueError as exc:  # includes JSON decode errors
+            self.fail(line_number, f"Invalid JSON: {exc}")
+            return
+
+        document_id = uuid.uuid4()
+        self._rows.append(
+            {
+                "id": document_id,
+                "source_type": payload.source_type,
+                "external_ref": payload.external_ref,
+                "file_name": payload.file_name,
+                "mime_type": payload.mime_type,
+                "storage_uri": payload.storage_uri,
+                "metadata": payload.metadata,
+                "created_at": datetime.utcnow(),
+            }
+        )
+        self._results.append({"line": line_number, "id": str(document_id)})
+
+    def fail(self, line_number: int, error: str) -> None:
+        self._results.append({"line": line_number, "error": error})
+
+    def flush(self) -> List[Dict[str, Any]]:
+        rows, results = self._rows, self._results
+        self._rows, self._results = [], []
+        if rows:
+            try:
+                bulk.insert_rows(self.db, Document, rows)
+                self.db.commit()
+            except SQLAlchemyError as exc:
+                self.db.rollback()
+                logger.exception("Bulk document batch failed", extra={"rows": len(rows)})
+                error = f"Batch insert failed: {exc.__class__.__name__}"
+                results = [{"line": r["line"], "error": error} if "id" in r else r for r in results]
+        registered = sum(1 for result in results if "id" in result)
+        self.registered += registered
+        self.failed += len(results) - registered
+        return results
+
+    def summary(self) -> Dict[str, Any]:
+        return {"summary": {"registered": self.registered, "failed": self.failed}}
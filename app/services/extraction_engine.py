@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import codecs
+import mimetypes
+import os
+import signal
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from email import policy
+from email.parser import BytesParser
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..core.storage_paths import resolve_storage_path
+
+logger = get_logger(__name__)
+
+READ_BLOCK_SIZE = 64 * 1024
+SNIFF_BYTES = 4096
+INLINE_MIME_TYPES = {"text/plain", "text/csv", "text/markdown"}
+
+
+class ExtractionError(RuntimeError):
+    pass
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+class _TextCollector(HTMLParser):
+    SKIP_TAGS = {"script", "style", "head", "noscript"}
+    BLOCK_TAGS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth and data.strip():
+            self.parts.append(data)
+
+    def drain(self) -> str:
+        text = "".join(self.parts)
+        self.parts = []
+        return text
+
+
+def _html_segments(blocks: Iterator[str]) -> Iterator[str]:
+    parser = _TextCollector()
+    for block in blocks:
+        parser.feed(block)
+        text = parser.drain()
+        if text:
+            yield text
+    parser.close()
+    tail = parser.drain()
+    if tail:
+        yield tail
+
+
+def _read_blocks(path: Path) -> Iterator[str]:
+    with path.open("r", encoding="utf-8", errors="replace") as handle:
+        while True:
+            block = handle.read(READ_BLOCK_SIZE)
+            if not block:
+                return
+            yield block
+
+
+def extract_plain_text(path: Path) -> Iterator[str]:
+    return _read_blocks(path)
+
+
+def extract_html(path: Path) -> Iterator[str]:
+    return _html_segments(_read_blocks(path))
+
+
+def extract_email(path: Path) -> Iterator[str]:
+    with path.open("rb") as handle:
+        message = BytesParser(policy=policy.default).parse(handle)
+    for header in ("subject", "from", "to", "date"):
+        if message[header]:
+            yield f"{header.title()}: {message[header]}\n"
+    yield "\n"
+    for part in message.walk():
+        if part.is_multipart() or part.get_content_disposition() == "attachment":
+            continue
+        content_type = part.get_content_type()
+        if content_type == "text/plain":
+            yield part.get_content()
+        elif content_type == "text/html":
+            yield from _html_segments(iter([part.get_content()]))
+
+
+def extract_pdf(path: Path) -> Iterator[str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise ExtractionError("PDF extraction requires the 'pypdf' package") from exc
+
+    reader = PdfReader(str(path))
+    for page in reader.pages:
+        yield (page.extract_text() or "") + "\n\f"
+
+
+EXTRACTORS: Dict[str, Callable[[Path], Iterator[str]]] = {
+    "text/plain": extract_plain_text,
+    "text/csv": extract_plain_text,
+    "text/markdown": extract_plain_text,
+    "text/html": extract_html,
+    "application/xhtml+xml": extract_html,
+    "message/rfc822": extract_email,
+    "application/pdf": extract_pdf,
+}
+
+
+def register_extractor(mime_type: str, extractor: Callable[[Path], Iterator[str]]) -> None:
+    """Extractors must be module-level functions so worker processes can import them."""
+    EXTRACTORS[mime_type] = extractor
+
+
+def sniff_mime_type(path: Path) -> str:
+    """Guess from the first bytes when the name does not say; binary content is never read as text."""
+    with path.open("rb") as handle:
+        head = handle.read(SNIFF_BYTES)
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if b"\0" in head:
+        return "application/octet-stream"
+    try:
+        text = codecs.getincrementaldecoder("utf-8")().decode(head)
+    except UnicodeDecodeError:
+        return "application/octet-stream"
+    if text.lstrip()[:15].lower().startswith(("<!doctype html", "<html")):
+        return "text/html"
+    return "text/plain"
+
+
+def resolve_mime_type(path: Path, mime_type: Optional[str]) -> str:
+    if mime_type:
+        return mime_type.split(";")[0].strip().lower()
+    if path.suffix.lower() == ".eml":
+        return "message/rfc822"
+    return mimetypes.guess_type(path.name)[0] or sniff_mime_type(path)
+
+
+def _limit_memory(memory_limit_mb: Optional[int]) -> None:
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):  # pragma: no cover - platform without RLIMIT_AS
+        pass
+
+
+def _on_timeout(signum, frame):
+    raise ExtractionTimeout("Extraction timed out")
+
+
+def _extract_to_file(source: str, mime_type: str, output: str, timeout_seconds: int) -> Dict[str, int]:
+    """Worker entry point: write extracted text to ``output`` as it is produced.
+
+    Only the small stats dict is pickled back to the parent; the text itself travels through
+    the spool file, so large documents never cross the process boundary in one message.
+    """
+    extractor = EXTRACTORS.get(mime_type)
+    if extractor is None:
+        raise ExtractionError(f"No extractor registered for {mime_type}")
+
+    previous = signal.signal(signal.SIGALRM, _on_timeout)
+    signal.alarm(timeout_seconds)
+    chars = 0
+    segments = 0
+    try:
+        with open(output, "w", encoding="utf-8") as handle:
+            for segment in extractor(Path(source)):
+                handle.write(segment)
+                chars += len(segment)
+                segments += 1
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+    return {"chars": chars, "segments": segments}
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.extraction_workers or os.cpu_count(),
+            initializer=_limit_memory,
+            initargs=(settings.extraction_memory_limit_mb,),
+        )
+    return _pool
+
+
+def shutdown_extraction_pool(*, terminate: bool = False) -> None:
+    """Drop the pool; ``terminate`` also kills its workers, e.g. one wedged past the alarm."""
+    global _pool
+    if _pool is not None:
+        workers = list((_pool._processes or {}).values()) if terminate else []
+        _pool.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            worker.terminate()
+        _pool = None
+
+
+def extract_text(storage_uri: Optional[str], mime_type: Optional[str] = None) -> Optional[Iterator[str]]:
+    """Yield the text of a stored document in blocks, or ``None`` if there is no readable file.
+
+    Raises ``UnsafeStoragePath`` for a URI outside ``BLOB_DIR`` and ``INGEST_ROOTS``. Plain text is streamed inline; every other format is extracted in the process pool under
+    the configured timeout and memory limit.
+    """
+    if not storage_uri:
+        return None
+    path = resolve_storage_path(storage_uri)
+    if not path.is_file():
+        return None
+
+    resolved = resolve_mime_type(path, mime_type)
+    if resolved in INLINE_MIME_TYPES:
+        return _read_blocks(path)
+    if resolved not in EXTRACTORS:
+        raise ExtractionError(f"Unsupported mime type: {resolved}")
+
+    settings = get_settings()
+    fd, output = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    future = get_extraction_pool().submit(
+        _extract_to_file, str(path), resolved, output, settings.extraction_timeout_seconds
+    )
+    try:
+        # the worker's alarm fires first; the grace period only covers a wedged worker
+        stats = future.result(timeout=settings.extraction_timeout_seconds + 5)
+    except BrokenProcessPool as exc:
+        shutdown_extraction_pool()
+        os.unlink(output)
+        raise ExtractionError("Extraction worker died (memory limit exceeded?)") from exc
+    except FutureTimeout as exc:
+        # the worker ignored its alarm (e.g. stuck in C code); it would keep a pool slot forever
+        shutdown_extraction_pool(terminate=True)
+        os.unlink(output)
+        raise ExtractionTimeout("Extraction worker did not finish and was terminated") from exc
+    except MemoryError as exc:
+        os.unlink(output)
+        raise ExtractionError("Extraction exceeded the memory limit") from exc
+    except Exception:
+        os.unlink(output)
+        raise
+    logger.info("Extracted document text", extra={"mime_type": resolved, **stats})
+    return _consume(Path(output))
+
+
+def _consume(path: Path) -> Iterator[str]:
+    try:
+        yield from _read_blocks(path)
+    finally:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import os
+import select
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select as sql_select
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..core.storage_paths import resolve_storage_path
+from ..models.watch_model import WatchedDirectory, WatchedFile
+from ..schemas.run_schemas import RunCreate
+from . import pipeline_service, run_queue, run_service
+
+logger = get_logger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE_SELF = 0x00000400
+_IN_ISDIR = 0x40000000
+_IN_Q_OVERFLOW = 0x00004000
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyUnavailable(OSError):
+    pass
+
+
+class _Inotify:
+    """Minimal ctypes binding to Linux inotify; reports directories whose contents changed."""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name or not hasattr(os, "O_NONBLOCK"):
+            raise InotifyUnavailable("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise InotifyUnavailable("inotify is not supported on this platform")
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK)
+        if self.fd < 0:
+            raise InotifyUnavailable(os.strerror(ctypes.get_errno()))
+        self._paths: Dict[int, str] = {}
+        self.overflowed = False
+
+    def add(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            # ENOSPC here means fs.inotify.max_user_watches is exhausted; callers fall back to rescans
+            raise InotifyUnavailable(os.strerror(ctypes.get_errno()))
+        self._paths[wd] = directory
+
+    def read(self, timeout: float) -> Tuple[Set[str], Set[str]]:
+        """Return (changed directories, newly created subdirectories) seen within ``timeout`` seconds."""
+        changed: Set[str] = set()
+        created_dirs: Set[str] = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed, created_dirs
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, created_dirs
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+            if mask & _IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            if mask & _IN_DELETE_SELF:
+                self._paths.pop(wd, None)
+                continue
+            changed.add(directory)
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                created_dirs.add(os.path.join(directory, os.fsdecode(name)))
+        return changed, created_dirs
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FolderWatcher:
+    """Keeps a persistent (path, size, mtime, sha256) index of a tree and turns changes into queued runs.
+
+    A rescan only lists directories whose mtime moved since the last pass, so a quiet pass costs one
+    ``stat`` per directory rather than per file. With inotify, only directories that reported events
+    are listed at all. Content rewritten in place without touching the directory is picked up by
+    inotify, or by a ``full`` rescan.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        root: Path,
+        pipeline_id: UUID,
+        pattern: str = "*",
+        batch_size: int = 100,
+        settle_seconds: float = 5.0,
+        priority: str = "normal",
+    ) -> None:
+        self.db = db
+        self.root = str(resolve_storage_path(str(root)))  # queued runs could not read the files otherwise
+        self.pipeline_id = pipeline_id
+        self.pattern = pattern
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+        self.priority = priority
+        self._pending: Set[str] = set()
+        self._inotify: Optional[_Inotify] = None
+        self.stats = {"passes": 0, "dirs_listed": 0, "files_seen": 0, "runs_queued": 0, "files_deferred": 0}
+
+    # -- directory discovery -------------------------------------------------------------------
+
+    def _known_dirs(self) -> Dict[str, WatchedDirectory]:
+        query = sql_select(WatchedDirectory).where(WatchedDirectory.root == self.root)
+        return {d.path: d for d in self.db.execute(query).scalars()}
+
+    def _changed_dirs(self, full: bool) -> Iterable[str]:
+        known = self._known_dirs()
+        children: Dict[str, List[str]] = {}
+        for path in known:
+            children.setdefault(os.path.dirname(path), []).append(path)
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            entry = known.get(directory)
+            if full or entry is None or entry.mtime != mtime:
+                yield directory
+                subdirs = self._list_subdirs(directory)
+                if entry is None:
+                    entry = WatchedDirectory(root=self.root, path=directory, mtime=mtime)
+                    known[directory] = entry
+                # a directory holding files that have not settled yet must be listed again on the next pass
+                unsettled = any(os.path.dirname(p) == directory for p in self._pending)
+                entry.mtime = -1.0 if unsettled else mtime
+                entry.updated_at = datetime.utcnow()
+                self.db.add(entry)
+            else:
+                # unchanged mtime means the set of children is unchanged; reuse the indexed subdirectories
+                subdirs = children.get(directory, [])
+            stack.extend(subdirs)
+
+    @staticmethod
+    def _list_subdirs(directory: str) -> List[str]:
+        try:
+            with os.scandir(directory) as entries:
+                return [e.path for e in entries if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
+
+    # -- file comparison -----------------------------------------------------------------------
+
+    def _scan_directory(self, directory: str, now: float) -> List[str]:
+        self.stats["dirs_listed"] += 1
+        indexed = {
+            f.path: f
+            for f in self.db.execute(
+                sql_select(WatchedFile).where(WatchedFile.root == self.root, WatchedFile.directory == directory)
+            ).scalars()
+        }
+        ready: List[str] = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return ready
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False) or not fnmatch.fnmatch(entry.name, self.pattern):
+                continue
+            self.stats["files_seen"] += 1
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            record = indexed.get(entry.path)
+            if record is not None and record.size == stat.st_size and record.mtime == stat.st_mtime:
+                continue
+            if now - stat.st_mtime < self.settle_seconds:
+                self._pending.add(entry.path)  # still being written; look again next pass
+                continue
+            ready.append(entry.path)
+        return ready
+
+    def _index_file(self, path: str) -> Optional[WatchedFile]:
+        """Update the index for ``path``; returns the record if its content is new."""
+        try:
+            stat = os.stat(path)
+            digest = _hash_file(path)
+        except OSError:
+            return None
+        record = self.db.execute(
+            sql_select(WatchedFile).where(WatchedFile.root == self.root, WatchedFile.path == path)
+        ).scalars().first()
+        if record is None:
+            record = WatchedFile(root=self.root, directory=os.path.dirname(path), path=path)
+        unchanged = record.sha256 == digest
+        record.size = stat.st_size
+        record.mtime = stat.st_mtime
+        record.sha256 = digest
+        record.updated_at = datetime.utcnow()
+        self.db.add(record)
+        return None if unchanged else record
+
+    # -- run submission ------------------------------------------------------------------------
+
+    def _defer(self, paths: List[str]) -> None:
+        """Leave ``paths`` for the next pass, including a pass by a new ``--once`` process."""
+        self._pending.update(paths)
+        self.db.execute(
+            update(WatchedDirectory)
+            .where(WatchedDirectory.root == self.root, WatchedDirectory.path.in_(sorted({os.path.dirname(p) for p in paths})))
+            .values(mtime=-1.0)
+        )
+        self.db.commit()
+        self.stats["files_deferred"] += len(paths)
+        logger.warning("Run queue is full; deferring files to the next pass", extra={"files": len(paths)})
+
+    def _submit(self, paths: List[str]) -> int:
+        pipeline = pipeline_service.get_pipeline(self.db, self.pipeline_id)
+        if pipeline is None:
+            raise ValueError("Pipeline not found")
+        max_queued = get_settings().worker_max_queued_runs
+        queued = 0
+        start = 0
+        while start < len(paths):
+            # the same admission limit enqueue_run applies to API submissions
+            room = max_queued - run_queue.count_queued(self.db)
+            if room <= 0:
+                self._defer(paths[start:])
+                break
+            batch = paths[start : start + min(self.batch_size, room)]
+            start += len(batch)
+            records = [r for r in (self._index_file(p) for p in batch) if r]
+            if records:
+                payloads = [RunCreate(file_path=r.path, input_ref=f"sha256:{r.sha256}") for r in records]
+                runs = run_service.enqueue_runs(self.db, pipeline, payloads, self.priority)
+                for record, run in zip(records, runs):
+                    record.pipeline_run_id = run.id
+                    self.db.add(record)
+                queued += len(runs)
+            self.db.commit()
+        self.stats["runs_queued"] += queued
+        return queued
+
+    def scan(self, directories: Optional[Iterable[str]] = None, *, full: bool = False) -> int:
+        """Run one pass over ``directories`` (or every changed directory) and queue runs for new content."""
+        self.stats["passes"] += 1
+        now = time.time()
+        ready: List[str] = []
+        targets = directories if directories is not None else self._changed_dirs(full)
+        for directory in targets:
+            ready.extend(self._scan_directory(directory, now))
+
+        pending, self._pending = self._pending, set()
+        for path in pending:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if now - mtime < self.settle_seconds:
+                self._pending.add(path)
+            elif path not in ready:
+                ready.append(path)
+
+        self.db.commit()
+        return self._submit(ready) if ready else 0
+
+    # -- loop ----------------------------------------------------------------------------------
+
+    def _start_inotify(self) -> bool:
+        try:
+            watcher = _Inotify()
+            for directory, _, _ in os.walk(self.root):
+                watcher.add(directory)
+        except InotifyUnavailable as exc:
+            logger.info("inotify unavailable, using incremental rescans", extra={"reason": str(exc)})
+            return False
+        self._inotify = watcher
+        return True
+
+    def run(self, *, interval: float = 10.0, stop_event: Optional[threading.Event] = None) -> None:
+        stop_event = stop_event or threading.Event()
+        self.scan()
+        use_inotify = self._start_inotify()
+        try:
+            while not stop_event.is_set():
+                if not use_inotify:
+                    stop_event.wait(interval)
+                    self.scan()
+                    continue
+                changed, created = self._inotify.read(timeout=min(interval, max(self.settle_seconds, 1.0)))
+                for directory in created:
+                    try:
+                        self._inotify.add(directory)
+                    except InotifyUnavailable:
+                        use_inotify = False
+                    changed.add(directory)
+                if self._inotify.overflowed:
+                    self._inotify.overflowed = False
+                    self.scan()  # events were dropped; fall back to one directory-mtime pass
+                elif changed or self._pending:
+                    self.scan(sorted(changed))
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
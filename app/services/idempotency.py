@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.serialization import dumps
+from ..models.pipeline_model import Pipeline, PipelineRun
+from ..schemas.run_schemas import RunCreate
+
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+class DuplicateRun(Exception):
+    """A concurrent request inserted a run with the same idempotency key first."""
+
+
+def pipeline_version(pipeline: Pipeline) -> str:
+    """Hash of the definition, so editing a pipeline stops matching runs made by the old version."""
+    return hashlib.sha256(dumps(pipeline.definition or {})).hexdigest()[:16]
+
+
+def _input_fingerprint(payload: RunCreate) -> Dict[str, object]:
+    fingerprint: Dict[str, object] = {
+        "input_ref": payload.input_ref,
+        "document_id": str(payload.document_id) if payload.document_id else None,
+        "file_path": payload.file_path,
+        "text_sha256": hashlib.sha256(payload.text_payload.encode("utf-8")).hexdigest() if payload.text_payload else None,
+    }
+    if payload.file_path:
+        try:  # a file rewritten in place is new input
+            stat = os.stat(payload.file_path)
+            fingerprint["file_stat"] = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            pass
+    return fingerprint
+
+
+def resolve_key(pipeline: Pipeline, payload: RunCreate, explicit: Optional[str] = None) -> Optional[str]:
+    """The client's key when given; otherwise one derived from pipeline, pipeline version and input hash."""
+    key = explicit or payload.idempotency_key
+    if key:
+        return f"client:{key}"
+    if not get_settings().idempotency_derive_keys:
+        return None
+    material = dumps({"pipeline": str(pipeline.id), "version": pipeline_version(pipeline), "input": _input_fingerprint(payload)})
+    return "derived:" + hashlib.sha256(material).hexdigest()
+
+
+def find_run(db: Session, pipeline_id: UUID, key: str) -> Optional[PipelineRun]:
+    """Return the run holding ``key``, releasing the key instead when that run can no longer be reused.
+
+    Failed runs and runs older than the idempotency window give their key up, so the next submission
+    starts a fresh run.
+    """
+    run = db.execute(
+        select(PipelineRun).where(PipelineRun.pipeline_id == pipeline_id, PipelineRun.idempotency_key == key)
+    ).scalars().first()
+    if run is None:
+        return None
+    window = timedelta(seconds=get_settings().idempotency_window_seconds)
+    if run.status == "failed" or (run.created_at and run.created_at < datetime.utcnow() - window):
+        db.execute(
+            update(PipelineRun)
+            .where(PipelineRun.id == run.id, PipelineRun.idempotency_key == key)
+            .values(idempotency_key=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return None
+    return run
@@ -1,8 +1,12 @@
-from typing import List
+from typing import Iterable, Iterator, List
+from uuid import UUID
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ..core import bulk
 from ..models.document_model import Document, IngestedChunk
+from . import search_service
 
 
 def ingest_document(db: Session, document: Document, *, text_payload: str) -> List[IngestedChunk]:
@@ -13,6 +17,76 @@ def ingest_document(db: Session, document: Document, *, text_payload: str) -> Li
         metadata={"generated": True},
     )
     db.add(chunk)
+    db.flush()
+    search_service.index_chunks(db, document, [(chunk.id, text_payload)])
     db.commit()
     db.refresh(chunk)
     return [chunk]
+
+
+def split_segments(segments: Iterable[str], chunk_size: int) -> Iterator[str]:
+    """Re-block a stream of text segments into chunks of at most ``chunk_size`` characters."""
+    buffer = ""
+    for segment in segments:
+        buffer += segment
+        while len(buffer) >= chunk_size:
+            yield buffer[:chunk_size]
+            buffer = buffer[chunk_size:]
+    if buffer.strip():
+        yield buffer
+
+
+def ingest_segments(
+    db: Session,
+    document: Document,
+    *,
+    segments: Iterable[str],
+    chunk_size: int,
+    mime_type: str,
+    flush_every: int = 200,
+) -> int:
+    """Store streamed text as chunks, flushing in batches so chunk text is not retained; returns the count."""
+    count = 0
+    pending: List[IngestedChunk] = []
+    for index, content in enumerate(split_segments(segments, chunk_size)):
+        pending.append(
+            IngestedChunk(
+                document_id=document.id,
+                chunk_index=index,
+                content=content,
+                metadata={"mime_type": mime_type, "extracted": True},
+            )
+        )
+        count += 1
+        if len(pending) >= flush_every:
+            _flush_batch(db, document, pending)
+            pending = []
+    _flush_batch(db, document, pending)
+    db.commit()
+    return count
+
+
+def _flush_batch(db: Session, document: Document, chunks: List[IngestedChunk]) -> None:
+    if chunks and bulk.copy_enabled(db):
+        rows = [
+            {"document_id": c.document_id, "chunk_index": c.chunk_index, "content": c.content, "metadata": c.metadata}
+            for c in chunks
+        ]
+        ids = bulk.copy_rows(db, IngestedChunk, rows, allocate_ids=True)
+        search_service.index_chunks(db, document, [(chunk_id, row["content"]) for chunk_id, row in zip(ids, rows)])
+        return
+    db.add_all(chunks)
+    db.flush()
+    search_service.index_chunks(db, document, [(chunk.id, chunk.content) for chunk in chunks])
+    for chunk in chunks:
+        db.expunge(chunk)
+
+
+def iter_chunk_text(db: Session, document_id: UUID, *, batch_size: int = 200) -> Iterator[str]:
+    query = (
+        select(IngestedChunk.content)
+        .where(IngestedChunk.document_id == document_id)
+        .order_by(IngestedChunk.chunk_index)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(query).scalars()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..core.config import get_settings
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
+_client: Optional["httpx.Client"] = None
+_client_lock = threading.Lock()
+
+
+class ModelCallError(RuntimeError):
+    pass
+
+
+def endpoint_configured() -> bool:
+    return bool(get_settings().llm_endpoint_url)
+
+
+def _get_client() -> "httpx.Client":
+    global _client
+    with _client_lock:
+        if _client is None:
+            import httpx
+
+            settings = get_settings()
+            _client = httpx.Client(
+                base_url=settings.llm_endpoint_url,
+                timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=5.0),
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+            )
+        return _client
+
+
+def complete(*, model_name: str, prompt: str, **params: Any) -> str:
+    """POST ``{"model", "prompt", ...}`` to ``LLM_ENDPOINT_URL`` and return the ``text`` of the reply."""
+    response = _get_client().post("", json={"model": model_name, "prompt": prompt, **params})
+    if response.status_code >= 400:
+        raise ModelCallError(f"Model endpoint returned {response.status_code}")
+    return response.json()["text"]
+
+
+def close() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -1,19 +1,289 @@
 from __future__ import annotations
 
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
 
+from sqlalchemy import delete, event, func, select, update
 from sqlalchemy.orm import Session
 
+from ..core.config import get_settings
 from ..core.logging import get_logger
-from ..models.document_model import Document
+from ..models.document_model import Document, IngestedChunk
 from ..models.pipeline_model import Pipeline, PipelineRun
 from ..schemas.document_schemas import DocumentCreate
-from . import ingestion_engine, processing_engine, staging_engine, validation_engine
+from . import (
+    checkpoint_service,
+    extraction_engine,
+    ingestion_engine,
+    processing_engine,
+    ruleset_service,
+    run_queue,
+    run_stats_service,
+    search_service,
+    staging_engine,
+    validation_engine,
+)
 from .document_service import register_document
 
 logger = get_logger(__name__)
 
+# Errors caused by the request itself; retrying them cannot succeed.
+NON_RETRYABLE_ERRORS: Tuple[type, ...] = (ValueError, LookupError)
+
+
+class LeaseLost(Exception):
+    """Another worker took over the run; this worker's results must be discarded."""
+
+
+class RunState:
+    """Values passed between nodes; each node's checkpoint output is enough to rebuild its part."""
+
+    def __init__(self, inputs: Dict[str, Any]) -> None:
+        self.inputs = inputs
+        self.document: Optional[Document] = None
+        self.chunk_count = 0
+        self.llm_output: Optional[Dict[str, Any]] = None
+        self.validation_report: Optional[Dict[str, Any]] = None
+
+    def iter_chunks(self, db: Session) -> Iterator[str]:
+        """Stream chunk text from the database instead of holding the whole document in memory."""
+        if self.document is not None and self.chunk_count:
+            return ingestion_engine.iter_chunk_text(db, self.document.id)
+        return iter([self.inputs.get("text_payload") or ""])
+
+
+def _resolve_document(db: Session, run: PipelineRun, state: RunState, config: Dict[str, Any]) -> Document:
+    inputs = state.inputs
+    if inputs.get("document_id"):
+        document = db.get(Document, UUID(inputs["document_id"]))
+        if document is None:
+            raise ValueError("Document not found")
+        if document.pipeline_run_id is None:
+            document.pipeline_run_id = run.id
+            db.add(document)
+            db.commit()
+        return document
+
+    # a previous attempt of this run may already have registered the document
+    document = db.execute(select(Document).where(Document.pipeline_run_id == run.id)).scalars().first()
+    if document is not None:
+        return document
+
+    doc_payload = DocumentCreate(
+        source_type=config.get("source_type", "text_payload"),
+        external_ref=inputs.get("input_ref"),
+        file_name=inputs.get("file_path"),
+        mime_type=None,
+        storage_uri=inputs.get("file_path"),
+        text_payload=inputs.get("text_payload"),
+        metadata={},
+    )
+    return register_document(db, doc_payload, pipeline_run_id=run.id)
+
+
+def _run_ingestion(db: Session, pipeline: Pipeline, run: PipelineRun, state: RunState, config: Dict[str, Any]) -> Dict[str, Any]:
+    inputs = state.inputs
+    document = state.document or _resolve_document(db, run, state, config)
+    state.document = document
+    if inputs.get("document_id"):
+        # a stored document is shared with the runs that ingested it before; reuse its chunks
+        stored = db.execute(select(func.count(IngestedChunk.id)).where(IngestedChunk.document_id == document.id)).scalar()
+        if stored:
+            state.chunk_count = stored
+            return {"document_id": str(document.id), "chunks": stored, "source": "stored"}
+    # extract before touching any rows, so no write transaction (or SQLite writer slot) spans extraction
+    segments = None
+    if not inputs.get("text_payload"):
+        segments = extraction_engine.extract_text(document.storage_uri, document.mime_type)
+
+    # drop chunks left behind by an interrupted attempt so chunk indexes start clean
+    db.execute(delete(IngestedChunk).where(IngestedChunk.document_id == document.id))
+    search_service.remove_document_chunks(db, document.id)
+    if segments is not None:
+        state.chunk_count = ingestion_engine.ingest_segments(
+            db,
+            document,
+            segments=segments,
+            chunk_size=config.get("chunk_size", get_settings().ingest_chunk_chars),
+            mime_type=document.mime_type or "",
+        )
+    else:
+        text_content = inputs.get("text_payload") or "Sample document payload"
+        state.chunk_count = len(ingestion_engine.ingest_document(db, document=document, text_payload=text_content))
+    return {"document_id": str(document.id), "chunks": state.chunk_count}
+
+
+def _restore_ingestion(db: Session, state: RunState, output: Dict[str, Any]) -> None:
+    state.document = db.get(Document, UUID(output["document_id"]))
+    state.chunk_count = output.get("chunks", 0)
+
+
+def _run_processing(db: Session, pipeline: Pipeline, run: PipelineRun, state: RunState, config: Dict[str, Any]) -> Dict[str, Any]:
+    options = dict(
+        mode=config.get("mode", "summarize"),
+        model_name=config.get("model_name", "gpt-mini"),
+        prompt_template_id=config.get("prompt_template_id", "default"),
+        output_schema_id=config.get("output_schema_id", "generic"),
+        chunks=state.iter_chunks(db),
+    )
+    if config.get("strategy") == "map_reduce":
+        state.llm_output = processing_engine.map_reduce_chunks(
+            window_chars=config.get("window_chars", get_settings().map_window_chars),
+            fan_in=config.get("fan_in", 16),
+            **options,
+        )
+    elif config.get("strategy") == "packed":
+        state.llm_output = processing_engine.packed_process_chunks(
+            output_tokens_per_item=config.get("output_tokens_per_item", 64),
+            context_tokens=config.get("context_tokens"),
+            max_output_tokens=config.get("max_output_tokens"),
+            **options,
+        )
+    else:
+        state.llm_output = processing_engine.process_chunks(**options)
+    return {"llm_output": state.llm_output}
+
+
+def _restore_processing(db: Session, state: RunState, output: Dict[str, Any]) -> None:
+    state.llm_output = output.get("llm_output")
+
+
+def _run_validation(db: Session, pipeline: Pipeline, run: PipelineRun, state: RunState, config: Dict[str, Any]) -> Dict[str, Any]:
+    ruleset_name = config.get("ruleset_name", "default")
+    ruleset = ruleset_service.get_ruleset(db, ruleset_name)
+    state.validation_report = validation_engine.validate_payload(
+        ruleset_name=ruleset_name,
+        use_semantic_lookup=config.get("use_semantic_lookup", False),
+        thresholds=config.get("thresholds", {}),
+        payload=state.llm_output or {},
+        ruleset_config=ruleset.config if ruleset else None,
+    )
+    return {"validation": state.validation_report}
+
+
+def _restore_validation(db: Session, state: RunState, output: Dict[str, Any]) -> None:
+    state.validation_report = output.get("validation")
+
+
+def _run_staging(db: Session, pipeline: Pipeline, run: PipelineRun, state: RunState, config: Dict[str, Any]) -> Dict[str, Any]:
+    staged = staging_engine.stage_payload(
+        db,
+        pipeline_run=run,
+        use_case=pipeline.use_case,
+        document_id=state.document.id if state.document else None,
+        payload_type=config.get("payload_type", "generic_structured_output"),
+        payload={"llm_output": state.llm_output, "validation": state.validation_report},
+        validation_status=(state.validation_report or {}).get("status", "pending"),
+        issues={"items": (state.validation_report or {}).get("issues", [])},
+        write_embeddings=config.get("write_embeddings", False),
+    )
+    return {"staged_id": str(staged.id)}
+
+
+def _restore_staging(db: Session, state: RunState, output: Dict[str, Any]) -> None:
+    return None
+
+
+NodeHandler = Callable[[Session, Pipeline, PipelineRun, RunState, Dict[str, Any]], Dict[str, Any]]
+NodeRestorer = Callable[[Session, RunState, Dict[str, Any]], None]
+
+NODE_HANDLERS: Dict[str, Tuple[NodeHandler, NodeRestorer]] = {
+    "DocumentIngestionNode": (_run_ingestion, _restore_ingestion),
+    "LLMProcessingNode": (_run_processing, _restore_processing),
+    "ValidationNode": (_run_validation, _restore_validation),
+    "StagingNode": (_run_staging, _restore_staging),
+}
+
+
+def _retry_policy(config: Dict[str, Any]) -> Tuple[int, float]:
+    settings = get_settings()
+    policy = config.get("retry", {})
+    max_attempts = max(1, int(policy.get("max_attempts", settings.node_max_attempts)))
+    backoff = float(policy.get("backoff_seconds", settings.node_retry_backoff_seconds))
+    return max_attempts, backoff
+
+
+def _execute_node(
+    db: Session,
+    handler: NodeHandler,
+    *,
+    pipeline: Pipeline,
+    run: PipelineRun,
+    state: RunState,
+    node_id: str,
+    node_type: str,
+    node_index: int,
+    config: Dict[str, Any],
+) -> Dict[str, Any]:
+    max_attempts, backoff = _retry_policy(config)
+    attempt = 0
+    started = time.monotonic()
+    while True:
+        attempt += 1
+        try:
+            output = handler(db, pipeline, run, state, config)
+        except Exception as exc:
+            db.rollback()
+            retryable = not isinstance(exc, NON_RETRYABLE_ERRORS)
+            if not retryable or attempt >= max_attempts:
+                checkpoint_service.record_checkpoint(
+                    db,
+                    run_id=run.id,
+                    node_id=node_id,
+                    node_type=node_type,
+                    node_index=node_index,
+                    status="failed",
+                    attempts=attempt,
+                    duration_ms=int((time.monotonic() - started) * 1000),
+                    error_message=str(exc),
+                )
+                raise
+            logger.warning(
+                "Node attempt failed, retrying",
+                extra={"run_id": str(run.id), "node_id": node_id, "attempt": attempt, "error": str(exc)},
+            )
+            time.sleep(backoff * (2 ** (attempt - 1)))
+            continue
+
+        checkpoint_service.record_checkpoint(
+            db,
+            run_id=run.id,
+            node_id=node_id,
+            node_type=node_type,
+            node_index=node_index,
+            status="completed",
+            attempts=attempt,
+            duration_ms=int((time.monotonic() - started) * 1000),
+            output=output,
+        )
+        return output
+
+
+def _check_lease(db: Session, run: PipelineRun, lease_owner: Optional[str], lease_lost: Optional[threading.Event]) -> None:
+    if lease_owner is None:
+        return
+    if (lease_lost is not None and lease_lost.is_set()) or not run_queue.holds_lease(db, run_id=run.id, worker_id=lease_owner):
+        raise LeaseLost(f"Run {run.id} is no longer leased to {lease_owner}")
+
+
+def _finish_run(db: Session, run: PipelineRun, lease_owner: Optional[str], **values: Any) -> None:
+    """Write the final status, fenced on the lease when a worker executes the run, and count it."""
+    query = update(PipelineRun).where(PipelineRun.id == run.id)
+    if lease_owner is not None:
+        query = query.where(PipelineRun.lease_owner == lease_owner)
+    result = db.execute(query.values(**values).execution_options(synchronize_session="fetch"))
+    if result.rowcount != 1:
+        db.rollback()
+        raise LeaseLost(f"Run {run.id} is no longer leased to {lease_owner}")
+    run_stats_service.record_run(db, run)
+    db.commit()
+    db.refresh(run)
+
 
 def execute_pipeline(
     db: Session,
@@ -21,82 +291,216 @@ def execute_pipeline(
     pipeline: Pipeline,
     run: PipelineRun,
     inputs: Dict[str, Any],
+    lease_owner: Optional[str] = None,
+    lease_lost: Optional[threading.Event] = None,
 ) -> Dict[str, Any]:
-    chunks: List[str] = []
-    document: Optional[Document] = None
-    validation_report: Optional[Dict[str, Any]] = None
-    llm_output: Optional[Dict[str, Any]] = None
+    """Run every node in order, skipping nodes already checkpointed as completed for this run.
+
+    A worker passes its ``lease_owner`` id (and the heartbeat's ``lease_lost`` event): the lease is
+    checked before every node and fences the final write, so a worker that lost the run raises
+    ``LeaseLost`` instead of overwriting the new owner's results.
+    """
+    state = RunState(inputs)
 
     try:
-        for node in pipeline.definition.get("nodes", []):
+        completed = checkpoint_service.completed_checkpoints(db, run.id)
+        for index, node in enumerate(pipeline.definition.get("nodes", [])):
+            _check_lease(db, run, lease_owner, lease_lost)
             node_type = node.get("type")
+            node_id = node.get("id") or f"{index}:{node_type}"
             config = node.get("config", {})
-            logger.info("Executing node", extra={"run_id": str(run.id), "node_type": node_type})
 
-            if node_type == "DocumentIngestionNode":
-                if document is None:
-                    doc_payload = DocumentCreate(
-                        source_type=config.get("source_type", "text_payload"),
-                        external_ref=inputs.get("input_ref"),
-                        file_name=inputs.get("file_path"),
-                        mime_type=None,
-                        storage_uri=inputs.get("file_path"),
-                        text_payload=inputs.get("text_payload"),
-                        metadata={},
-                    )
-                    document = register_document(db, doc_payload, pipeline_run_id=run.id)
-                text_content = inputs.get("text_payload") or "Sample document payload"
-                chunk_models = ingestion_engine.ingest_document(db, document=document, text_payload=text_content)
-                chunks.extend([chunk.content for chunk in chunk_models])
-            elif node_type == "LLMProcessingNode":
-                llm_output = processing_engine.process_chunks(
-                    mode=config.get("mode", "summarize"),
-                    model_name=config.get("model_name", "gpt-mini"),
-                    prompt_template_id=config.get("prompt_template_id", "default"),
-                    output_schema_id=config.get("output_schema_id", "generic"),
-                    chunks=chunks or [inputs.get("text_payload", "")],
-                )
-            elif node_type == "ValidationNode":
-                validation_report = validation_engine.validate_payload(
-                    ruleset_name=config.get("ruleset_name", "default"),
-                    use_semantic_lookup=config.get("use_semantic_lookup", False),
-                    thresholds=config.get("thresholds", {}),
-                    payload=llm_output or {},
-                )
-            elif node_type == "StagingNode":
-                staging_engine.stage_payload(
-                    db,
-                    pipeline_run=run,
-                    use_case=pipeline.use_case,
-                    document_id=str(document.id) if document else None,
-                    payload_type=config.get("payload_type", "generic_structured_output"),
-                    payload={"llm_output": llm_output, "validation": validation_report},
-                    validation_status=(validation_report or {}).get("status", "pending"),
-                    issues={"items": (validation_report or {}).get("issues", [])},
-                    write_embeddings=config.get("write_embeddings", False),
-                )
-            else:
+            handlers = NODE_HANDLERS.get(node_type)
+            if handlers is None:
                 logger.warning("Unknown node type skipped", extra={"node_type": node_type})
+                continue
+            handler, restorer = handlers
+
+            checkpoint = completed.get(node_id)
+            if checkpoint is not None:
+                logger.info("Restoring node from checkpoint", extra={"run_id": str(run.id), "node_id": node_id})
+                restorer(db, state, checkpoint.output or {})
+                continue
+
+            logger.info("Executing node", extra={"run_id": str(run.id), "node_type": node_type})
+            _execute_node(
+                db,
+                handler,
+                pipeline=pipeline,
+                run=run,
+                state=state,
+                node_id=node_id,
+                node_type=node_type,
+                node_index=index,
+                config=config,
+            )
 
         summary = {
-            "chunks": len(chunks),
-            "llm": llm_output,
-            "validation": validation_report,
+            "chunks": state.chunk_count,
+            "llm": state.llm_output,
+            "validation": state.validation_report,
         }
 
-        run.result_summary = summary
-        run.status = "succeeded"
-        run.completed_at = datetime.utcnow()
-        db.add(run)
-        db.commit()
-        db.refresh(run)
+        _check_lease(db, run, lease_owner, lease_lost)
+        _finish_run(
+            db, run, lease_owner, result_summary=summary, status="succeeded", error_message=None, completed_at=datetime.utcnow()
+        )
         return summary
+    except LeaseLost:
+        db.rollback()
+        logger.warning("Lease lost; discarding this worker's result", extra={"run_id": str(run.id), "worker_id": lease_owner})
+        raise
     except Exception as exc:  # pragma: no cover - defensive fallback
         logger.exception("Pipeline execution failed", extra={"run_id": str(run.id)})
-        run.status = "failed"
-        run.error_message = str(exc)
-        run.completed_at = datetime.utcnow()
-        db.add(run)
-        db.commit()
-        db.refresh(run)
+        db.rollback()
+        _finish_run(db, run, lease_owner, status="failed", error_message=str(exc), completed_at=datetime.utcnow())
         raise
+
+
+# -- preview ------------------------------------------------------------------------------------
+
+
+class PreviewState(RunState):
+    """Run state for previews: chunks live in memory and may be a sample of the document."""
+
+    def __init__(self, inputs: Dict[str, Any], sample_chunks: Optional[int]) -> None:
+        super().__init__(inputs)
+        self.sample_chunks = sample_chunks
+        self.chunks: List[str] = []
+        self.sampled = False
+
+    def take(self, chunks: Iterator[str]) -> None:
+        if self.sample_chunks is None:
+            self.chunks = list(chunks)
+        else:
+            self.chunks = list(islice(chunks, self.sample_chunks + 1))
+            self.sampled = len(self.chunks) > self.sample_chunks
+            del self.chunks[self.sample_chunks :]
+        self.chunk_count = len(self.chunks)
+
+    def iter_chunks(self, db: Session) -> Iterator[str]:
+        return iter(self.chunks)
+
+
+def _preview_ingestion(db: Session, pipeline: Pipeline, run: Optional[PipelineRun], state: PreviewState, config: Dict[str, Any]) -> Dict[str, Any]:
+    inputs = state.inputs
+    storage_uri, mime_type = inputs.get("file_path"), None
+    if inputs.get("document_id"):
+        document = db.get(Document, UUID(inputs["document_id"]))
+        if document is None:
+            raise ValueError("Document not found")
+        state.document = document
+        storage_uri, mime_type = document.storage_uri, document.mime_type
+        stored = ingestion_engine.iter_chunk_text(db, document.id)
+        try:
+            state.take(stored)
+        finally:
+            stored.close()
+        if state.chunks:
+            return {"document_id": str(document.id), "chunks": state.chunk_count, "sampled": state.sampled, "source": "stored"}
+
+    segments = None
+    if not inputs.get("text_payload"):
+        segments = extraction_engine.extract_text(storage_uri, mime_type)
+    if segments is not None:
+        chunk_size = config.get("chunk_size", get_settings().ingest_chunk_chars)
+        state.take(ingestion_engine.split_segments(segments, chunk_size))
+    else:
+        state.take(iter([inputs.get("text_payload") or "Sample document payload"]))
+    return {"chunks": state.chunk_count, "sampled": state.sampled, "chunk_chars": [len(chunk) for chunk in state.chunks]}
+
+
+def _preview_staging(db: Session, pipeline: Pipeline, run: Optional[PipelineRun], state: PreviewState, config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "would_stage": {
+            "use_case": pipeline.use_case,
+            "payload_type": config.get("payload_type", "generic_structured_output"),
+            "validation_status": (state.validation_report or {}).get("status", "pending"),
+            "payload": {"llm_output": state.llm_output, "validation": state.validation_report},
+        },
+        "write_embeddings": False,
+    }
+
+
+# Processing and validation only read from the database, so previews reuse the run handlers.
+PREVIEW_HANDLERS: Dict[str, NodeHandler] = {
+    "DocumentIngestionNode": _preview_ingestion,
+    "LLMProcessingNode": _run_processing,
+    "ValidationNode": _run_validation,
+    "StagingNode": _preview_staging,
+}
+
+
+@contextmanager
+def _read_only(db: Session) -> Iterator[None]:
+    def _reject_flush(session: Session, flush_context: Any, instances: Any) -> None:
+        raise RuntimeError("Preview runs must not write to the database")
+
+    event.listen(db, "before_flush", _reject_flush)
+    try:
+        yield
+    finally:
+        event.remove(db, "before_flush", _reject_flush)
+        db.rollback()
+
+
+def preview_pipeline(
+    db: Session,
+    *,
+    pipeline: Pipeline,
+    inputs: Dict[str, Any],
+    definition: Optional[Dict[str, Any]] = None,
+    sample_chunks: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Execute ``definition`` (default: the pipeline's own) without persisting anything.
+
+    No run, document, chunk, checkpoint or staged row is written and no embeddings are sent to
+    Milvus; each node runs once, without retries. Returns every node's output and timing. A failing
+    node ends the preview and is reported instead of raised.
+    """
+    state = PreviewState(inputs, sample_chunks)
+    definition = definition if definition is not None else pipeline.definition or {}
+    nodes: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    with _read_only(db):
+        for index, node in enumerate(definition.get("nodes", [])):
+            node_type = node.get("type")
+            node_id = node.get("id") or f"{index}:{node_type}"
+            handler = PREVIEW_HANDLERS.get(node_type)
+            if handler is None:
+                nodes.append({"node_id": node_id, "node_type": node_type, "status": "skipped"})
+                continue
+            node_started = time.perf_counter()
+            try:
+                output = handler(db, pipeline, None, state, node.get("config", {}))
+            except Exception as exc:
+                nodes.append(
+                    {
+                        "node_id": node_id,
+                        "node_type": node_type,
+                        "status": "failed",
+                        "duration_ms": round((time.perf_counter() - node_started) * 1000, 2),
+                        "error": str(exc),
+                    }
+                )
+                break
+            nodes.append(
+                {
+                    "node_id": node_id,
+                    "node_type": node_type,
+                    "status": "completed",
+                    "duration_ms": round((time.perf_counter() - node_started) * 1000, 2),
+                    "output": output,
+                }
+            )
+
+    return {
+        "pipeline_id": str(pipeline.id),
+        "preview": True,
+        "status": "failed" if nodes and nodes[-1]["status"] == "failed" else "succeeded",
+        "sample_chunks": sample_chunks,
+        "sampled": state.sampled,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "nodes": nodes,
+        "summary": {"chunks": state.chunk_count, "llm": state.llm_output, "validation": state.validation_report},
+    }
@@ -1,11 +1,17 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ..core.cache import get_cache
 from ..models.pipeline_model import Pipeline
 from ..schemas.pipeline_schemas import PipelineCreate, PipelineUpdate
+from . import run_stats_service
+from .cache_service import bump_version, cached_get
+
+PIPELINE_CACHE = "pipelines"
 
 
 def list_pipelines(db: Session, *, use_case: Optional[str] = None, active_only: bool = True) -> List[Pipeline]:
@@ -17,8 +23,25 @@ def list_pipelines(db: Session, *, use_case: Optional[str] = None, active_only:
     return query.order_by(Pipeline.created_at.desc()).all()
 
 
+def list_pipeline_rows(
+    db: Session,
+    *,
+    fields: Sequence[str],
+    use_case: Optional[str] = None,
+    active_only: bool = True,
+) -> List[Dict[str, Any]]:
+    query = select(*[getattr(Pipeline, name) for name in fields])
+    if use_case:
+        query = query.where(Pipeline.use_case == use_case)
+    if active_only:
+        query = query.where(Pipeline.is_active.is_(True))
+    query = query.order_by(Pipeline.created_at.desc())
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
 def get_pipeline(db: Session, pipeline_id: UUID) -> Optional[Pipeline]:
-    return db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
+    query = select(Pipeline).where(Pipeline.id == pipeline_id)
+    return cached_get(db, get_cache(PIPELINE_CACHE), Pipeline, pipeline_id, query)
 
 
 def create_pipeline(db: Session, payload: PipelineCreate) -> Pipeline:
@@ -48,11 +71,17 @@ def update_pipeline(db: Session, pipeline: Pipeline, payload: PipelineUpdate) ->
 
     pipeline.updated_at = datetime.utcnow()
     db.add(pipeline)
+    bump_version(db, PIPELINE_CACHE)
     db.commit()
+    get_cache(PIPELINE_CACHE).invalidate(pipeline.id)
     db.refresh(pipeline)
     return pipeline
 
 
 def delete_pipeline(db: Session, pipeline: Pipeline) -> None:
+    pipeline_id = pipeline.id
     db.delete(pipeline)
+    run_stats_service.delete_pipeline_stats(db, pipeline_id)
+    bump_version(db, PIPELINE_CACHE)
     db.commit()
+    get_cache(PIPELINE_CACHE).invalidate(pipeline_id)
@@ -1,4 +1,45 @@
-from typing import Dict, List
+import re
+from collections import Counter
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from ..core.config import get_settings
+from . import model_client
+from .prompt_packer import Budget, get_batcher, make_item
+from .tokenizers import get_tokenizer, model_limits
+
+SUMMARY_CHARS = 200
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_PROMPT_HEADER = (
+    "Template {prompt_template_id}, schema {output_schema_id}: {mode} each section independently. "
+    "Answer with one '### section <n>' block per input section.\n"
+)
+_REDUCE_HEADER = (
+    "Template {prompt_template_id}, schema {output_schema_id}: combine the partial {mode} results in the section "
+    "into one answer. Answer with a single '### section 0' block.\n"
+)
+_SECTION = "### section {index}\n"
+_SECTION_MARKER = re.compile(r"^### section (\d+)$", re.MULTILINE)
+
+
+class MissingSections(model_client.ModelCallError):
+    """A packed response left out some sections; ``missing`` holds their indexes."""
+
+    def __init__(self, missing: List[int], count: int) -> None:
+        super().__init__(f"Packed response is missing {len(missing)} of {count} sections: {missing[:20]}")
+        self.missing = missing
+
+
+def _leading_text(chunks: Iterable[str], limit: int) -> str:
+    """Collect the first ``limit`` characters without materializing the rest of the document."""
+    parts: List[str] = []
+    size = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk) + 1
+        if size >= limit:
+            break
+    return " ".join(parts)[:limit]
 
 
 def process_chunks(
@@ -7,15 +48,18 @@ def process_chunks(
     model_name: str,
     prompt_template_id: str,
     output_schema_id: str,
-    chunks: List[str],
+    chunks: Iterable[str],
 ) -> Dict[str, str]:
-    content = " ".join(chunks)
-    if mode == "summarize":
-        summary = content[:200]
+    if model_client.endpoint_configured():
+        header = _PROMPT_HEADER.format(prompt_template_id=prompt_template_id, output_schema_id=output_schema_id, mode=mode)
+        text = _leading_text(chunks, get_settings().map_window_chars)
+        summary = _call_packed(header, model_name, mode, output_schema_id, [text])[0]
+    elif mode == "summarize":
+        summary = _leading_text(chunks, SUMMARY_CHARS)
     elif mode == "classify":
         summary = f"classified:{output_schema_id}"
     else:
-        summary = content[:200]
+        summary = _leading_text(chunks, SUMMARY_CHARS)
 
     return {
         "mode": mode,
@@ -24,3 +68,196 @@ def process_chunks(
         "output_schema_id": output_schema_id,
         "result": summary,
     }
+
+
+def iter_windows(chunks: Iterable[str], window_chars: int) -> Iterator[str]:
+    """Group streamed chunks into windows of roughly ``window_chars``; only one window is held at a time."""
+    window: List[str] = []
+    size = 0
+    for chunk in chunks:
+        if window and size + len(chunk) > window_chars:
+            yield " ".join(window)
+            window, size = [], 0
+        window.append(chunk)
+        size += len(chunk)
+    if window:
+        yield " ".join(window)
+
+
+def map_window(*, mode: str, output_schema_id: str, text: str, partial_chars: int) -> Dict[str, Any]:
+    if mode == "classify":
+        words = re.findall(r"[a-z]{4,}", text.lower())
+        return {"terms": dict(Counter(words).most_common(10))}
+    sentences = _SENTENCE_END.split(text.strip(), maxsplit=1)
+    return {"summary": (sentences[0] if sentences else "")[:partial_chars]}
+
+
+def reduce_partials(*, mode: str, output_schema_id: str, partials: List[Dict[str, Any]], summary_chars: int) -> Dict[str, Any]:
+    if mode == "classify":
+        terms: Counter = Counter()
+        for item in partials:
+            terms.update(item.get("terms", {}))
+        return {"terms": dict(terms.most_common(10))}
+    pieces = [p["summary"] for p in partials if p.get("summary")]
+    if not pieces:
+        return {"summary": ""}
+    # keep every partial represented: trim each piece evenly instead of truncating the tail
+    budget = max(summary_chars // len(pieces), 1)
+    return {"summary": " ".join(piece[:budget] for piece in pieces)[:summary_chars]}
+
+
+def _model_map_window(header: str, model_name: str, mode: str, output_schema_id: str, *, text: str) -> Dict[str, Any]:
+    answer = _call_packed(header, model_name, mode, output_schema_id, [text])[0]
+    if mode == "classify":
+        return {"terms": dict(Counter(term.strip() for term in answer.split(",") if term.strip()))}
+    return {"summary": answer}
+
+
+def _model_reduce_partials(
+    header: str, model_name: str, mode: str, output_schema_id: str, *, partials: List[Dict[str, Any]], summary_chars: int
+) -> Dict[str, Any]:
+    if mode == "classify":  # term counts add up exactly; a model call would only add noise
+        return reduce_partials(mode=mode, output_schema_id=output_schema_id, partials=partials, summary_chars=summary_chars)
+    pieces = [p["summary"] for p in partials if p.get("summary")]
+    if len(pieces) <= 1:
+        return {"summary": pieces[0] if pieces else ""}
+    return {"summary": _call_packed(header, model_name, mode, output_schema_id, ["\n\n".join(pieces)])[0]}
+
+
+def map_reduce_chunks(
+    *,
+    mode: str,
+    model_name: str,
+    prompt_template_id: str,
+    output_schema_id: str,
+    chunks: Iterable[str],
+    window_chars: int,
+    fan_in: int = 16,
+    summary_chars: int = SUMMARY_CHARS,
+) -> Dict[str, Any]:
+    """Map each window as chunks stream in and fold partial results every ``fan_in`` windows.
+
+    Memory is bounded by one window plus ``fan_in`` partials, regardless of document length, and the
+    reduced result covers the whole document rather than its opening. With a model endpoint configured,
+    each window is mapped, and summaries are reduced, by a model call; otherwise both run locally.
+    """
+    if model_client.endpoint_configured():
+        fields = dict(prompt_template_id=prompt_template_id, output_schema_id=output_schema_id, mode=mode)
+        map_one = partial(_model_map_window, _PROMPT_HEADER.format(**fields), model_name, mode, output_schema_id)
+        reduce_all = partial(_model_reduce_partials, _REDUCE_HEADER.format(**fields), model_name, mode, output_schema_id)
+    else:
+        map_one = partial(map_window, mode=mode, output_schema_id=output_schema_id, partial_chars=max(summary_chars // 2, 1))
+        reduce_all = partial(reduce_partials, mode=mode, output_schema_id=output_schema_id)
+
+    partials: List[Dict[str, Any]] = []
+    windows = 0
+    for text in iter_windows(chunks, window_chars):
+        windows += 1
+        partials.append(map_one(text=text))
+        if len(partials) >= fan_in:
+            partials = [reduce_all(partials=partials, summary_chars=summary_chars)]
+    reduced = reduce_all(partials=partials, summary_chars=summary_chars)
+
+    if mode == "classify":
+        top = next(iter(reduced["terms"]), None)
+        result = f"classified:{output_schema_id}:{top}" if top else f"classified:{output_schema_id}"
+    else:
+        result = reduced["summary"]
+    return {
+        "mode": mode,
+        "model": model_name,
+        "prompt_template_id": prompt_template_id,
+        "output_schema_id": output_schema_id,
+        "strategy": "map_reduce",
+        "windows": windows,
+        "result": result,
+    }
+
+
+def render_pack(header: str, texts: List[str]) -> str:
+    return header + "".join(_SECTION.format(index=i) + text + "\n" for i, text in enumerate(texts))
+
+
+def parse_sections(response: str, count: int) -> List[str]:
+    """Split a packed response back into per-section answers; raises ``MissingSections`` if any is absent.
+
+    A section that is present but empty is a valid (empty) answer.
+    """
+    answers: List[Optional[str]] = [None] * count
+    markers = list(_SECTION_MARKER.finditer(response))
+    for position, marker in enumerate(markers):
+        index = int(marker.group(1))
+        end = markers[position + 1].start() if position + 1 < len(markers) else len(response)
+        if index < count:
+            answers[index] = response[marker.end() : end].strip()
+    missing = [index for index, answer in enumerate(answers) if answer is None]
+    if missing:
+        raise MissingSections(missing, count)
+    return answers
+
+
+def local_complete(*, mode: str, output_schema_id: str, prompt: str) -> str:
+    """Stand-in for the model endpoint: answers every section of a packed prompt."""
+    sections = parse_sections(prompt, len(_SECTION_MARKER.findall(prompt)))
+    answers = []
+    for index, text in enumerate(sections):
+        partial_result = map_window(mode=mode, output_schema_id=output_schema_id, text=text, partial_chars=SUMMARY_CHARS)
+        answer = ",".join(partial_result["terms"]) if mode == "classify" else partial_result["summary"]
+        answers.append(_SECTION.format(index=index) + answer + "\n")
+    return "".join(answers)
+
+
+def _call_packed(header: str, model_name: str, mode: str, output_schema_id: str, texts: List[str]) -> List[str]:
+    prompt = render_pack(header, texts)
+    if model_client.endpoint_configured():
+        response = model_client.complete(model_name=model_name, prompt=prompt, mode=mode, output_schema_id=output_schema_id)
+    else:
+        response = local_complete(mode=mode, output_schema_id=output_schema_id, prompt=prompt)
+    return parse_sections(response, len(texts))
+
+
+def packed_process_chunks(
+    *,
+    mode: str,
+    model_name: str,
+    prompt_template_id: str,
+    output_schema_id: str,
+    chunks: Iterable[str],
+    output_tokens_per_item: int = 64,
+    context_tokens: Optional[int] = None,
+    max_output_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Send chunks in requests packed up to the model's context and output budgets.
+
+    Chunks from concurrent runs with the same model and prompt share requests; each result is mapped
+    back to the chunk it came from.
+    """
+    tokenizer = get_tokenizer(model_name)
+    default_context, default_output = model_limits(model_name)
+    header = _PROMPT_HEADER.format(prompt_template_id=prompt_template_id, output_schema_id=output_schema_id, mode=mode)
+    budget = Budget(
+        context_tokens=context_tokens or default_context,
+        max_output_tokens=max_output_tokens or default_output,
+        prompt_overhead=tokenizer.count(header),
+        item_overhead=tokenizer.count(_SECTION.format(index=9999)),
+    )
+    items = [make_item(tokenizer, chunk, output_tokens=output_tokens_per_item, budget=budget) for chunk in chunks if chunk.strip()]
+    key = (model_name, header, budget)
+    results = get_batcher().submit(key, items, budget, partial(_call_packed, header, model_name, mode, output_schema_id)) if items else []
+
+    if mode == "classify":
+        terms: Counter = Counter(term for result in results for term in result.split(",") if term)
+        top = terms.most_common(1)
+        result = f"classified:{output_schema_id}:{top[0][0]}" if top else f"classified:{output_schema_id}"
+    else:
+        result = " ".join(r for r in results if r)[:SUMMARY_CHARS]
+    return {
+        "mode": mode,
+        "model": model_name,
+        "prompt_template_id": prompt_template_id,
+        "output_schema_id": output_schema_id,
+        "strategy": "packed",
+        "sections": results,
+        "input_tokens": sum(item.tokens for item in items),
+        "result": result,
+    }
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence
+
+from ..core.config import get_settings
+from .tokenizers import Tokenizer
+
+
+class PackItem(NamedTuple):
+    text: str
+    tokens: int
+    output_tokens: int
+
+
+class Budget(NamedTuple):
+    context_tokens: int
+    max_output_tokens: int
+    prompt_overhead: int
+    item_overhead: int
+
+    def cost(self, item: PackItem) -> int:
+        return item.tokens + self.item_overhead + item.output_tokens
+
+    @property
+    def capacity(self) -> int:
+        return self.context_tokens - self.prompt_overhead
+
+
+def make_item(tokenizer: Tokenizer, text: str, *, output_tokens: int, budget: Budget) -> PackItem:
+    """Count ``text``, truncating it when it could not fit a request on its own."""
+    tokens = tokenizer.count(text)
+    room = budget.capacity - budget.item_overhead - output_tokens
+    if tokens > room:
+        text = tokenizer.truncate(text, room)
+        tokens = tokenizer.count(text)
+    return PackItem(text=text, tokens=tokens, output_tokens=min(output_tokens, budget.max_output_tokens))
+
+
+def pack_items(items: Sequence[PackItem], budget: Budget) -> List[List[int]]:
+    """First-fit decreasing: returns groups of item indexes whose prompt and output both fit one request."""
+    order = sorted(range(len(items)), key=lambda i: budget.cost(items[i]), reverse=True)
+    packs: List[List[int]] = []
+    used: List[int] = []
+    outputs: List[int] = []
+    for index in order:
+        item = items[index]
+        cost = budget.cost(item)
+        for slot, pack in enumerate(packs):
+            if used[slot] + cost <= budget.capacity and outputs[slot] + item.output_tokens <= budget.max_output_tokens:
+                pack.append(index)
+                used[slot] += cost
+                outputs[slot] += item.output_tokens
+                break
+        else:
+            packs.append([index])
+            used.append(cost)
+            outputs.append(item.output_tokens)
+    # keep each request's sections in submission order so results read naturally
+    return [sorted(pack) for pack in packs]
+
+
+class _Slot:
+    __slots__ = ("item", "result", "error", "done")
+
+    def __init__(self, item: PackItem) -> None:
+        self.item = item
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+PackCall = Callable[[List[str]], List[str]]
+
+
+class PackingBatcher:
+    """Collects items from concurrent callers (e.g. several runs) and sends them as packed requests.
+
+    There is no background thread: a caller whose wait expired, or who sees enough pending work to
+    fill a request, packs and sends the pending items for everyone and wakes them with the results.
+    """
+
+    def __init__(self, *, max_wait_seconds: float, fill_ratio: float = 0.9) -> None:
+        self.max_wait_seconds = max_wait_seconds
+        self.fill_ratio = fill_ratio
+        self._cond = threading.Condition()
+        self._pending: Dict[Hashable, List[_Slot]] = {}
+        self.stats = {"items": 0, "calls": 0, "input_tokens": 0}
+
+    def _take(self, key: Hashable, budget: Budget, flush: bool) -> List[List[_Slot]]:
+        pending = self._pending.get(key, [])
+        if not pending:
+            return []
+        if not flush and sum(budget.cost(s.item) for s in pending) < budget.capacity * self.fill_ratio:
+            return []
+        groups = [[pending[i] for i in pack] for pack in pack_items([s.item for s in pending], budget)]
+        if not flush:
+            # only full requests go now; partly filled ones wait for more items or the deadline
+            groups = [g for g in groups if sum(budget.cost(s.item) for s in g) >= budget.capacity * self.fill_ratio]
+        taken = {id(s) for group in groups for s in group}
+        self._pending[key] = [s for s in pending if id(s) not in taken]
+        return groups
+
+    def _send(self, groups: List[List[_Slot]], call: PackCall) -> None:
+        for group in groups:
+            try:
+                results = call([slot.item.text for slot in group])
+                if len(results) != len(group):
+                    raise RuntimeError(f"Packed response has {len(results)} sections, expected {len(group)}")
+            except Exception as exc:
+                results, error = [None] * len(group), exc
+            else:
+                error = None
+            with self._cond:
+                self.stats["calls"] += 1
+                self.stats["input_tokens"] += sum(slot.item.tokens for slot in group)
+                for slot, result in zip(group, results):
+                    slot.result, slot.error, slot.done = result, error, True
+                self._cond.notify_all()
+
+    def submit(self, key: Hashable, items: Sequence[PackItem], budget: Budget, call: PackCall) -> List[str]:
+        """Return one result per item, in order. ``key`` groups items that may share a request."""
+        slots = [_Slot(item) for item in items]
+        deadline = time.monotonic() + self.max_wait_seconds
+        with self._cond:
+            self._pending.setdefault(key, []).extend(slots)
+            self.stats["items"] += len(slots)
+            self._cond.notify_all()
+        while True:
+            with self._cond:
+                if all(slot.done for slot in slots):
+                    break
+                remaining = deadline - time.monotonic()
+                groups = self._take(key, budget, flush=remaining <= 0)
+                if not groups:
+                    self._cond.wait(timeout=max(remaining, 0.001) if remaining > 0 else 0.05)
+                    continue
+            self._send(groups, call)
+
+        for slot in slots:
+            if slot.error is not None:
+                raise slot.error
+        return [slot.result or "" for slot in slots]
+
+
+_batcher: Optional[PackingBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher() -> PackingBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = PackingBatcher(max_wait_seconds=get_settings().pack_max_wait_ms / 1000)
+        return _batcher
+
+
+def batcher_stats() -> Dict[str, Any]:
+    return dict(_batcher.stats) if _batcher is not None else {"items": 0, "calls": 0, "input_tokens": 0}
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Date, DateTime, delete, func, inspect, select
+from sqlalchemy.orm import Session
+
+from ..core import bulk
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..core.serialization import dumps
+from ..models.base import GUID
+from ..models.checkpoint_model import RunNodeCheckpoint
+from ..models.document_model import Document, IngestedChunk
+from ..models.pipeline_model import Pipeline, PipelineRun
+from ..models.retention_model import ArchivedRun, RetentionPolicy
+from ..models.staging_model import StagedData
+from . import search_service
+from .cache_service import snapshot
+
+logger = get_logger(__name__)
+
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+def set_policy(
+    db: Session,
+    *,
+    retain_days: int,
+    pipeline_id: Optional[UUID] = None,
+    use_case: Optional[str] = None,
+    archive: bool = True,
+) -> RetentionPolicy:
+    if (pipeline_id is None) == (use_case is None):
+        raise ValueError("Exactly one of pipeline_id or use_case must be provided")
+    query = select(RetentionPolicy)
+    if pipeline_id is not None:
+        query = query.where(RetentionPolicy.pipeline_id == pipeline_id)
+    else:
+        query = query.where(RetentionPolicy.use_case == use_case)
+    policy = db.execute(query).scalars().first() or RetentionPolicy(pipeline_id=pipeline_id, use_case=use_case)
+    policy.retain_days = retain_days
+    policy.archive = archive
+    policy.updated_at = datetime.utcnow()
+    db.add(policy)
+    db.commit()
+    db.refresh(policy)
+    return policy
+
+
+def resolve_policy(pipeline: Pipeline, policies: Sequence[RetentionPolicy]) -> Optional[Dict[str, Any]]:
+    """Pipeline-specific policy wins over the use-case policy, which wins over the global default."""
+    by_pipeline = {p.pipeline_id: p for p in policies if p.pipeline_id is not None}
+    by_use_case = {p.use_case: p for p in policies if p.use_case is not None}
+    policy = by_pipeline.get(pipeline.id) or by_use_case.get(pipeline.use_case)
+    if policy is not None:
+        return {"retain_days": policy.retain_days, "archive": policy.archive}
+    default_days = get_settings().retention_default_days
+    if default_days is None:
+        return None
+    return {"retain_days": default_days, "archive": True}
+
+
+def _expired_run_ids(db: Session, pipeline_id: UUID, cutoff: datetime, limit: int) -> List[UUID]:
+    query = (
+        select(PipelineRun.id)
+        .where(
+            PipelineRun.pipeline_id == pipeline_id,
+            PipelineRun.status.in_(FINISHED_STATUSES),
+            PipelineRun.completed_at < cutoff,
+        )
+        .order_by(PipelineRun.completed_at)
+        .limit(limit)
+    )
+    return list(db.execute(query).scalars())
+
+
+def _collect(db: Session, run_ids: Sequence[UUID]) -> Iterator[Dict[str, Any]]:
+    runs = db.execute(select(PipelineRun).where(PipelineRun.id.in_(run_ids))).scalars().all()
+    documents = db.execute(select(Document).where(Document.pipeline_run_id.in_(run_ids))).scalars().all()
+    document_ids = [d.id for d in documents]
+    chunks = (
+        db.execute(select(IngestedChunk).where(IngestedChunk.document_id.in_(document_ids))).scalars().all()
+        if document_ids
+        else []
+    )
+    staged = db.execute(select(StagedData).where(StagedData.pipeline_run_id.in_(run_ids))).scalars().all()
+    checkpoints = (
+        db.execute(select(RunNodeCheckpoint).where(RunNodeCheckpoint.pipeline_run_id.in_(run_ids))).scalars().all()
+    )
+
+    for run in runs:
+        run_docs = [d for d in documents if d.pipeline_run_id == run.id]
+        run_doc_ids = {d.id for d in run_docs}
+        yield {
+            "run": snapshot(run),
+            "documents": [snapshot(d) for d in run_docs],
+            "chunks": [snapshot(c) for c in chunks if c.document_id in run_doc_ids],
+            "staged": [snapshot(s) for s in staged if s.pipeline_run_id == run.id],
+            "checkpoints": [snapshot(c) for c in checkpoints if c.pipeline_run_id == run.id],
+        }
+
+
+def _partition_path(archive_dir: Path, pipeline_id: UUID, created_at: Optional[datetime]) -> Path:
+    day = (created_at or datetime.utcnow()).date()
+    return archive_dir / f"{day:%Y}" / f"{day:%m}" / f"{day:%d}" / f"runs-{pipeline_id}.jsonl.gz"
+
+
+def _write_archive(archive_dir: Path, pipeline_id: UUID, records: List[Dict[str, Any]]) -> Dict[UUID, Path]:
+    """Append records to their date partitions; each append is a separate gzip member, which readers concatenate."""
+    by_path: Dict[Path, List[Dict[str, Any]]] = {}
+    for record in records:
+        path = _partition_path(archive_dir, pipeline_id, record["run"]["created_at"])
+        by_path.setdefault(path, []).append(record)
+
+    written: Dict[UUID, Path] = {}
+    for path, items in by_path.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as handle:
+                for record in items:
+                    handle.write(dumps(record) + b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+        for record in items:
+            written[record["run"]["id"]] = path
+    return written
+
+
+def _delete_runs(db: Session, run_ids: Sequence[UUID]) -> None:
+    db.execute(delete(StagedData).where(StagedData.pipeline_run_id.in_(run_ids)))
+    # documents still referenced by another run's staged rows are detached rather than deleted,
+    # and keep their chunks
+    referenced = select(StagedData.document_id).where(StagedData.document_id.is_not(None))
+    document_ids = select(Document.id).where(Document.pipeline_run_id.in_(run_ids), Document.id.not_in(referenced))
+    db.execute(delete(IngestedChunk).where(IngestedChunk.document_id.in_(document_ids)))
+    db.execute(
+        delete(Document).where(Document.pipeline_run_id.in_(run_ids), Document.id.not_in(referenced))
+    )
+    db.execute(
+        Document.__table__.update().where(Document.pipeline_run_id.in_(run_ids)).values(pipeline_run_id=None)
+    )
+    db.execute(delete(RunNodeCheckpoint).where(RunNodeCheckpoint.pipeline_run_id.in_(run_ids)))
+    search_service.remove_runs(db, run_ids)
+    db.execute(delete(PipelineRun).where(PipelineRun.id.in_(run_ids)))
+
+
+def apply_retention(
+    db: Session,
+    *,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    dry_run: bool = False,
+    archive_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Archive and delete expired runs in short batches.
+
+    Each batch is its own transaction, so live tables are only locked for one batch at a time, and
+    the pass can be stopped after ``max_batches`` and resumed later.
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.retention_batch_size
+    archive_dir = Path(archive_dir or settings.archive_dir)
+    now = now or datetime.utcnow()
+    policies = db.execute(select(RetentionPolicy)).scalars().all()
+    pipelines = db.execute(select(Pipeline)).scalars().all()
+
+    report: Dict[str, Any] = {"archived": 0, "deleted": 0, "batches": 0, "pipelines": {}}
+    for pipeline in pipelines:
+        policy = resolve_policy(pipeline, policies)
+        if policy is None:
+            continue
+        cutoff = now - timedelta(days=policy["retain_days"])
+        if dry_run:
+            expired = db.execute(
+                select(func.count(PipelineRun.id)).where(
+                    PipelineRun.pipeline_id == pipeline.id,
+                    PipelineRun.status.in_(FINISHED_STATUSES),
+                    PipelineRun.completed_at < cutoff,
+                )
+            ).scalar()
+            if expired:
+                report["pipelines"][str(pipeline.id)] = expired
+            continue
+
+        pipeline_count = 0
+        while max_batches is None or report["batches"] < max_batches:
+            run_ids = _expired_run_ids(db, pipeline.id, cutoff, batch_size)
+            if not run_ids:
+                break
+            records = list(_collect(db, run_ids))
+            paths = _write_archive(archive_dir, pipeline.id, records) if policy["archive"] else {}
+            for record in records:
+                run = record["run"]
+                db.add(
+                    ArchivedRun(
+                        run_id=run["id"],
+                        pipeline_id=pipeline.id,
+                        archive_path=str(paths[run["id"]]) if run["id"] in paths else None,
+                        run_created_at=run["created_at"],
+                    )
+                )
+            _delete_runs(db, run_ids)
+            db.commit()
+            db.expunge_all()
+
+            report["batches"] += 1
+            report["deleted"] += len(run_ids)
+            report["archived"] += len(paths)
+            pipeline_count += len(run_ids)
+            logger.info(
+                "Retention batch applied",
+                extra={"pipeline_id": str(pipeline.id), "runs": len(run_ids), "archived": len(paths)},
+            )
+        if pipeline_count:
+            report["pipelines"][str(pipeline.id)] = pipeline_count
+    if dry_run:
+        report["would_delete"] = sum(report["pipelines"].values())
+    return report
+
+
+def _coerce(model: Any, values: Dict[str, Any]) -> Dict[str, Any]:
+    columns = {attr.key: attr.columns[0] for attr in inspect(model).column_attrs}
+    coerced: Dict[str, Any] = {}
+    for key, value in values.items():
+        column = columns.get(key)
+        if column is None or value is None:
+            coerced[key] = value
+        elif isinstance(column.type, DateTime):
+            coerced[key] = datetime.fromisoformat(value)
+        elif isinstance(column.type, Date):
+            coerced[key] = date.fromisoformat(value)
+        elif isinstance(column.type, GUID):
+            coerced[key] = UUID(value)
+        else:
+            coerced[key] = value
+    return coerced
+
+
+def _read_archive(path: Path, run_id: UUID) -> Optional[Dict[str, Any]]:
+    found: Optional[Dict[str, Any]] = None
+    target = str(run_id)
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if target not in line:
+                continue
+            record = json.loads(line)
+            if record["run"]["id"] == target:
+                found = record  # keep the last copy if a crashed pass archived it twice
+    return found
+
+
+def restore_run(db: Session, run_id: UUID) -> PipelineRun:
+    entry = db.get(ArchivedRun, run_id)
+    if entry is None:
+        raise ValueError("Run is not archived")
+    if not entry.archive_path:
+        raise ValueError("Run was deleted without an archive copy")
+    record = _read_archive(Path(entry.archive_path), run_id)
+    if record is None:
+        raise ValueError("Archived run not found in its partition")
+
+    run = PipelineRun(**_coerce(PipelineRun, record["run"]))
+    db.add(run)
+    db.flush()
+    restored = set()
+    for values in record["documents"]:
+        if db.get(Document, UUID(values["id"])) is None:
+            db.add(Document(**_coerce(Document, values)))
+            restored.add(values["id"])
+        else:  # detached by retention and still holding its chunks
+            db.execute(
+                Document.__table__.update().where(Document.id == UUID(values["id"])).values(pipeline_run_id=run.id)
+            )
+    db.flush()
+    chunks = [values for values in record["chunks"] if values["document_id"] in restored]
+    bulk.insert_rows(db, IngestedChunk, [_coerce(IngestedChunk, values) for values in chunks])
+    bulk.insert_rows(db, StagedData, [_coerce(StagedData, values) for values in record["staged"]])
+    for values in record.get("checkpoints", []):
+        db.add(RunNodeCheckpoint(**_coerce(RunNodeCheckpoint, values)))
+    db.flush()
+    search_service.index_run(db, run.id)
+    db.delete(entry)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def compact(db: Session) -> None:
+    """Return freed pages to the OS without taking a long exclusive lock.
+
+    On SQLite this needs ``auto_vacuum=INCREMENTAL``, which only databases created by this version
+    have; older files keep their free pages until a one-off ``VACUUM`` (see the README).
+    """
+    engine = db.get_bind()
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == SQLITE_AUTO_VACUUM_INCREMENTAL:
+                # executescript steps the pragma to completion; a plain execute frees a single page
+                conn.connection.driver_connection.executescript("PRAGMA incremental_vacuum")
+            else:
+                logger.warning("SQLite auto_vacuum is not INCREMENTAL; run VACUUM once to reclaim free pages")
+            conn.exec_driver_sql("PRAGMA optimize")
+    elif engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for table in (PipelineRun, Document, IngestedChunk, StagedData):
+                conn.exec_driver_sql(f"VACUUM ANALYZE {table.__tablename__}")
@@ -0,0 +1,47 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.cache import get_cache
+from ..models.validation_model import ValidationRuleSet
+from .cache_service import bump_version, cached_get
+
+RULESET_CACHE = "validation_rulesets"
+
+
+def get_ruleset(db: Session, name: str) -> Optional[ValidationRuleSet]:
+    query = select(ValidationRuleSet).where(ValidationRuleSet.name == name, ValidationRuleSet.is_active.is_(True))
+    return cached_get(db, get_cache(RULESET_CACHE), ValidationRuleSet, name, query)
+
+
+def upsert_ruleset(
+    db: Session,
+    *,
+    name: str,
+    use_case: str,
+    config: Dict[str, Any],
+    description: Optional[str] = None,
+    is_active: bool = True,
+) -> ValidationRuleSet:
+    ruleset = db.execute(select(ValidationRuleSet).where(ValidationRuleSet.name == name)).scalars().first()
+    if ruleset is None:
+        ruleset = ValidationRuleSet(name=name)
+    ruleset.use_case = use_case
+    ruleset.config = config
+    ruleset.description = description
+    ruleset.is_active = is_active
+    db.add(ruleset)
+    bump_version(db, RULESET_CACHE)
+    db.commit()
+    get_cache(RULESET_CACHE).invalidate(name)
+    db.refresh(ruleset)
+    return ruleset
+
+
+def delete_ruleset(db: Session, ruleset: ValidationRuleSet) -> None:
+    name = ruleset.name
+    db.delete(ruleset)
+    bump_version(db, RULESET_CACHE)
+    db.commit()
+    get_cache(RULESET_CACHE).invalidate(name)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.pipeline_model import RUN_PRIORITIES, Pipeline, PipelineRun
+from . import run_stats_service
+
+CLAIM_CANDIDATES = 8
+
+_priority_rank = case(
+    {priority: rank for rank, priority in enumerate(RUN_PRIORITIES)},
+    value=PipelineRun.priority,
+    else_=len(RUN_PRIORITIES),
+)
+
+
+def _claimable(now: datetime):
+    """Queued runs, plus running runs whose worker stopped renewing its lease."""
+    return or_(
+        PipelineRun.status == "queued",
+        and_(PipelineRun.status == "running", PipelineRun.lease_expires_at < now),
+    )
+
+
+def count_queued(db: Session, *, priority: Optional[str] = None) -> int:
+    query = select(func.count(PipelineRun.id)).where(PipelineRun.status == "queued")
+    if priority:
+        query = query.where(PipelineRun.priority == priority)
+    return db.execute(query).scalar() or 0
+
+
+def _in_flight(now: datetime):
+    return and_(
+        PipelineRun.status == "running",
+        or_(PipelineRun.lease_expires_at.is_(None), PipelineRun.lease_expires_at >= now),
+    )
+
+
+def _busy(db: Session, now: datetime) -> Tuple[Set[UUID], Counter]:
+    """Pipelines at their ``max_concurrent_runs`` cap, and runs in flight per use case."""
+    running = dict(
+        db.execute(
+            select(PipelineRun.pipeline_id, func.count(PipelineRun.id))
+            .where(_in_flight(now))
+            .group_by(PipelineRun.pipeline_id)
+        ).all()
+    )
+    full: Set[UUID] = set()
+    by_use_case: Counter = Counter()
+    if not running:
+        return full, by_use_case
+    default_cap = get_settings().scheduler_max_runs_per_pipeline
+    pipelines = select(Pipeline.id, Pipeline.use_case, Pipeline.definition).where(Pipeline.id.in_(list(running)))
+    for pipeline_id, use_case, definition in db.execute(pipelines):
+        by_use_case[use_case] += running[pipeline_id]
+        cap = (definition or {}).get("metadata", {}).get("max_concurrent_runs") or default_cap
+        if running[pipeline_id] >= cap:
+            full.add(pipeline_id)
+    return full, by_use_case
+
+
+def _candidates(db: Session, now: datetime):
+    """Claimable runs of the use case to serve next, oldest first; ``None`` when nothing is claimable.
+
+    Mirrors ``RunScheduler._pick`` across workers: the most urgent priority class wins, pipelines
+    at their cap are skipped, and within the class the use case with the least weighted work in
+    flight goes next. Caps are checked when claiming, so workers racing for the last slot of a
+    pipeline can briefly exceed it.
+    """
+    full, by_use_case = _busy(db, now)
+    claimable = [_claimable(now)]
+    if full:
+        claimable.append(PipelineRun.pipeline_id.not_in(list(full)))
+    rank = db.execute(select(func.min(_priority_rank)).where(*claimable)).scalar()
+    if rank is None:
+        return None
+    claimable.append(_priority_rank == rank)
+    heads = db.execute(
+        select(Pipeline.use_case, func.min(PipelineRun.created_at))
+        .join(Pipeline, Pipeline.id == PipelineRun.pipeline_id)
+        .where(*claimable)
+        .group_by(Pipeline.use_case)
+    ).all()
+    if not heads:
+        return None
+    weights = get_settings().scheduler_use_case_weights
+    use_case = min(heads, key=lambda head: (by_use_case[head[0]] / weights.get(head[0], 1.0), head[1]))[0]
+    return (
+        select(PipelineRun.id)
+        .where(*claimable, PipelineRun.pipeline_id.in_(select(Pipeline.id).where(Pipeline.use_case == use_case)))
+        .order_by(PipelineRun.created_at)
+    )
+
+
+def claim_next_run(db: Session, *, worker_id: str, lease_seconds: int) -> Optional[PipelineRun]:
+    """Lease the next claimable run to ``worker_id``, chosen as described in ``_candidates``.
+
+    Postgres locks the candidate row with ``FOR UPDATE SKIP LOCKED`` so concurrent workers never
+    wait on each other. Other databases (SQLite) race with a conditional UPDATE that only succeeds
+    while the row is still claimable; the loser moves on to the next candidate.
+    """
+    now = datetime.utcnow()
+    lease = {
+        "status": "running",
+        "lease_owner": worker_id,
+        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+        "heartbeat_at": now,
+        "started_at": func.coalesce(PipelineRun.started_at, now),
+        "attempts": func.coalesce(PipelineRun.attempts, 0) + 1,
+    }
+    candidates = _candidates(db, now)
+    if candidates is None:
+        db.rollback()
+        return None
+
+    if db.get_bind().dialect.name == "postgresql":
+        run_id = db.execute(candidates.limit(1).with_for_update(skip_locked=True)).scalar()
+        if run_id is None:
+            db.rollback()
+            return None
+        db.execute(update(PipelineRun).where(PipelineRun.id == run_id).values(**lease))
+        db.commit()
+        return db.get(PipelineRun, run_id, populate_existing=True)
+
+    for run_id in db.execute(candidates.limit(CLAIM_CANDIDATES)).scalars().all():
+        result = db.execute(
+            update(PipelineRun)
+            .where(PipelineRun.id == run_id, _claimable(now))
+            .values(**lease)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount == 1:
+            return db.get(PipelineRun, run_id, populate_existing=True)
+    return None
+
+
+def renew_lease(db: Session, *, run_id: UUID, worker_id: str, lease_seconds: int) -> bool:
+    now = datetime.utcnow()
+    result = db.execute(
+        update(PipelineRun)
+        .where(PipelineRun.id == run_id, PipelineRun.lease_owner == worker_id, PipelineRun.status == "running")
+        .values(lease_expires_at=now + timedelta(seconds=lease_seconds), heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def holds_lease(db: Session, *, run_id: UUID, worker_id: str) -> bool:
+    query = select(PipelineRun.id).where(
+        PipelineRun.id == run_id, PipelineRun.lease_owner == worker_id, PipelineRun.status == "running"
+    )
+    return db.execute(query).first() is not None
+
+
+def release_lease(db: Session, *, run_id: UUID, worker_id: str) -> None:
+    db.execute(
+        update(PipelineRun)
+        .where(PipelineRun.id == run_id, PipelineRun.lease_owner == worker_id)
+        .values(lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def fail_run(db: Session, run: PipelineRun, message: str) -> None:
+    run.status = "failed"
+    run.error_message = message
+    run.completed_at = datetime.utcnow()
+    run.lease_owner = None
+    run.lease_expires_at = None
+    db.add(run)
+    run_stats_service.record_run(db, run)
+    db.commit()
@@ -1,28 +1,157 @@
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from ..core.config import get_settings
 from ..core.logging import get_logger
-from ..models.pipeline_model import Pipeline, PipelineRun
+from ..models.pipeline_model import RUN_PRIORITIES, Pipeline, PipelineRun
 from ..schemas.run_schemas import RunCreate
-from .pipeline_orchestrator import execute_pipeline
+from . import idempotency, run_queue, run_stats_service
+from .pipeline_orchestrator import execute_pipeline, preview_pipeline
+from .scheduler import AdmissionRejected, get_scheduler
 
 logger = get_logger(__name__)
 
 
+def resolve_priority(pipeline: Pipeline, payload: RunCreate) -> str:
+    metadata = (pipeline.definition or {}).get("metadata", {})
+    priority = payload.priority or metadata.get("priority") or "normal"
+    if priority not in RUN_PRIORITIES:
+        raise ValueError(f"Unknown priority class: {priority}")
+    return priority
+
+
 def create_run(db: Session, pipeline: Pipeline, payload: RunCreate) -> PipelineRun:
+    """Execute a run once the scheduler admits it; raises ``AdmissionRejected`` when saturated."""
+    return submit_run(db, pipeline, payload)[0]
+
+
+def preview_run(db: Session, pipeline: Pipeline, payload: RunCreate) -> Dict[str, Any]:
+    """Execute the pipeline (or ``payload.definition``) without creating a run or writing any rows."""
+    payload.validate_payload()
+    return preview_pipeline(
+        db,
+        pipeline=pipeline,
+        inputs=_run_inputs(payload),
+        definition=payload.definition.dict() if payload.definition is not None else None,
+        sample_chunks=payload.sample_chunks,
+    )
+
+
+def submit_run(
+    db: Session, pipeline: Pipeline, payload: RunCreate, idempotency_key: Optional[str] = None
+) -> Tuple[PipelineRun, bool]:
+    """Like ``create_run``, but returns ``(run, created)``.
+
+    A submission whose idempotency key (explicit or derived) matches a reusable run returns that run
+    at once instead of running again, even while it is still executing; callers poll it from there.
+    """
     payload.validate_payload()
+    priority = resolve_priority(pipeline, payload)
+    metadata = (pipeline.definition or {}).get("metadata", {})
+    queued = get_settings().enable_background_workers
+    key = idempotency.resolve_key(pipeline, payload, idempotency_key)
+
+    if key:
+        existing = idempotency.find_run(db, pipeline.id, key)
+        if existing is not None:
+            logger.info("Duplicate run request attached", extra={"run_id": str(existing.id)})
+            return existing, False
+
+    try:
+        if queued:
+            return enqueue_run(db, pipeline, payload, priority, idempotency_key=key), True
+        with get_scheduler().slot(
+            pipeline_id=str(pipeline.id),
+            use_case=pipeline.use_case,
+            priority=priority,
+            max_per_pipeline=metadata.get("max_concurrent_runs"),
+        ):
+            return _execute_run(db, pipeline, payload, priority, idempotency_key=key), True
+    except idempotency.DuplicateRun:
+        existing = idempotency.find_run(db, pipeline.id, key)
+        if existing is None:  # the winner already failed and gave its key up; the client may retry
+            raise ValueError("A concurrent identical run failed; retry the request")
+        return existing, False
+
+
+def _run_inputs(payload: RunCreate) -> Dict[str, Optional[str]]:
+    return {
+        "input_ref": payload.input_ref,
+        "text_payload": payload.text_payload,
+        "file_path": payload.file_path,
+        "document_id": str(payload.document_id) if payload.document_id else None,
+    }
+
+
+def enqueue_run(
+    db: Session, pipeline: Pipeline, payload: RunCreate, priority: str, idempotency_key: Optional[str] = None
+) -> PipelineRun:
+    """Persist a queued run for the worker fleet to claim instead of executing it in this process."""
+    settings = get_settings()
+    if run_queue.count_queued(db) >= settings.worker_max_queued_runs:
+        raise AdmissionRejected("Run queue is full", retry_after=max(1, int(settings.worker_lease_seconds / 2)))
+
+    return enqueue_runs(db, pipeline, [payload], priority, idempotency_keys=[idempotency_key])[0]
+
+
+def enqueue_runs(
+    db: Session,
+    pipeline: Pipeline,
+    payloads: Sequence[RunCreate],
+    priority: str,
+    idempotency_keys: Optional[Sequence[Optional[str]]] = None,
+) -> List[PipelineRun]:
+    """Insert a batch of queued runs in one transaction."""
+    now = datetime.utcnow()
+    keys = idempotency_keys or [None] * len(payloads)
+    runs = []
+    for payload, key in zip(payloads, keys):
+        payload.validate_payload()
+        runs.append(
+            PipelineRun(
+                pipeline_id=pipeline.id,
+                status="queued",
+                input_ref=payload.input_ref,
+                priority=priority,
+                inputs=_run_inputs(payload),
+                idempotency_key=key,
+                created_at=now,
+            )
+        )
+    db.add_all(runs)
+    _commit_new_runs(db)
+    logger.info("Runs queued", extra={"pipeline_id": str(pipeline.id), "runs": len(runs), "priority": priority})
+    return runs
+
 
+def _commit_new_runs(db: Session) -> None:
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise idempotency.DuplicateRun()
+
+
+def _execute_run(
+    db: Session, pipeline: Pipeline, payload: RunCreate, priority: str, idempotency_key: Optional[str] = None
+) -> PipelineRun:
+    inputs = _run_inputs(payload)
     run = PipelineRun(
         pipeline_id=pipeline.id,
         status="queued",
         input_ref=payload.input_ref,
+        priority=priority,
+        inputs=inputs,
+        idempotency_key=idempotency_key,
         created_at=datetime.utcnow(),
     )
     db.add(run)
-    db.commit()
+    _commit_new_runs(db)
     db.refresh(run)
 
     run.status = "running"
@@ -31,17 +160,53 @@ def create_run(db: Session, pipeline: Pipeline, payload: RunCreate) -> PipelineR
     db.commit()
     db.refresh(run)
 
-    inputs: Dict[str, Optional[str]] = {
-        "input_ref": payload.input_ref,
-        "text_payload": payload.text_payload,
-        "file_path": payload.file_path,
-        "document_id": str(payload.document_id) if payload.document_id else None,
-    }
     summary = execute_pipeline(db, pipeline=pipeline, run=run, inputs=inputs)  # synchronous for POC
     logger.info("Run completed", extra={"run_id": str(run.id), "summary": summary})
     return run
 
 
+def _reopen_failed_run(db: Session, run: PipelineRun, status: str, **values: Any) -> None:
+    """Move a failed run to ``status`` and retract its stats in one transaction.
+
+    The conditional UPDATE lets only one of several concurrent resumes win; the others get a ``ValueError``.
+    """
+    result = db.execute(
+        update(PipelineRun)
+        .where(PipelineRun.id == run.id, PipelineRun.status == "failed")
+        .values(status=status, error_message=None, completed_at=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        raise ValueError("Run is no longer failed; it is already being resumed")
+    run_stats_service.retract_run(db, run)  # ``run`` still holds the failed status and completion time
+    db.commit()
+    db.refresh(run)
+
+
+def resume_run(db: Session, pipeline: Pipeline, run: PipelineRun) -> PipelineRun:
+    """Re-execute a failed run from its first node without a completed checkpoint."""
+    if run.status != "failed":
+        raise ValueError(f"Only failed runs can be resumed (run is {run.status})")
+
+    if get_settings().enable_background_workers:
+        _reopen_failed_run(db, run, "queued", attempts=0)
+        return run
+
+    metadata = (pipeline.definition or {}).get("metadata", {})
+    with get_scheduler().slot(
+        pipeline_id=str(pipeline.id),
+        use_case=pipeline.use_case,
+        priority=run.priority or "normal",
+        max_per_pipeline=metadata.get("max_concurrent_runs"),
+    ):
+        # reopen only once admitted, so no write transaction (or stats row lock) is held while waiting
+        _reopen_failed_run(db, run, "running")
+        summary = execute_pipeline(db, pipeline=pipeline, run=run, inputs=run.inputs or {})
+        logger.info("Run resumed", extra={"run_id": str(run.id), "summary": summary})
+        return run
+
+
 def get_run(db: Session, run_id: UUID) -> Optional[PipelineRun]:
     return db.query(PipelineRun).filter(PipelineRun.id == run_id).first()
 
@@ -53,3 +218,27 @@ def list_runs(db: Session, *, pipeline_id: Optional[UUID] = None, status: Option
     if status:
         query = query.filter(PipelineRun.status == status)
     return query.order_by(PipelineRun.created_at.desc()).limit(limit).all()
+
+
+def get_run_row(db: Session, run_id: UUID, *, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+    columns = [getattr(PipelineRun, name) for name in fields]
+    row = db.execute(select(*columns).where(PipelineRun.id == run_id)).mappings().first()
+    return dict(row) if row is not None else None
+
+
+def list_run_rows(
+    db: Session,
+    *,
+    fields: Sequence[str],
+    pipeline_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """Like ``list_runs`` but selects only ``fields`` and returns plain dicts, skipping ORM hydration."""
+    query = select(*[getattr(PipelineRun, name) for name in fields])
+    if pipeline_id:
+        query = query.where(PipelineRun.pipeline_id == pipeline_id)
+    if status:
+        query = query.where(PipelineRun.status == status)
+    query = query.order_by(PipelineRun.created_at.desc()).limit(limit)
+    return [dict(row) for row in db.execute(query).mappings()]
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.logging import get_logger
+from ..models.pipeline_model import PipelineRun
+from ..models.stats_model import RunStatsBucket
+
+logger = get_logger(__name__)
+
+BUCKET = timedelta(hours=1)
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+FINAL_STATUSES = ("succeeded", "failed")
+RELATIVE_ACCURACY = 0.01
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class DurationSketch:
+    """Log-bucketed histogram (DDSketch style): quantiles within ``RELATIVE_ACCURACY`` of the true value.
+
+    Sketches merge by adding bin counts, so any window is answered from its hourly buckets.
+    """
+
+    _gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    _log_gamma = math.log(_gamma)
+
+    def __init__(self, bins: Optional[Dict[int, int]] = None, zero: int = 0) -> None:
+        self.bins: Dict[int, int] = dict(bins or {})
+        self.zero = zero
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.bins.values())
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value <= 1.0:
+            self.zero += weight
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + weight
+        if self.bins[index] <= 0:
+            del self.bins[index]
+
+    def merge(self, other: "DurationSketch") -> None:
+        self.zero += other.zero
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.count
+        if total <= 0:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero
+        if rank < seen:
+            return 1.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.bins) / (self._gamma + 1)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"zero": self.zero, "bins": {str(index): count for index, count in self.bins.items()}}
+
+    @classmethod
+    def from_json(cls, data: Optional[Dict[str, Any]]) -> "DurationSketch":
+        data = data or {}
+        return cls({int(index): count for index, count in data.get("bins", {}).items()}, data.get("zero", 0))
+
+
+def bucket_start(moment: datetime, width: timedelta = BUCKET) -> datetime:
+    epoch = datetime(1970, 1, 1, tzinfo=moment.tzinfo)
+    return moment - ((moment - epoch) % width)
+
+
+def _duration_ms(run: PipelineRun) -> Optional[float]:
+    if run.started_at is None or run.completed_at is None:
+        return None
+    return max((run.completed_at - run.started_at).total_seconds() * 1000, 0.0)
+
+
+def _apply(db: Session, pipeline_id: UUID, start: datetime, status: str, duration_ms: Optional[float], weight: int) -> None:
+    query = select(RunStatsBucket).where(
+        RunStatsBucket.pipeline_id == pipeline_id,
+        RunStatsBucket.bucket_start == start,
+        RunStatsBucket.status == status,
+    )
+    # the row lock serialises read-modify-write of the sketch between workers (no-op on SQLite)
+    bucket = db.execute(query.with_for_update()).scalars().first()
+    if bucket is None:
+        try:
+            with db.begin_nested():
+                bucket = RunStatsBucket(
+                    pipeline_id=pipeline_id, bucket_start=start, status=status, run_count=0, duration_sum_ms=0, sketch={}
+                )
+                db.add(bucket)
+        except IntegrityError:  # another worker created the bucket first
+            bucket = db.execute(query.with_for_update()).scalars().one()
+
+    bucket.run_count = max((bucket.run_count or 0) + weight, 0)
+    if duration_ms is not None:
+        bucket.duration_sum_ms = max((bucket.duration_sum_ms or 0) + round(duration_ms) * weight, 0)
+        sketch = DurationSketch.from_json(bucket.sketch)
+        sketch.add(duration_ms, weight)
+        bucket.sketch = sketch.to_json()
+        if weight > 0:  # min/max are not retracted
+            if bucket.duration_min_ms is None or duration_ms < bucket.duration_min_ms:
+                bucket.duration_min_ms = duration_ms
+            if bucket.duration_max_ms is None or duration_ms > bucket.duration_max_ms:
+                bucket.duration_max_ms = duration_ms
+    bucket.updated_at = datetime.utcnow()
+    db.add(bucket)
+
+
+def _update(db: Session, run: PipelineRun, weight: int) -> None:
+    if run.status not in FINAL_STATUSES or run.completed_at is None:
+        return
+    try:
+        with db.begin_nested():
+            _apply(db, run.pipeline_id, bucket_start(run.completed_at), run.status, _duration_ms(run), weight)
+    except Exception:  # statistics must never fail the run itself
+        logger.exception("Run statistics update failed", extra={"run_id": str(run.id)})
+
+
+def record_run(db: Session, run: PipelineRun) -> None:
+    """Count a run that just reached a final status, in the caller's transaction."""
+    _update(db, run, 1)
+
+
+def retract_run(db: Session, run: PipelineRun) -> None:
+    """Undo ``record_run`` before a finished run is executed again (e.g. on resume)."""
+    _update(db, run, -1)
+
+
+# -- reading -----------------------------------------------------------------------------------
+
+
+def _summarise(count: int, duration_sum: int, sketch: DurationSketch, low: Optional[float], high: Optional[float]) -> Dict[str, Any]:
+    timed = sketch.count
+    return {
+        "runs": count,
+        "duration_ms": {
+            "mean": _round(_clamp(duration_sum / timed, low, high)) if timed else None,
+            "min": low,
+            "max": high,
+            **{f"p{int(q * 100)}": _round(_clamp(sketch.quantile(q), low, high)) for q in QUANTILES},
+        },
+    }
+
+
+def _clamp(value: Optional[float], low: Optional[float], high: Optional[float]) -> Optional[float]:
+    """Keep estimates inside the observed range; sketch bins and the whole-millisecond sum can overshoot it."""
+    if value is None:
+        return None
+    if low is not None:
+        value = max(value, low)
+    if high is not None:
+        value = min(value, high)
+    return value
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+class _Accumulator:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration_sum = 0
+        self.sketch = DurationSketch()
+        self.low: Optional[float] = None
+        self.high: Optional[float] = None
+
+    def add_bucket(self, bucket: RunStatsBucket) -> None:
+        self.count += bucket.run_count or 0
+        self.duration_sum += bucket.duration_sum_ms or 0
+        self.sketch.merge(DurationSketch.from_json(bucket.sketch))
+        if bucket.duration_min_ms is not None:
+            self.low = min(self.low, bucket.duration_min_ms) if self.low is not None else bucket.duration_min_ms
+        if bucket.duration_max_ms is not None:
+            self.high = max(self.high, bucket.duration_max_ms) if self.high is not None else bucket.duration_max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return _summarise(self.count, self.duration_sum, self.sketch, self.low, self.high)
+
+
+def pipeline_stats(
+    db: Session,
+    pipeline_id: UUID,
+    *,
+    since: datetime,
+    until: datetime,
+    granularity: str = "hour",
+) -> Dict[str, Any]:
+    """Totals and a time series per status, read from rollup buckets only.
+
+    The cost depends on the number of buckets in the window, not on how many runs the pipeline has.
+    """
+    width = GRANULARITIES[granularity]
+    buckets = db.execute(
+        select(RunStatsBucket)
+        .where(
+            RunStatsBucket.pipeline_id == pipeline_id,
+            RunStatsBucket.bucket_start >= bucket_start(since),
+            RunStatsBucket.bucket_start < until,
+        )
+        .order_by(RunStatsBucket.bucket_start)
+    ).scalars()
+
+    totals: Dict[str, _Accumulator] = {}
+    series: Dict[Tuple[datetime, str], _Accumulator] = {}
+    for bucket in buckets:
+        totals.setdefault(bucket.status, _Accumulator()).add_bucket(bucket)
+        series.setdefault((bucket_start(bucket.bucket_start, width), bucket.status), _Accumulator()).add_bucket(bucket)
+
+    return {
+        "pipeline_id": str(pipeline_id),
+        "since": since,
+        "until": until,
+        "granularity": granularity,
+        "totals": {status: acc.summary() for status, acc in totals.items()},
+        "series": [
+            {"bucket_start": start, "status": status, **acc.summary()}
+            for (start, status), acc in sorted(series.items(), key=lambda item: item[0])
+        ],
+    }
+
+
+def delete_pipeline_stats(db: Session, pipeline_id: UUID) -> None:
+    db.execute(delete(RunStatsBucket).where(RunStatsBucket.pipeline_id == pipeline_id))
+
+
+# -- backfill ----------------------------------------------------------------------------------
+
+
+def rebuild(db: Session, *, pipeline_id: Optional[UUID] = None, batch_size: int = 1000) -> Dict[str, int]:
+    """Recompute buckets from ``pipeline_runs`` for every hour before the current one.
+
+    The current hour is left to live updates, so runs finishing during a backfill are neither lost
+    nor counted twice.
+    """
+    cutoff = bucket_start(datetime.utcnow())
+    query = (
+        select(PipelineRun.pipeline_id, PipelineRun.status, PipelineRun.started_at, PipelineRun.completed_at)
+        .where(PipelineRun.status.in_(FINAL_STATUSES), PipelineRun.completed_at < cutoff)
+        .execution_options(yield_per=batch_size)
+    )
+    if pipeline_id is not None:
+        query = query.where(PipelineRun.pipeline_id == pipeline_id)
+
+    accumulators: Dict[Tuple[UUID, datetime, str], _Accumulator] = {}
+    runs = 0
+    for row_pipeline, status, started_at, completed_at in db.execute(query):
+        acc = accumulators.setdefault((row_pipeline, bucket_start(completed_at), status), _Accumulator())
+        acc.count += 1
+        runs += 1
+        if started_at is not None:
+            duration = max((completed_at - started_at).total_seconds() * 1000, 0.0)
+            acc.duration_sum += round(duration)
+            acc.sketch.add(duration)
+            acc.low = min(acc.low, duration) if acc.low is not None else duration
+            acc.high = max(acc.high, duration) if acc.high is not None else duration
+
+    stale = delete(RunStatsBucket).where(RunStatsBucket.bucket_start < cutoff)
+    if pipeline_id is not None:
+        stale = stale.where(RunStatsBucket.pipeline_id == pipeline_id)
+    db.execute(stale)
+    db.add_all(_bucket_rows(accumulators.items()))
+    db.commit()
+    return {"runs": runs, "buckets": len(accumulators)}
+
+
+def _bucket_rows(items: Iterable[Tuple[Tuple[UUID, datetime, str], _Accumulator]]) -> List[RunStatsBucket]:
+    return [
+        RunStatsBucket(
+            pipeline_id=row_pipeline,
+            bucket_start=start,
+            status=status,
+            run_count=acc.count,
+            duration_sum_ms=acc.duration_sum,
+            duration_min_ms=acc.low,
+            duration_max_ms=acc.high,
+            sketch=acc.sketch.to_json(),
+        )
+        for (row_pipeline, start, status), acc in items
+    ]
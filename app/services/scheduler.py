@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from ..core.config import get_settings
+from ..models.pipeline_model import RUN_PRIORITIES
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("pipeline_id", "use_case", "priority", "max_per_pipeline", "enqueued_at", "granted")
+
+    def __init__(self, pipeline_id: str, use_case: str, priority: str, max_per_pipeline: int) -> None:
+        self.pipeline_id = pipeline_id
+        self.use_case = use_case
+        self.priority = priority
+        self.max_per_pipeline = max_per_pipeline
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class RunScheduler:
+    """Admission control and fair slot allocation for run execution.
+
+    Priority classes are served strictly in ``RUN_PRIORITIES`` order. Within a class, use cases
+    share slots by weighted fair queuing: the waiting use case with the least weighted service
+    goes next, so a large backfill cannot monopolize the slots. A pipeline never holds more than
+    its concurrency cap, and a class whose queue is full rejects new work immediately.
+
+    Each waiting run blocks a request thread, so ``max_waiting`` caps the waiters across all classes
+    below the server's threadpool; beyond it new work is rejected at once rather than queued.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent_runs: int,
+        max_runs_per_pipeline: int,
+        max_queue_depth: int,
+        max_waiting: int,
+        queue_timeout_seconds: float,
+        use_case_weights: Dict[str, float],
+    ) -> None:
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_runs_per_pipeline = max_runs_per_pipeline
+        self.max_queue_depth = max_queue_depth
+        self.max_waiting = max_waiting
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.use_case_weights = use_case_weights
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[_Ticket]] = {priority: deque() for priority in RUN_PRIORITIES}
+        self._running = 0
+        self._running_by_pipeline: Counter = Counter()
+        self._running_by_use_case: Counter = Counter()
+        self._virtual_time: Dict[str, float] = {}
+        self._avg_run_seconds = 1.0
+        self.admitted: Counter = Counter()
+        self.rejected: Counter = Counter()
+
+    @contextmanager
+    def slot(
+        self,
+        *,
+        pipeline_id: str,
+        use_case: str,
+        priority: str = "normal",
+        max_per_pipeline: Optional[int] = None,
+    ) -> Iterator[None]:
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class: {priority}")
+        ticket = _Ticket(pipeline_id, use_case, priority, max_per_pipeline or self.max_runs_per_pipeline)
+        self._admit(ticket)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(ticket, time.monotonic() - started)
+
+    def _retry_after(self, priority: str) -> int:
+        ahead = sum(len(self._queues[p]) for p in RUN_PRIORITIES[: RUN_PRIORITIES.index(priority) + 1])
+        return max(1, math.ceil((ahead + 1) * self._avg_run_seconds / max(self.max_concurrent_runs, 1)))
+
+    def _admit(self, ticket: _Ticket) -> None:
+        with self._cond:
+            queue = self._queues[ticket.priority]
+            if len(queue) >= self.max_queue_depth:
+                self.rejected[ticket.priority] += 1
+                raise AdmissionRejected("Run queue is full", self._retry_after(ticket.priority))
+            if self._running >= self.max_concurrent_runs and self._waiting() >= self.max_waiting:
+                self.rejected[ticket.priority] += 1
+                raise AdmissionRejected("Too many runs waiting for a slot", self._retry_after(ticket.priority))
+
+            if not self._is_active(ticket.use_case):
+                # a use case returning from idle starts level with the others instead of with a burst of credit
+                active = [self._virtual_time[u] for u in self._virtual_time if self._is_active(u)]
+                floor = min(active) if active else 0.0
+                self._virtual_time[ticket.use_case] = max(self._virtual_time.get(ticket.use_case, 0.0), floor)
+
+            queue.append(ticket)
+            self._dispatch()
+            deadline = ticket.enqueued_at + self.queue_timeout_seconds
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    queue.remove(ticket)
+                    self.rejected[ticket.priority] += 1
+                    raise AdmissionRejected("Timed out waiting for a run slot", self._retry_after(ticket.priority))
+                self._cond.wait(remaining)
+            self.admitted[ticket.priority] += 1
+
+    def _waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _is_active(self, use_case: str) -> bool:
+        if self._running_by_use_case[use_case]:
+            return True
+        return any(t.use_case == use_case for queue in self._queues.values() for t in queue)
+
+    def _pick(self) -> Optional[_Ticket]:
+        for priority in RUN_PRIORITIES:
+            heads: Dict[str, _Ticket] = {}
+            for ticket in self._queues[priority]:
+                if ticket.use_case in heads:
+                    continue
+                if self._running_by_pipeline[ticket.pipeline_id] >= ticket.max_per_pipeline:
+                    continue
+                heads[ticket.use_case] = ticket
+            if heads:
+                return min(heads.values(), key=lambda t: (self._virtual_time.get(t.use_case, 0.0), t.enqueued_at))
+        return None
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self._running < self.max_concurrent_runs:
+            ticket = self._pick()
+            if ticket is None:
+                break
+            self._queues[ticket.priority].remove(ticket)
+            ticket.granted = True
+            self._running += 1
+            self._running_by_pipeline[ticket.pipeline_id] += 1
+            self._running_by_use_case[ticket.use_case] += 1
+            weight = self.use_case_weights.get(ticket.use_case, 1.0)
+            self._virtual_time[ticket.use_case] = self._virtual_time.get(ticket.use_case, 0.0) + 1.0 / weight
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _release(self, ticket: _Ticket, elapsed: float) -> None:
+        with self._cond:
+            self._running -= 1
+            self._running_by_pipeline[ticket.pipeline_id] -= 1
+            if not self._running_by_pipeline[ticket.pipeline_id]:
+                del self._running_by_pipeline[ticket.pipeline_id]
+            self._running_by_use_case[ticket.use_case] -= 1
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "running": self._running,
+                "max_concurrent_runs": self.max_concurrent_runs,
+                "queue_depth": {priority: len(queue) for priority, queue in self._queues.items()},
+                "running_by_use_case": {k: v for k, v in self._running_by_use_case.items() if v},
+                "running_by_pipeline": dict(self._running_by_pipeline),
+                "admitted": dict(self.admitted),
+                "rejected": dict(self.rejected),
+                "avg_run_seconds": round(self._avg_run_seconds, 3),
+            }
+
+
+_scheduler: Optional[RunScheduler] = None
+
+
+def get_scheduler() -> RunScheduler:
+    global _scheduler
+    if _scheduler is None:
+        settings = get_settings()
+        _scheduler = RunScheduler(
+            max_concurrent_runs=settings.scheduler_max_concurrent_runs,
+            max_runs_per_pipeline=settings.scheduler_max_runs_per_pipeline,
+            max_queue_depth=settings.scheduler_max_queue_depth,
+            max_waiting=settings.scheduler_max_waiting,
+            queue_timeout_seconds=settings.scheduler_queue_timeout_seconds,
+            use_case_weights=settings.scheduler_use_case_weights,
+        )
+    return _scheduler
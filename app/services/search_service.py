@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, bindparam, delete, func, insert, literal_column, select
+from sqlalchemy import text as sql_text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import column, table
+
+from ..core.config import get_settings
+from ..core.milvus_client import embed_text, get_milvus_client
+from ..models.base import GUID
+from ..models.document_model import Document, IngestedChunk
+from ..models.pipeline_model import Pipeline, PipelineRun
+from ..models.search_model import SearchEntry
+from ..models.staging_model import StagedData
+
+SNIPPET_CHARS = 200
+_QUERY_TERM = re.compile(r'"([^"]+)"|(\S+)')
+
+_fts = table("search_entries_fts", column("rowid", Integer))
+_fts_match = literal_column("search_entries_fts")
+_tsv = literal_column("search_entries.tsv")
+_fts_insert = sql_text("INSERT INTO search_entries_fts(rowid, body) VALUES (:rowid, :body)")
+_fts_delete_all = sql_text("INSERT INTO search_entries_fts(search_entries_fts) VALUES ('delete-all')")
+# Postgres stores the tsvector of ``body`` in the entry row; the text itself is not kept
+_pg_insert = sql_text(
+    "INSERT INTO search_entries (source_type, source_id, document_id, pipeline_run_id, pipeline_id, use_case, tsv) "
+    "VALUES (:source_type, :source_id, :document_id, :pipeline_run_id, :pipeline_id, :use_case, "
+    "to_tsvector('english', :body))"
+).bindparams(*(bindparam(name, type_=GUID(as_uuid=True)) for name in ("document_id", "pipeline_run_id", "pipeline_id")))
+_fts_tables: Dict[Any, bool] = {}
+
+_HIT_COLUMNS = (
+    SearchEntry.source_type,
+    SearchEntry.source_id,
+    SearchEntry.document_id,
+    SearchEntry.pipeline_run_id,
+    SearchEntry.pipeline_id,
+    SearchEntry.use_case,
+)
+
+
+class SearchUnavailable(RuntimeError):
+    pass
+
+
+# -- index maintenance -------------------------------------------------------------------------
+
+
+def _enabled() -> bool:
+    return get_settings().search_index_enabled
+
+
+def _run_context(db: Session, pipeline_run_id: Optional[UUID]) -> Tuple[Optional[UUID], Optional[str]]:
+    if pipeline_run_id is None:
+        return None, None
+    row = db.execute(
+        select(Pipeline.id, Pipeline.use_case)
+        .join(PipelineRun, PipelineRun.pipeline_id == Pipeline.id)
+        .where(PipelineRun.id == pipeline_run_id)
+    ).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def _has_fts(db: Session) -> bool:
+    """Whether SQLite has the FTS5 table; it is missing on builds without FTS5 (see ``init_db``)."""
+    bind = db.get_bind()
+    if bind not in _fts_tables:
+        found = db.execute(sql_text("SELECT 1 FROM sqlite_master WHERE name = 'search_entries_fts'")).first()
+        _fts_tables[bind] = found is not None
+    return _fts_tables[bind]
+
+
+def _insert_entries(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert entries and index each row's ``body`` under the entry id, without storing the text."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.execute(_pg_insert, rows)
+        return
+    bodies = [row.pop("body") for row in rows]
+    if dialect != "sqlite" or not _has_fts(db):
+        db.execute(insert(SearchEntry), rows)
+        return
+    ids = db.execute(insert(SearchEntry).returning(SearchEntry.id, sort_by_parameter_order=True), rows).scalars().all()
+    db.execute(_fts_insert, [{"rowid": entry_id, "body": body} for entry_id, body in zip(ids, bodies)])
+
+
+def flatten_payload(value: Any) -> str:
+    """Join the string leaves of a JSON payload into one searchable text."""
+    parts: List[str] = []
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+        elif isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, (int, float)) and not isinstance(item, bool):
+            parts.append(str(item))
+    return " ".join(parts)
+
+
+def index_chunks(db: Session, document: Document, chunks: Iterable[Tuple[int, str]]) -> None:
+    """Add ``(chunk id, text)`` pairs to the index in the caller's transaction."""
+    if not _enabled():
+        return
+    pipeline_id, use_case = _run_context(db, document.pipeline_run_id)
+    rows = [
+        {
+            "source_type": "chunk",
+            "source_id": str(chunk_id),
+            "document_id": document.id,
+            "pipeline_run_id": document.pipeline_run_id,
+            "pipeline_id": pipeline_id,
+            "use_case": use_case,
+            "body": text,
+        }
+        for chunk_id, text in chunks
+        if text
+    ]
+    if rows:
+        _insert_entries(db, rows)
+
+
+def index_staged(db: Session, staged: StagedData, *, payload: Dict[str, Any], pipeline_id: Optional[UUID]) -> None:
+    if not _enabled():
+        return
+    body = flatten_payload(payload)
+    if not body:
+        return
+    _insert_entries(
+        db,
+        [
+            {
+                "source_type": "staged",
+                "source_id": str(staged.id),
+                "document_id": staged.document_id,
+                "pipeline_run_id": staged.pipeline_run_id,
+                "pipeline_id": pipeline_id,
+                "use_case": staged.use_case,
+                "body": body,
+            }
+        ],
+    )
+
+
+def remove_document_chunks(db: Session, document_id: UUID) -> None:
+    db.execute(
+        delete(SearchEntry).where(SearchEntry.source_type == "chunk", SearchEntry.document_id == document_id)
+    )
+
+
+def remove_runs(db: Session, run_ids: Sequence[UUID]) -> None:
+    db.execute(delete(SearchEntry).where(SearchEntry.pipeline_run_id.in_(run_ids)))
+
+
+def index_run(db: Session, run_id: UUID) -> None:
+    """(Re)build the entries for one run from its stored chunks and staged outputs."""
+    remove_runs(db, [run_id])
+    for document in db.execute(select(Document).where(Document.pipeline_run_id == run_id)).scalars():
+        chunks = db.execute(
+            select(IngestedChunk.id, IngestedChunk.content)
+            .where(IngestedChunk.document_id == document.id)
+            .execution_options(yield_per=200)
+        )
+        index_chunks(db, document, chunks.tuples())
+    pipeline_id, _ = _run_context(db, run_id)
+    for staged in db.execute(select(StagedData).where(StagedData.pipeline_run_id == run_id)).scalars():
+        index_staged(db, staged, payload=staged.payload, pipeline_id=pipeline_id)
+
+
+def reindex(db: Session, *, batch_size: int = 100) -> int:
+    """Rebuild the whole index run by run, committing every ``batch_size`` runs; returns the run count."""
+    if db.get_bind().dialect.name == "sqlite" and _has_fts(db):
+        db.execute(_fts_delete_all)  # also purges terms left behind by deletes on SQLite before 3.43
+    db.execute(delete(SearchEntry))
+    db.commit()
+    indexed = 0
+    last = None
+    while True:
+        query = select(PipelineRun.id).order_by(PipelineRun.id).limit(batch_size)
+        if last is not None:
+            query = query.where(PipelineRun.id > last)
+        run_ids = db.execute(query).scalars().all()
+        if not run_ids:
+            return indexed
+        for run_id in run_ids:
+            index_run(db, run_id)
+        db.commit()
+        indexed += len(run_ids)
+        last = run_ids[-1]
+
+
+# -- querying ----------------------------------------------------------------------------------
+
+
+def _fts5_query(text: str) -> str:
+    """Quote every term so user input cannot inject FTS5 syntax; ``"..."`` keeps phrases, ``term*`` prefixes."""
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(text):
+        term = phrase or word.strip('"')
+        prefix = not phrase and term.endswith("*")
+        term = term.rstrip("*") if prefix else term
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if not terms:
+        raise ValueError("Search query is empty")
+    return " ".join(terms)
+
+
+def _query_terms(text: str) -> List[str]:
+    terms = [(phrase or word).strip('"').rstrip("*") for phrase, word in _QUERY_TERM.findall(text)]
+    return [term for term in terms if term]
+
+
+def _snippet(body: str, terms: Sequence[str]) -> str:
+    """About ``SNIPPET_CHARS`` of ``body`` around the first query term, with each match wrapped in ``[...]``.
+
+    Stemmed matches ("invoices" for "invoice") may not appear verbatim; the snippet then starts at the top.
+    """
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE) if terms else None
+    match = pattern.search(body) if pattern else None
+    start = body.rfind(" ", 0, max(match.start() - SNIPPET_CHARS // 4, 0)) + 1 if match else 0
+    window = body[start : start + SNIPPET_CHARS]
+    if pattern:
+        window = pattern.sub(lambda m: f"[{m.group(0)}]", window)
+    return ("…" if start else "") + window + ("…" if start + SNIPPET_CHARS < len(body) else "")
+
+
+def _with_snippets(db: Session, hits: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+    """Read the source text of just these hits (the index keeps none) and cut a snippet from each."""
+    chunk_ids = [int(hit["source_id"]) for hit in hits if hit["source_type"] == "chunk"]
+    staged_ids = [UUID(hit["source_id"]) for hit in hits if hit["source_type"] == "staged"]
+    bodies: Dict[Tuple[str, str], str] = {}
+    if chunk_ids:
+        for chunk_id, content in db.execute(
+            select(IngestedChunk.id, IngestedChunk.content).where(IngestedChunk.id.in_(chunk_ids))
+        ):
+            bodies[("chunk", str(chunk_id))] = content
+    if staged_ids:
+        for staged_id, payload in db.execute(select(StagedData.id, StagedData.payload).where(StagedData.id.in_(staged_ids))):
+            bodies[("staged", str(staged_id))] = flatten_payload(payload)
+    terms = _query_terms(text)
+    for hit in hits:
+        hit["snippet"] = _snippet(bodies.get((hit["source_type"], hit["source_id"]), ""), terms)
+    return hits
+
+
+def _filtered(query, *, use_case: Optional[str], pipeline_id: Optional[UUID], source_type: Optional[str]):
+    if use_case:
+        query = query.where(SearchEntry.use_case == use_case)
+    if pipeline_id:
+        query = query.where(SearchEntry.pipeline_id == pipeline_id)
+    if source_type:
+        query = query.where(SearchEntry.source_type == source_type)
+    return query
+
+
+def _text_search(db: Session, text: str, *, limit: int, offset: int, **filters: Any) -> List[Dict[str, Any]]:
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        rank = func.bm25(_fts_match)
+        query = (
+            select(*_HIT_COLUMNS, (-rank).label("score"))
+            .select_from(SearchEntry.__table__.join(_fts, _fts.c.rowid == SearchEntry.id))
+            .where(_fts_match.op("MATCH")(_fts5_query(text)))
+            .order_by(rank)
+        )
+    elif dialect == "postgresql":
+        if not text.strip():
+            raise ValueError("Search query is empty")
+        tsquery = func.websearch_to_tsquery("english", text)
+        ranked = (
+            _filtered(
+                select(SearchEntry.id, func.ts_rank_cd(_tsv, tsquery).label("score")).where(_tsv.op("@@")(tsquery)),
+                **filters,
+            )
+            .order_by(literal_column("score").desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        query = (
+            select(*_HIT_COLUMNS, ranked.c.score)
+            .join(ranked, ranked.c.id == SearchEntry.id)
+            .order_by(ranked.c.score.desc())
+        )
+        return [dict(row._mapping) for row in db.execute(query)]
+    else:
+        raise SearchUnavailable(f"Full-text search is not supported on {dialect}")
+    query = _filtered(query, **filters).limit(limit).offset(offset)
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def _hybrid(
+    db: Session, text: str, hits: List[Dict[str, Any]], *, limit: int, vector_weight: float, **filters: Any
+) -> List[Dict[str, Any]]:
+    """Blend normalised text scores with vector similarity of staged outputs from the Milvus path."""
+    client = get_milvus_client()
+    similar = client.search(
+        embed_text(text, client.embedding_dim),
+        limit=limit,
+        filters={
+            "use_case": filters.get("use_case"),
+            "pipeline_id": str(filters["pipeline_id"]) if filters.get("pipeline_id") else None,
+        },
+    )
+    vector_scores = {source_id: max(score, 0.0) for source_id, score in similar}
+
+    best = max((hit["score"] for hit in hits), default=0.0) or 1.0
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for hit in hits:
+        hit["text_score"] = hit["score"] / best
+        hit["vector_score"] = vector_scores.get(hit["source_id"], 0.0) if hit["source_type"] == "staged" else 0.0
+        merged[(hit["source_type"], hit["source_id"])] = hit
+
+    # staged outputs that are only close in vector space still need their row for filters
+    missing = [sid for sid in vector_scores if ("staged", sid) not in merged]
+    if missing and filters.get("source_type") in (None, "staged"):
+        query = _filtered(
+            select(*_HIT_COLUMNS).where(SearchEntry.source_type == "staged", SearchEntry.source_id.in_(missing)),
+            **filters,
+        )
+        for row in db.execute(query):
+            hit = dict(row._mapping)
+            hit["text_score"] = 0.0
+            hit["vector_score"] = vector_scores[hit["source_id"]]
+            merged[("staged", hit["source_id"])] = hit
+
+    for hit in merged.values():
+        hit["score"] = (1 - vector_weight) * hit["text_score"] + vector_weight * hit["vector_score"]
+    return sorted(merged.values(), key=lambda hit: hit["score"], reverse=True)
+
+
+def search(
+    db: Session,
+    text: str,
+    *,
+    use_case: Optional[str] = None,
+    pipeline_id: Optional[UUID] = None,
+    source_type: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    hybrid: bool = False,
+    vector_weight: float = 0.3,
+) -> List[Dict[str, Any]]:
+    """Ranked matches with highlighted snippets; ``hybrid`` re-ranks a wider candidate set with vector similarity."""
+    filters = {"use_case": use_case, "pipeline_id": pipeline_id, "source_type": source_type}
+    if not hybrid:
+        return _with_snippets(db, _text_search(db, text, limit=limit, offset=offset, **filters), text)
+    window = max((offset + limit) * 3, 50)
+    hits = _text_search(db, text, limit=window, offset=0, **filters)
+    ranked = _hybrid(db, text, hits, limit=window, vector_weight=vector_weight, **filters)
+    return _with_snippets(db, ranked[offset : offset + limit], text)
@@ -1,10 +1,12 @@
 from typing import Any, Dict, Optional
+from uuid import UUID
 
 from sqlalchemy.orm import Session
 
-from ..core.milvus_client import get_milvus_client
+from ..core.milvus_client import embed_text, get_milvus_client
 from ..models.pipeline_model import PipelineRun
 from ..models.staging_model import StagedData
+from . import search_service
 
 
 def stage_payload(
@@ -12,7 +14,7 @@ def stage_payload(
     *,
     pipeline_run: PipelineRun,
     use_case: str,
-    document_id: Optional[str],
+    document_id: Optional[UUID],
     payload_type: str,
     payload: Dict[str, Any],
     validation_status: str,
@@ -29,12 +31,14 @@ def stage_payload(
         issues=issues,
     )
     db.add(staged)
+    db.flush()
+    search_service.index_staged(db, staged, payload=payload, pipeline_id=pipeline_run.pipeline_id)
     db.commit()
     db.refresh(staged)
 
     if write_embeddings:
         client = get_milvus_client()
-        embedding = [float(len((payload.get("llm_output") or {}).get("result", "")))] * client.embedding_dim
+        embedding = embed_text(str((payload.get("llm_output") or {}).get("result", "")), client.embedding_dim)
         client.insert_embedding(
             use_case=use_case,
             source_type=payload_type,
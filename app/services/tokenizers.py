@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+from ..core.config import get_settings
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+class Tokenizer(Protocol):
+    def count(self, text: str) -> int: ...
+
+    def truncate(self, text: str, max_tokens: int) -> str: ...
+
+
+class ApproximateTokenizer:
+    """Dependency-free estimate: one token per punctuation mark and one per ~4 characters of a word.
+
+    It errs on the high side for English, so packs built with it stay inside the real budget.
+    """
+
+    def __init__(self, chars_per_token: int = 4) -> None:
+        self.chars_per_token = chars_per_token
+
+    def _piece_tokens(self, piece: str) -> int:
+        return max(1, math.ceil(len(piece) / self.chars_per_token))
+
+    def count(self, text: str) -> int:
+        return sum(self._piece_tokens(piece) for piece in _PIECE.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        used = 0
+        for match in _PIECE.finditer(text):
+            used += self._piece_tokens(match.group())
+            if used > max_tokens:
+                return text[: match.start()]
+        return text
+
+
+class TiktokenTokenizer:
+    def __init__(self, model_name: str) -> None:
+        import tiktoken
+
+        try:
+            self._encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else self._encoding.decode(tokens[:max_tokens])
+
+
+def _tiktoken_or_approximate(model_name: str) -> Tokenizer:
+    try:
+        return TiktokenTokenizer(model_name)
+    except ImportError:
+        return ApproximateTokenizer()
+
+
+# model_name prefix -> tokenizer factory; the longest matching prefix wins, "" is the fallback.
+TOKENIZERS: Dict[str, Callable[[str], Tokenizer]] = {
+    "": lambda model_name: ApproximateTokenizer(),
+    "gpt-": _tiktoken_or_approximate,
+}
+
+# model_name prefix -> (context window tokens, max output tokens); "" falls back to settings.
+MODEL_LIMITS: Dict[str, Tuple[int, int]] = {}
+
+
+def _longest_prefix(registry: Dict[str, object], model_name: str) -> str:
+    matches: List[str] = [prefix for prefix in registry if model_name.startswith(prefix)]
+    return max(matches, key=len) if matches else ""
+
+
+def register_tokenizer(
+    prefix: str, factory: Callable[[str], Tokenizer], limits: Optional[Tuple[int, int]] = None
+) -> None:
+    TOKENIZERS[prefix] = factory
+    if limits is not None:
+        MODEL_LIMITS[prefix] = limits
+    get_tokenizer.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def get_tokenizer(model_name: str) -> Tokenizer:
+    return TOKENIZERS[_longest_prefix(TOKENIZERS, model_name)](model_name)
+
+
+def model_limits(model_name: str) -> Tuple[int, int]:
+    prefix = _longest_prefix(MODEL_LIMITS, model_name)
+    if prefix in MODEL_LIMITS:
+        return MODEL_LIMITS[prefix]
+    settings = get_settings()
+    return settings.llm_context_tokens, settings.llm_max_output_tokens
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from ..core.config import get_settings
+
+
+class SpooledBlob(NamedTuple):
+    sha256: str
+    size_bytes: int
+    path: Path
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def blob_path(sha256: str, blob_dir: Optional[Path] = None) -> Path:
+    root = blob_dir or Path(get_settings().blob_dir)
+    return root / sha256[:2] / sha256
+
+
+class BlobWriter:
+    """Spool a byte stream to disk while hashing it, then move it to its content address.
+
+    Only one chunk is held in memory at a time; identical uploads collapse onto the same file.
+    """
+
+    def __init__(self, blob_dir: Optional[Path] = None, max_bytes: Optional[int] = None) -> None:
+        self.blob_dir = Path(blob_dir or get_settings().blob_dir)
+        self.max_bytes = max_bytes
+        tmp_dir = self.blob_dir / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+        self._handle = os.fdopen(fd, "wb")
+        self._tmp_path = Path(tmp_name)
+        self._hash = hashlib.sha256()
+        self.size_bytes = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.size_bytes += len(chunk)
+        if self.max_bytes is not None and self.size_bytes > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+        self._hash.update(chunk)
+        self._handle.write(chunk)
+
+    def commit(self) -> SpooledBlob:
+        self._handle.close()
+        digest = self._hash.hexdigest()
+        final_path = blob_path(digest, self.blob_dir)
+        if final_path.exists():
+            self._tmp_path.unlink()
+        else:
+            final_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._tmp_path, final_path)
+        return SpooledBlob(sha256=digest, size_bytes=self.size_bytes, path=final_path.resolve())
+
+    def abort(self) -> None:
+        self._handle.close()
+        self._tmp_path.unlink(missing_ok=True)
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 
 def validate_payload(
@@ -7,10 +7,17 @@ def validate_payload(
     use_semantic_lookup: bool,
     thresholds: Dict[str, float],
     payload: Dict[str, str],
+    ruleset_config: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, str]:
+    ruleset_config = ruleset_config or {}
+    thresholds = {**ruleset_config.get("thresholds", {}), **thresholds}
+
     issues: List[str] = []
     if len(payload.get("result", "")) == 0:
         issues.append("empty_result")
+    for field in ruleset_config.get("required_fields", []):
+        if not payload.get(field):
+            issues.append(f"missing_field:{field}")
 
     status = "passed" if not issues else "needs_review"
     return {
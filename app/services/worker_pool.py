@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from typing import List, Optional
+from uuid import UUID
+
+from ..core.config import get_settings
+from ..core.db import get_session_factory
+from ..core.logging import configure_logging, get_logger
+from . import pipeline_service, run_queue
+from .pipeline_orchestrator import LeaseLost, execute_pipeline
+
+logger = get_logger(__name__)
+
+
+class _Heartbeat(threading.Thread):
+    """Renews the lease of the run being executed on its own session until stopped."""
+
+    def __init__(self, run_id: UUID, worker_id: str, lease_seconds: int) -> None:
+        super().__init__(name=f"heartbeat-{run_id}", daemon=True)
+        self.run_id = run_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        interval = max(self.lease_seconds / 3, 1)
+        while not self._stop_event.wait(interval):
+            try:
+                with get_session_factory()() as db:
+                    renewed = run_queue.renew_lease(
+                        db, run_id=self.run_id, worker_id=self.worker_id, lease_seconds=self.lease_seconds
+                    )
+            except Exception:  # keep beating through transient database errors
+                logger.exception("Lease renewal failed", extra={"run_id": str(self.run_id)})
+                continue
+            if not renewed:
+                self.lost.set()
+                logger.warning("Lease lost", extra={"run_id": str(self.run_id), "worker_id": self.worker_id})
+                return
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class Worker:
+    def __init__(self, worker_id: str, stop_event: Optional[threading.Event] = None) -> None:
+        settings = get_settings()
+        self.worker_id = worker_id
+        self.lease_seconds = settings.worker_lease_seconds
+        self.poll_interval = settings.worker_poll_interval_seconds
+        self.max_attempts = settings.worker_max_attempts
+        self.stop_event = stop_event or threading.Event()
+
+    def run_once(self) -> bool:
+        """Claim and execute one run; returns False when the queue was empty."""
+        with get_session_factory()() as db:
+            run = run_queue.claim_next_run(db, worker_id=self.worker_id, lease_seconds=self.lease_seconds)
+            if run is None:
+                return False
+
+            extra = {"run_id": str(run.id), "worker_id": self.worker_id, "attempt": run.attempts}
+            if (run.attempts or 0) > self.max_attempts:
+                run_queue.fail_run(db, run, f"Abandoned after {self.max_attempts} lease attempts")
+                logger.warning("Run exceeded lease attempts", extra=extra)
+                return True
+
+            pipeline = pipeline_service.get_pipeline(db, run.pipeline_id)
+            if pipeline is None:
+                run_queue.fail_run(db, run, "Pipeline not found")
+                return True
+
+            logger.info("Run claimed", extra=extra)
+            heartbeat = _Heartbeat(run.id, self.worker_id, self.lease_seconds)
+            heartbeat.start()
+            try:
+                execute_pipeline(
+                    db,
+                    pipeline=pipeline,
+                    run=run,
+                    inputs=run.inputs or {},
+                    lease_owner=self.worker_id,
+                    lease_lost=heartbeat.lost,
+                )
+            except LeaseLost:
+                pass  # the run's new owner reports its outcome
+            except Exception:
+                pass  # execute_pipeline already marked the run failed and logged the cause
+            finally:
+                heartbeat.stop()
+                run_queue.release_lease(db, run_id=run.id, worker_id=self.worker_id)
+            return True
+
+    def serve(self) -> None:
+        logger.info("Worker started", extra={"worker_id": self.worker_id})
+        while not self.stop_event.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception:
+                logger.exception("Worker iteration failed", extra={"worker_id": self.worker_id})
+                claimed = False
+            if not claimed:
+                self.stop_event.wait(self.poll_interval)
+        logger.info("Worker stopped", extra={"worker_id": self.worker_id})
+
+
+def default_worker_id(index: int = 0, thread: int = 0) -> str:
+    suffix = f".{thread}" if thread else ""
+    return f"{socket.gethostname()}:{os.getpid()}:{index}{suffix}"
+
+
+def _serve_process(index: int, threads: int = 1) -> None:
+    configure_logging()
+    stop_event = threading.Event()
+
+    def _request_stop(signum, frame):
+        stop_event.set()  # finish the current run, then exit
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    # extra threads let runs in one process share packed model requests while they wait on I/O
+    extra = [
+        threading.Thread(
+            target=Worker(default_worker_id(index, thread), stop_event).serve, name=f"worker-{index}-{thread}"
+        )
+        for thread in range(1, threads)
+    ]
+    for thread in extra:
+        thread.start()
+    Worker(default_worker_id(index), stop_event).serve()
+    for thread in extra:
+        thread.join()
+
+
+def run_workers(processes: int = 1, threads: int = 1) -> None:
+    """Run ``processes`` worker processes, each executing up to ``threads`` runs at a time."""
+    if processes <= 1:
+        _serve_process(0, threads)
+        return
+
+    children: List[multiprocessing.Process] = []
+    for index in range(processes):
+        child = multiprocessing.Process(target=_serve_process, args=(index, threads), name=f"worker-{index}")
+        child.start()
+        children.append(child)
+
+    def _forward(signum, frame):
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    for child in children:
+        child.join()
@@ -0,0 +1,82 @@
+"""Point the app at a scratch SQLite database and blob directory before anything imports its settings."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="pipeline-tests-"))
+INGEST_ROOT = WORKDIR / "inbox"
+INGEST_ROOT.mkdir()
+
+os.environ.update(
+    {
+        "SYNC_DATABASE_URL": f"sqlite:///{WORKDIR / 'app.db'}",
+        "DATABASE_URL": f"sqlite+aiosqlite:///{WORKDIR / 'app.db'}",
+        "BLOB_DIR": str(WORKDIR / "blobs"),
+        "ARCHIVE_DIR": str(WORKDIR / "archive"),
+        "INGEST_ROOTS": f'["{INGEST_ROOT}"]',
+        "BULK_BATCH_SIZE": "50",
+        "EXTRACTION_WORKERS": "1",
+    }
+)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.main import app as fastapi_app
+
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def db(client):
+    from app.core.db import get_session_factory
+
+    session = get_session_factory()()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture()
+def ingest_root() -> Path:
+    return INGEST_ROOT
+
+
+@pytest.fixture()
+def empty_queue(db):
+    """Fail whatever a test left queued, so the next test's workers do not pick it up."""
+    from sqlalchemy import update
+
+    from app.models.pipeline_model import PipelineRun
+
+    yield
+    db.execute(update(PipelineRun).where(PipelineRun.status.in_(["queued", "running"])).values(status="failed"))
+    db.commit()
+
+
+def create_pipeline(client, name: str, *, use_case: str = "generic", metadata=None, process_config=None) -> dict:
+    """Create an ingest → process → validate → stage pipeline through the API."""
+    nodes = [
+        {"id": "ingest", "type": "DocumentIngestionNode", "config": {"source_type": "text_payload"}},
+        {"id": "process", "type": "LLMProcessingNode", "config": process_config or {"mode": "summarize"}},
+        {"id": "validate", "type": "ValidationNode", "config": {"ruleset_name": "generic_rules"}},
+        {"id": "stage", "type": "StagingNode", "config": {"payload_type": "generic_structured_output"}},
+    ]
+    response = client.post(
+        "/api/v1/pipelines",
+        json={"name": name, "use_case": use_case, "definition": {"nodes": nodes, "metadata": metadata or {}}},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
@@ -0,0 +1,43 @@
+import json
+from uuid import UUID
+
+from sqlalchemy import Text, cast, select, text
+from typer.testing import CliRunner
+
+from conftest import create_pipeline
+
+
+def test_offload_then_sweep_keeps_referenced_values(client, db):
+    from app.cli.main import app as cli
+    from app.core.blob_store import get_blob_store, referenced_key
+    from app.models.pipeline_model import PipelineRun
+    from app.services import blob_service
+
+    pipeline = create_pipeline(client, "blobs-smoke")
+    run = client.post(
+        f"/api/v1/pipelines/{pipeline['id']}/run", json={"text_payload": "Blob test.", "input_ref": "blobs-smoke"}
+    ).json()["data"]
+    summary = {"notes": "x" * 40_000}
+    # written around the column type, like rows stored before the blob store existed
+    db.execute(
+        text("UPDATE pipeline_runs SET result_summary = :value WHERE input_ref = 'blobs-smoke'"),
+        {"value": json.dumps(summary)},
+    )
+    db.commit()
+
+    result = CliRunner().invoke(cli, ["blobs-offload"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output[result.output.index("{"):])["pipeline_runs.result_summary"] >= 1
+
+    raw = cast(PipelineRun.result_summary, Text)
+    key = referenced_key(db.execute(select(raw).where(PipelineRun.id == UUID(run["id"]))).scalar_one())
+    assert key is not None
+    store = get_blob_store()
+    orphan = store.put(b"no row points here")
+
+    report = blob_service.collect_garbage(db, grace_seconds=0)
+    assert report["deleted"] >= 1
+    assert not store.exists(orphan)
+    assert store.exists(key)
+    db.expire_all()
+    assert db.get(PipelineRun, UUID(run["id"])).result_summary == summary
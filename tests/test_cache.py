@@ -0,0 +1,11 @@
+def test_cached_ruleset_is_not_shared_between_sessions(client, db):
+    from app.core.db import get_session_factory
+    from app.services import ruleset_service
+
+    ruleset_service.upsert_ruleset(db, name="cache-smoke", use_case="generic", config={"required_fields": ["total"]})
+    first = ruleset_service.get_ruleset(db, "cache-smoke")
+    first.config["required_fields"].append("vendor")
+
+    with get_session_factory()() as other:
+        assert ruleset_service.get_ruleset(other, "cache-smoke").config == {"required_fields": ["total"]}
+        assert ruleset_service.get_ruleset(other, "cache-smoke").config == {"required_fields": ["total"]}
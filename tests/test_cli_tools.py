@@ -0,0 +1,55 @@
+"""The benchmark and migration commands reconfigure the process-wide engine, so each runs in its own process."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _cli(*args: str, env=None) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        [sys.executable, "-m", "app.cli.main", *args],
+        cwd=REPO_ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def test_db_migrate_records_the_schema_version(tmp_path):
+    from app.core.init_db import SCHEMA_VERSION
+
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    result = _cli("db-migrate", env={"SYNC_DATABASE_URL": url, "DATABASE_URL": url.replace("sqlite", "sqlite+aiosqlite", 1)})
+    assert json.loads(result.stdout) == {"schema_version": SCHEMA_VERSION}
+    assert (tmp_path / "migrated.db").exists()
+
+
+def test_db_bench_reports_each_profile(tmp_path):
+    report = tmp_path / "dbbench.json"
+    _cli(
+        "db-bench", "--profiles", "default,sqlite", "--writers", "2", "--duration", "1",
+        "--chunks-per-document", "5", "--workdir", str(tmp_path), "--output", str(report),
+    )
+    results = json.loads(report.read_text())["results"]
+    assert [result["profile"] for result in results] == ["default", "sqlite"]
+    for result in results:
+        assert result["documents_per_s"] > 0
+        assert result["errors"] == {}
+
+
+def test_loadtest_runs_complete_without_errors(tmp_path):
+    report = tmp_path / "loadtest.json"
+    _cli(
+        "loadtest", "--scenario", "runs", "--concurrency", "2", "--duration", "2", "--warmup", "0",
+        "--model-latency-ms", "5", "--model-jitter-ms", "0", "--workdir", str(tmp_path), "--output", str(report),
+    )
+    [step] = json.loads(report.read_text())["steps"]
+    assert step["requests"] > 0
+    assert step["error_rate"] == 0.0
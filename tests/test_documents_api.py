@@ -0,0 +1,45 @@
+import json
+
+
+def _bulk(client, lines):
+    body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+    response = client.post("/api/v1/documents/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _records(count):
+    return [{"source_type": "external_system", "external_ref": f"bulk-{i}", "metadata": {}} for i in range(count)]
+
+
+def test_bulk_register_small_body(client):
+    results = _bulk(client, _records(5) + [{"source_type": "nope"}])
+    assert [r["line"] for r in results[:-1]] == [1, 2, 3, 4, 5, 6]
+    assert "error" in results[5]
+    assert results[-1] == {"summary": {"registered": 5, "failed": 1}}
+
+
+def test_bulk_register_spans_several_batches(client):
+    results = _bulk(client, _records(175))  # BULK_BATCH_SIZE is 50 in the tests
+    assert len(results) == 176
+    assert all("id" in result for result in results[:-1])
+    assert results[-1] == {"summary": {"registered": 175, "failed": 0}}
+
+
+def test_register_document_rejects_paths_outside_ingest_roots(client, ingest_root):
+    response = client.post("/api/v1/documents", json={"source_type": "file_path", "storage_uri": "/etc/passwd"})
+    assert response.status_code == 400
+
+    inside = ingest_root / "note.txt"
+    inside.write_text("hello")
+    response = client.post("/api/v1/documents", json={"source_type": "file_path", "storage_uri": str(inside)})
+    assert response.status_code == 200
+    assert response.json()["data"]["storage_uri"] == str(inside)
+
+
+def test_upload_document(client):
+    response = client.post(
+        "/api/v1/documents/upload", params={"file_name": "a.txt"}, content=b"uploaded text", headers={"Content-Type": "text/plain"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["metadata"]["size_bytes"] == 13
@@ -0,0 +1,43 @@
+import signal
+import time
+
+import pytest
+
+
+def _stuck(path):
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(60)
+    yield ""
+
+
+def test_unknown_extensions_are_sniffed(ingest_root):
+    from app.services import extraction_engine
+
+    text = ingest_root / "notes.unknownext"
+    text.write_text("plain words")
+    assert "".join(extraction_engine.extract_text(str(text))) == "plain words"
+
+    binary = ingest_root / "blob.unknownext"
+    binary.write_bytes(b"\x89\x00\x01\xff" * 64)
+    with pytest.raises(extraction_engine.ExtractionError, match="Unsupported mime type"):
+        extraction_engine.extract_text(str(binary))
+
+
+def test_wedged_worker_is_terminated(ingest_root, monkeypatch):
+    from app.core.config import get_settings
+    from app.services import extraction_engine
+
+    source = ingest_root / "stuck.txt"
+    source.write_text("never read")
+    monkeypatch.setitem(extraction_engine.EXTRACTORS, "application/x-stuck", _stuck)
+    monkeypatch.setattr(get_settings(), "extraction_timeout_seconds", 1)
+    extraction_engine.shutdown_extraction_pool()  # fork the workers after the extractor is registered
+
+    workers = extraction_engine.get_extraction_pool()._processes  # filled in when the task is submitted
+    with pytest.raises(extraction_engine.ExtractionTimeout):
+        extraction_engine.extract_text(str(source), "application/x-stuck")
+    assert workers
+    for worker in list(workers.values()):
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+    assert extraction_engine._pool is None
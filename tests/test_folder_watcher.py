@@ -0,0 +1,52 @@
+import json
+import os
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from conftest import create_pipeline
+
+pytestmark = pytest.mark.usefixtures("empty_queue")
+
+
+def _watch_once(root, pipeline_id: str) -> dict:
+    from app.cli.main import app as cli
+
+    result = CliRunner().invoke(
+        cli, ["folders-watch", str(root), "--pipeline-id", pipeline_id, "--once", "--settle-seconds", "0"]
+    )
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output[result.output.index("{"):])
+
+
+def _fail_queued(db) -> None:
+    from sqlalchemy import update
+
+    from app.models.pipeline_model import PipelineRun
+
+    db.execute(update(PipelineRun).where(PipelineRun.status == "queued").values(status="failed"))
+    db.commit()
+
+
+def test_watch_once_leaves_files_beyond_the_queue_limit(client, db, ingest_root, monkeypatch):
+    from app.core.config import get_settings
+
+    root = ingest_root / "watched"
+    root.mkdir()
+    settled = time.time() - 60
+    for index in range(3):
+        path = root / f"invoice-{index}.txt"
+        path.write_text(f"Invoice {index}")
+        os.utime(path, (settled, settled))
+    pipeline = create_pipeline(client, "watch-smoke")
+    monkeypatch.setattr(get_settings(), "worker_max_queued_runs", 2)
+
+    first = _watch_once(root, pipeline["id"])
+    assert (first["runs_queued"], first["files_deferred"]) == (2, 1)
+
+    _fail_queued(db)  # as if workers had drained the queue
+    second = _watch_once(root, pipeline["id"])
+    assert (second["runs_queued"], second["files_deferred"]) == (1, 0)
+
+    assert _watch_once(root, pipeline["id"])["runs_queued"] == 0
@@ -0,0 +1,48 @@
+from conftest import create_pipeline
+
+
+def _health(client, name: str) -> dict:
+    response = client.get(f"/api/v1/health/{name}")
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def test_health_reports_database_scheduler_and_caches(client):
+    from app.core.db_profiles import DB_PROFILES
+
+    assert client.get("/api/v1/health").json()["data"]["status"] == "ok"
+    database = _health(client, "database")
+    assert database["profile"] in DB_PROFILES
+    assert "pool" in database
+    scheduler = _health(client, "scheduler")
+    assert {"running", "max_concurrent_runs", "queue_depth", "admitted", "rejected"} <= set(scheduler)
+    assert isinstance(_health(client, "caches"), dict)
+
+
+def test_packing_stats_count_packed_runs(client):
+    pipeline = create_pipeline(client, "packing-smoke", process_config={"mode": "summarize", "strategy": "packed"})
+    before = _health(client, "packing")["items"]
+    run = client.post(f"/api/v1/pipelines/{pipeline['id']}/run", json={"text_payload": "Packed. Into one request."})
+    assert run.json()["data"]["status"] == "succeeded", run.text
+    assert _health(client, "packing")["items"] > before
+
+
+def test_full_scheduler_queue_returns_429(client, monkeypatch):
+    from app.services import run_service
+    from app.services.scheduler import RunScheduler
+
+    saturated = RunScheduler(
+        max_concurrent_runs=0,
+        max_runs_per_pipeline=1,
+        max_queue_depth=0,
+        max_waiting=0,
+        queue_timeout_seconds=0.1,
+        use_case_weights={},
+    )
+    monkeypatch.setattr(run_service, "get_scheduler", lambda: saturated)
+    pipeline = create_pipeline(client, "admission-smoke")
+
+    response = client.post(f"/api/v1/pipelines/{pipeline['id']}/run", json={"text_payload": "Rejected."})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert saturated.stats()["rejected"] == {"normal": 1}
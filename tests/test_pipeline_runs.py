@@ -0,0 +1,96 @@
+from uuid import UUID
+
+from sqlalchemy import select
+
+from conftest import create_pipeline
+
+
+def test_run_pipeline_stages_the_result(client, db):
+    from app.models.staging_model import StagedData
+
+    pipeline = create_pipeline(client, "runs-smoke")
+    response = client.post(f"/api/v1/pipelines/{pipeline['id']}/run", json={"text_payload": "Invoice 42 is due. Pay soon."})
+    assert response.status_code == 200, response.text
+    run = response.json()["data"]
+    assert run["status"] == "succeeded", run["error_message"]
+
+    staged = db.execute(select(StagedData).where(StagedData.pipeline_run_id == UUID(run["id"]))).scalars().one()
+    assert staged.document_id is not None
+
+
+def test_run_on_a_stored_document_reuses_its_chunks(client, db):
+    from app.models.document_model import IngestedChunk
+    from app.models.staging_model import StagedData
+
+    pipeline = create_pipeline(client, "shared-document")
+    first = client.post(f"/api/v1/pipelines/{pipeline['id']}/run", json={"text_payload": "Clause 1. Clause 2."}).json()["data"]
+    document_id = db.execute(
+        select(StagedData.document_id).where(StagedData.pipeline_run_id == UUID(first["id"]))
+    ).scalar_one()
+    chunk_ids = db.execute(select(IngestedChunk.id).where(IngestedChunk.document_id == document_id)).scalars().all()
+    assert chunk_ids
+
+    response = client.post(f"/api/v1/pipelines/{pipeline['id']}/run", json={"document_id": str(document_id)})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["status"] == "succeeded", response.json()["data"]["error_message"]
+    db.expire_all()
+    assert db.execute(select(IngestedChunk.id).where(IngestedChunk.document_id == document_id)).scalars().all() == chunk_ids
+
+
+def _run(client, pipeline_id: str, body: dict, **headers):
+    return client.post(f"/api/v1/pipelines/{pipeline_id}/run", json=body, headers=headers)
+
+
+def test_idempotent_replay_returns_the_existing_run(client, db, empty_queue, monkeypatch):
+    from app.core.config import get_settings
+
+    pipeline = create_pipeline(client, "idempotency-smoke")
+    first = _run(client, pipeline["id"], {"text_payload": "Same input."})
+    replay = _run(client, pipeline["id"], {"text_payload": "Same input."})
+    assert replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json()["data"]["id"] == first.json()["data"]["id"]
+
+    monkeypatch.setattr(get_settings(), "enable_background_workers", True)
+    queued = _run(client, pipeline["id"], {"text_payload": "Queued input."}, **{"Idempotency-Key": "smoke-1"})
+    assert queued.status_code == 200
+    assert queued.json()["data"]["status"] == "queued"
+    replay = _run(client, pipeline["id"], {"text_payload": "Other input."}, **{"Idempotency-Key": "smoke-1"})
+    assert replay.status_code == 202
+    assert replay.json()["data"]["id"] == queued.json()["data"]["id"]
+
+
+def test_preview_writes_nothing(client, db):
+    from sqlalchemy import func
+
+    from app.models.pipeline_model import PipelineRun
+
+    pipeline = create_pipeline(client, "preview-smoke")
+    runs_before = db.execute(select(func.count(PipelineRun.id))).scalar()
+    response = _run(client, pipeline["id"], {"text_payload": "Preview only.", "preview": True})
+    assert response.status_code == 200, response.text
+    assert "would_stage" in str(response.json()["data"])
+    assert db.execute(select(func.count(PipelineRun.id))).scalar() == runs_before
+
+
+def test_failed_run_resumes_and_is_listed(app, client, ingest_root):
+    from fastapi.testclient import TestClient
+
+    source = ingest_root / "resume.unknownext"
+    source.write_bytes(b"\x00\x01binary" * 16)
+    pipeline = create_pipeline(client, "resume-smoke")
+    response = _run(TestClient(app, raise_server_exceptions=False), pipeline["id"], {"file_path": str(source)})
+    assert response.status_code == 500
+    [failed] = client.get("/api/v1/runs", params={"pipeline_id": pipeline["id"]}).json()["data"]
+    assert failed["status"] == "failed"
+
+    source.write_text("Readable now.")
+    resumed = client.post(f"/api/v1/runs/{failed['id']}/resume")
+    assert resumed.status_code == 200, resumed.text
+    assert resumed.json()["data"]["status"] == "succeeded"
+    assert client.post(f"/api/v1/runs/{failed['id']}/resume").status_code == 409
+
+    nodes = client.get(f"/api/v1/runs/{failed['id']}/nodes").json()["data"]
+    assert {node["node_id"] for node in nodes} >= {"ingest", "process", "validate", "stage"}
+    listed = client.get("/api/v1/runs", params={"pipeline_id": pipeline["id"], "fields": "id,status"}).json()["data"]
+    assert listed == [{"id": failed["id"], "status": "succeeded"}]
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from typer.testing import CliRunner
+
+from conftest import create_pipeline
+
+
+def _cli(*args: str) -> dict:
+    from app.cli.main import app as cli
+
+    result = CliRunner().invoke(cli, list(args))
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output[result.output.index("{"):])
+
+
+def _run(client, pipeline_id: str, **payload) -> dict:
+    response = client.post(f"/api/v1/pipelines/{pipeline_id}/run", json=payload)
+    assert response.status_code == 200, response.text
+    run = response.json()["data"]
+    assert run["status"] == "succeeded", run["error_message"]
+    return run
+
+
+def _chunk_count(db, document_id: UUID) -> int:
+    from app.models.document_model import IngestedChunk
+
+    return db.execute(select(func.count()).where(IngestedChunk.document_id == document_id)).scalar()
+
+
+def test_retention_keeps_documents_shared_with_live_runs(client, db, ingest_root):
+    from app.models.document_model import Document
+    from app.models.pipeline_model import PipelineRun
+
+    source = ingest_root / "shared.txt"
+    source.write_text("Shared contract text. " * 200)
+    pipeline = create_pipeline(client, "retention-smoke")
+    expired = _run(client, pipeline["id"], file_path=str(source))
+    document = db.execute(select(Document).where(Document.pipeline_run_id == UUID(expired["id"]))).scalars().one()
+    _run(client, pipeline["id"], document_id=str(document.id))
+    chunks = _chunk_count(db, document.id)
+    assert chunks > 0
+
+    db.execute(
+        update(PipelineRun)
+        .where(PipelineRun.id == UUID(expired["id"]))
+        .values(completed_at=datetime.utcnow() - timedelta(days=30))
+    )
+    db.commit()
+    _cli("retention-policy-set", "--retain-days", "7", "--pipeline-id", pipeline["id"])
+    report = _cli("retention-run")
+    assert report["pipelines"] == {pipeline["id"]: 1}
+
+    db.expire_all()
+    assert db.get(PipelineRun, UUID(expired["id"])) is None
+    assert db.get(Document, document.id).pipeline_run_id is None
+    assert _chunk_count(db, document.id) == chunks
+
+    restored = _cli("retention-restore", expired["id"])
+    assert restored["restored"] is True
+    db.expire_all()
+    assert db.get(Document, document.id).pipeline_run_id == UUID(expired["id"])
+    assert _chunk_count(db, document.id) == chunks
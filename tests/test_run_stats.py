@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from typer.testing import CliRunner
+
+from conftest import create_pipeline
+
+
+def _finished_runs(db, pipeline_id: str, durations_ms):
+    from app.models.pipeline_model import PipelineRun
+    from app.services import run_stats_service
+
+    completed = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2, minutes=-30)
+    for duration in durations_ms:
+        run = PipelineRun(
+            pipeline_id=UUID(pipeline_id),
+            status="succeeded",
+            started_at=completed - timedelta(milliseconds=duration),
+            completed_at=completed,
+        )
+        db.add(run)
+        db.flush()
+        run_stats_service.record_run(db, run)
+    db.commit()
+
+
+def _stats(client, pipeline_id: str) -> dict:
+    since = (datetime.now(timezone(timedelta(hours=2))) - timedelta(hours=6)).isoformat()
+    response = client.get(f"/api/v1/pipelines/{pipeline_id}/stats", params={"since": since})
+    assert response.status_code == 200, response.text
+    return response.json()["data"]["totals"]["succeeded"]
+
+
+def test_stats_stay_inside_the_observed_range(client, db):
+    pipeline = create_pipeline(client, "stats-smoke")
+    _finished_runs(db, pipeline["id"], [10.14, 49.601, 49.601])
+
+    totals = _stats(client, pipeline["id"])
+    durations = totals["duration_ms"]
+    assert totals["runs"] == 3
+    for key in ("mean", "p50", "p90", "p99"):
+        assert durations["min"] <= durations[key] <= durations["max"], (key, durations)
+
+
+def test_stats_backfill_matches_live_buckets(client, db):
+    from app.cli.main import app as cli
+
+    pipeline = create_pipeline(client, "stats-backfill-smoke")
+    _finished_runs(db, pipeline["id"], [10.4, 10.4, 10.4])
+    live = _stats(client, pipeline["id"])
+
+    result = CliRunner().invoke(cli, ["stats-backfill", "--pipeline-id", pipeline["id"]])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output[result.output.index("{"):]) == {"runs": 3, "buckets": 1}
+    assert _stats(client, pipeline["id"]) == live
+    assert live["duration_ms"]["mean"] == 10.4
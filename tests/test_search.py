@@ -0,0 +1,32 @@
+from typer.testing import CliRunner
+
+from conftest import create_pipeline
+
+
+def _search(client, **params) -> list:
+    response = client.get("/api/v1/search", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def test_search_finds_chunks_and_survives_reindex(client):
+    from app.cli.main import app as cli
+
+    pipeline = create_pipeline(client, "search-smoke")
+    run = client.post(
+        f"/api/v1/pipelines/{pipeline['id']}/run", json={"text_payload": "The zanzibarquux clause renews yearly."}
+    ).json()["data"]
+
+    hits = _search(client, q="zanzibarquux", pipeline_id=pipeline["id"], source_type="chunk")
+    assert [hit["pipeline_run_id"] for hit in hits] == [run["id"]]
+    assert "zanzibarquux" in hits[0]["snippet"]
+    assert _search(client, q="zanzibar*", pipeline_id=pipeline["id"], source_type="chunk")
+
+    result = CliRunner().invoke(cli, ["search-reindex"])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("Indexed ")
+    assert [hit["pipeline_run_id"] for hit in _search(client, q="zanzibarquux", source_type="chunk")] == [run["id"]]
+
+
+def test_search_rejects_unknown_filters(client):
+    assert client.get("/api/v1/search", params={"q": "invoice", "source_type": "email"}).status_code == 422
@@ -0,0 +1,59 @@
+from uuid import UUID
+
+import pytest
+
+from conftest import create_pipeline
+
+pytestmark = pytest.mark.usefixtures("empty_queue")
+
+
+def _enqueue(db, pipeline: dict, count: int = 1) -> list:
+    from app.schemas.run_schemas import RunCreate
+    from app.services import pipeline_service, run_service
+
+    row = pipeline_service.get_pipeline(db, UUID(pipeline["id"]))
+    return [
+        run_service.enqueue_runs(db, row, [RunCreate(text_payload=f"queued {index}")], "normal")[0].id
+        for index in range(count)
+    ]
+
+
+def _claim(db):
+    from app.services import run_queue
+
+    run = run_queue.claim_next_run(db, worker_id="test-worker", lease_seconds=60)
+    return run.id if run is not None else None
+
+
+def test_worker_executes_a_queued_run(client, db):
+    from app.models.pipeline_model import PipelineRun
+    from app.services.worker_pool import Worker
+
+    [run_id] = _enqueue(db, create_pipeline(client, "worker-smoke"))
+    assert Worker("test-worker").run_once() is True
+
+    run = db.get(PipelineRun, run_id, populate_existing=True)
+    assert run.status == "succeeded", run.error_message
+    assert run.lease_owner is None
+    assert Worker("test-worker").run_once() is False
+
+
+def test_claims_skip_pipelines_at_their_cap(client, db):
+    capped = create_pipeline(client, "claims-capped", metadata={"max_concurrent_runs": 1})
+    other = create_pipeline(client, "claims-other", use_case="foia_request")
+    capped_runs = _enqueue(db, capped, 3)
+    [other_run] = _enqueue(db, other)
+
+    assert _claim(db) == capped_runs[0]
+    assert _claim(db) == other_run
+    assert _claim(db) is None
+
+
+def test_claims_rotate_across_use_cases(client, db):
+    backfill = create_pipeline(client, "claims-backfill")
+    interactive = create_pipeline(client, "claims-interactive", use_case="foia_request")
+    backfill_runs = _enqueue(db, backfill, 4)
+    interactive_runs = _enqueue(db, interactive, 2)
+
+    claimed = [_claim(db) for _ in range(4)]
+    assert claimed == [backfill_runs[0], interactive_runs[0], backfill_runs[1], interactive_runs[1]]